@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+应用商店应用（Appx包）详情缓存
+项目名称项目组Seraphiel 作者 TraeAI - 日期 2025-11-19 版本 1.0
+描述: 同一个PackageFullName的包内容不会变化（升级后全名里的版本号就不同了），
+      因此包的名称、版本、发布者、安装位置和清单中的显示名称可以按PackageFullName一直缓存。
+      每次只列出当前已安装包的全名：有注册表后端时读取AppModel\\Repository\\Packages的子键名，
+      不启动PowerShell；否则用一次只输出全名的Get-AppxPackage。只有新出现的包才查询详情
+      （包括读取清单），已卸载的包从缓存中删除。缓存文件通过scan_cache读写。
+"""
+
+import json
+
+from powershell_session import run_powershell
+from registry_backend import APPX_PACKAGES_KEYS, default_backend, list_subkeys
+from scan_cache import load_cache, save_cache
+
+APPX_CACHE_KIND = 'appx'
+APPX_CACHE_VERSION = 1
+APPX_CACHE_FILE = 'appx_cache.json'
+
+# 缓存的包详情字段
+APPX_FIELDS = ['Name', 'Version', 'PackageFullName', 'Publisher', 'InstallLocation', 'DisplayName']
+
+# 包详情查询的字段，显示名称要读取包清单，是最慢的部分
+APPX_SELECT = (
+    " | Select-Object Name, Version, PackageFullName, Publisher, InstallLocation, "
+    "@{Name='DisplayName'; Expression={ (Get-AppxPackageManifest -Package $_.PackageFullName "
+    "-ErrorAction SilentlyContinue).Package.Properties.DisplayName }}"
+)
+
+JSON_LINES = " | ForEach-Object { $_ | ConvertTo-Json -Compress }"
+
+# 新出现的包超过这个数量时（例如首次扫描）直接获取全部包的详情，不把全名逐个写进脚本
+MAX_LISTED_PACKAGES = 100
+
+
+def powershell_runner(session=None):
+    """默认的脚本执行函数: run(脚本, 超时秒数) -> 标准输出，失败时返回None"""
+    def run(script, timeout):
+        try:
+            return run_powershell(script, timeout, session)
+        except Exception as e:
+            print(f"获取应用商店应用时出错: {e}")
+            return None
+    return run
+
+
+def parse_json_lines(output):
+    """逐条产出每行一个的JSON对象，无法解析的行跳过"""
+    for line in (output or '').splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(record, dict):
+            yield record
+
+
+def list_package_full_names(backend, run):
+    """当前用户已安装的包的全名列表，无法获取时返回None"""
+    if backend is not None:
+        names = []
+        for hive, root in APPX_PACKAGES_KEYS:
+            names.extend(list_subkeys(backend, hive, root))
+        if names:
+            return names
+
+    output = run("Get-AppxPackage | Select-Object PackageFullName" + JSON_LINES, 30)
+    if not output:
+        return None
+    return [record['PackageFullName'] for record in parse_json_lines(output) if record.get('PackageFullName')]
+
+
+def package_details_script(full_names=None):
+    """查询包详情的脚本，full_names为None时查询全部包"""
+    script = "Get-AppxPackage"
+    if full_names is not None:
+        quoted = ", ".join("'" + name.replace("'", "''") + "'" for name in full_names)
+        script += f" | Where-Object {{ @({quoted}) -contains $_.PackageFullName }}"
+    return script + APPX_SELECT + JSON_LINES
+
+
+def fetch_package_details(full_names, run):
+    """查询指定包的详情，返回 {全名: {字段: 值}}；查询失败或没有任何输出时返回None"""
+    listed = full_names if len(full_names) <= MAX_LISTED_PACKAGES else None
+    output = run(package_details_script(listed), 60)
+    if not output:
+        return None
+    wanted = set(full_names)
+    return {record['PackageFullName']: {field: record.get(field) for field in APPX_FIELDS}
+            for record in parse_json_lines(output) if record.get('PackageFullName') in wanted}
+
+
+def load_appx_packages(cache_path=None, backend=None, run=None, session=None):
+    """返回当前已安装的Appx包详情 ([{字段: 值}, ...], 统计信息)
+
+    指定cache_path时复用缓存中全名相同的包，只查询新出现的包；没有变化时不会执行任何查询
+    （有注册表后端时连列出全名也不需要PowerShell）。列出了全名但Get-AppxPackage不返回的包
+    （例如只为其他用户安装）记为None，不再重复查询。run是执行脚本的函数，默认通过PowerShell执行。
+    """
+    if backend is None:
+        backend = default_backend()
+    if run is None:
+        run = powershell_runner(session)
+    cached = (load_cache(cache_path, APPX_CACHE_KIND, APPX_CACHE_VERSION) if cache_path else None) or {}
+
+    names = list_package_full_names(backend, run)
+    if names is None:
+        # 无法列出全名时直接查询全部包，不更新缓存
+        output = run(package_details_script(), 60)
+        packages = [{field: record.get(field) for field in APPX_FIELDS}
+                    for record in parse_json_lines(output) if record.get('Name')]
+        return packages, {'reused': 0, 'read': len(packages), 'removed': 0}
+    names = list(dict.fromkeys(names))
+
+    entries = {name: cached[name] for name in names if name in cached}
+    new = [name for name in names if name not in entries]
+    stats = {'reused': len(entries), 'read': 0, 'removed': len(cached) - len(entries)}
+    if new:
+        details = fetch_package_details(new, run)
+        if details is not None:
+            # 查询失败时新包不写入缓存，下次再试
+            for name in new:
+                entries[name] = details.get(name)
+            stats['read'] = len(new)
+
+    if cache_path and (not cached or stats['read'] or stats['removed']):
+        save_cache(cache_path, APPX_CACHE_KIND, APPX_CACHE_VERSION, entries)
+
+    return [entries[name] for name in names if entries.get(name)], stats
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+应用商店应用详情缓存测试
+项目名称项目组Seraphiel 作者 TraeAI - 日期 2025-11-19 版本 1.0
+描述: 用shims目录下的powershell替身程序回放录制的Get-AppxPackage输出，在内存注册表上构造
+      AppModel\\Repository\\Packages键（替身程序按包模拟读取清单的耗时），比较每次完整查询与
+      按PackageFullName缓存的耗时和PowerShell调用次数，并检查首次、无变化、新安装和卸载若干包之后
+      的结果都与完整查询一致。结果不一致时以非零退出码结束。
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from synthetic import synthetic_appx_registry
+
+SHIM_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'shims')
+sys.path.insert(0, SHIM_DIR)
+
+from replay import POWERSHELL_FIXTURES, _read_jsonl, scaled  # noqa: E402
+
+from appx_cache import load_appx_packages, powershell_runner  # noqa: E402
+from get_all_windows_software import get_store_apps, make_store_record  # noqa: E402
+from get_software_install_path import get_store_app_path  # noqa: E402
+from registry_backend import APPX_PACKAGES_KEYS  # noqa: E402
+
+
+def shim_full_names(count):
+    """替身程序回放count条记录时各个包的全名"""
+    _, fixture, name_fields = next(entry for entry in POWERSHELL_FIXTURES if entry[0] == 'Get-AppxPackage')
+    return [record['PackageFullName'] for record in scaled(_read_jsonl(fixture), count, name_fields)]
+
+
+def set_records(count):
+    os.environ['SHIM_RECORDS'] = str(count)
+
+
+def timed(func):
+    started = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - started
+
+
+class CountingRunner:
+    """记录PowerShell调用次数的脚本执行函数"""
+
+    def __init__(self):
+        self.calls = 0
+        self._run = powershell_runner()
+
+    def __call__(self, script, timeout):
+        self.calls += 1
+        return self._run(script, timeout)
+
+
+def cached_scan(cache_path, backend):
+    """借助缓存获取全部包，返回 (记录, 耗时, PowerShell调用次数, 统计)"""
+    runner = CountingRunner()
+    (packages, stats), elapsed = timed(lambda: load_appx_packages(cache_path, backend, run=runner))
+    return [make_store_record(app) for app in packages], elapsed, runner.calls, stats
+
+
+def check(label, records, elapsed, calls, stats, expected_calls, expected_read, expected_removed):
+    """与完整查询的结果以及预期的调用次数和统计比较"""
+    full, full_elapsed = timed(get_store_apps)
+    same = records == full
+    print(f"  {label}: {elapsed * 1000:.1f}毫秒 (完整查询{full_elapsed * 1000:.1f}毫秒), PowerShell调用{calls}次, "
+          f"复用{stats['reused']}个, 查询{stats['read']}个, 移除{stats['removed']}个"
+          + ("" if same else "  结果不一致!"))
+    return (same and calls == expected_calls and stats['read'] == expected_read
+            and stats['removed'] == expected_removed)
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='应用商店应用详情缓存测试（使用powershell替身程序）')
+    parser.add_argument('--packages', type=int, default=300, help='已安装的包数量')
+    parser.add_argument('--changes', type=int, default=5, help='新安装和卸载的包数量')
+    parser.add_argument('--startup-latency', type=float, default=0.2, help='替身程序每次启动的模拟延迟（秒）')
+    parser.add_argument('--query-latency', type=float, default=0.2, help='每次查询的模拟延迟（秒）')
+    parser.add_argument('--manifest-latency', type=float, default=0.003, help='读取每个包清单的模拟延迟（秒）')
+    args = parser.parse_args()
+
+    os.environ['PATH'] = SHIM_DIR + os.pathsep + os.environ.get('PATH', '')
+    os.environ['SHIM_STARTUP_LATENCY'] = str(args.startup_latency)
+    os.environ['SHIM_QUERY_LATENCY'] = str(args.query_latency)
+    os.environ['SHIM_MANIFEST_LATENCY'] = str(args.manifest_latency)
+    os.environ.pop('POWERSHELL_WORKER', None)
+
+    count = args.packages
+    set_records(count)
+    registry = synthetic_appx_registry(shim_full_names(count))
+    hive, root = APPX_PACKAGES_KEYS[0]
+
+    ok = True
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cache_path = os.path.join(temp_dir, 'appx_cache.json')
+        print(f"{count}个包, 注册表列出全名:")
+        ok = check("首次", *cached_scan(cache_path, registry), 1, count, 0) and ok
+        ok = check("无变化", *cached_scan(cache_path, registry), 0, 0, 0) and ok
+
+        # 新安装若干个包（替身程序多回放几条，注册表中加上对应的键）
+        added = shim_full_names(count + args.changes)[count:]
+        for full_name in added:
+            registry.set_key(hive, f"{root}\\{full_name}", {'PackageID': full_name})
+        count += args.changes
+        set_records(count)
+        ok = check(f"新安装{args.changes}个", *cached_scan(cache_path, registry), 1, args.changes, 0) and ok
+
+        # 卸载最后若干个包
+        removed = shim_full_names(count)[-2 * args.changes:]
+        for full_name in removed:
+            registry.delete_key(hive, f"{root}\\{full_name}")
+        count -= 2 * args.changes
+        set_records(count)
+        ok = check(f"卸载{2 * args.changes}个", *cached_scan(cache_path, registry), 0, 0, 2 * args.changes) and ok
+
+        # 没有注册表后端时用一次只输出全名的Get-AppxPackage判断变化
+        no_backend_cache = os.path.join(temp_dir, 'appx_cache_powershell.json')
+        print(f"{count}个包, PowerShell列出全名:")
+        ok = check("首次", *cached_scan(no_backend_cache, None), 2, count, 0) and ok
+        ok = check("无变化", *cached_scan(no_backend_cache, None), 1, 0, 0) and ok
+
+        name = "Spotify"
+        expected, uncached = timed(lambda: get_store_app_path(name))
+        result, cached = timed(lambda: get_store_app_path(name, cache_path, registry))
+        same = result == expected and result is not None
+        ok = ok and same
+        print(f"查找应用商店应用 '{name}': 直接查询{uncached * 1000:.1f}毫秒, 使用缓存{cached * 1000:.2f}毫秒"
+              + ("" if same else "  结果不一致!"))
+
+    if not ok:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量安装路径查找性能测试
+项目名称项目组Seraphiel 作者 TraeAI - 日期 2025-11-19 版本 1.0
+描述: 在内存注册表上比较逐个调用get_software_install_path与batch_install_paths一次枚举的耗时，
+      并比较Aho-Corasick自动机与逐个名称判断子串两种匹配方式在不同名称数量下的耗时
+"""
+
+import argparse
+import random
+import time
+
+from synthetic import synthetic_uninstall_registry
+
+from get_software_install_path import INSTALL_FIELDS, batch_install_paths, get_software_install_path
+from multi_match import NameMatcher
+from registry_backend import iter_uninstall_entries
+
+
+def timed(func):
+    started = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - started
+
+
+def pick_names(display_names, count, seed=0):
+    """从显示名中取片段作为查询名称，另加一部分不存在的名称"""
+    rng = random.Random(seed)
+    names = []
+    for index in range(count):
+        if index % 5 == 4:
+            names.append(f"NoSuchProduct{index}")
+            continue
+        words = rng.choice(display_names).split()
+        start = rng.randrange(len(words))
+        names.append(' '.join(words[start:start + 2]))
+    return list(dict.fromkeys(names))
+
+
+def naive_match(names, display_names):
+    """对照：每个显示名逐个判断包含哪些名称"""
+    lowered = [name.lower() for name in names]
+    matches = []
+    for display in display_names:
+        display = display.lower()
+        matches.append([name_id for name_id, name in enumerate(lowered) if name in display])
+    return matches
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='批量安装路径查找性能测试')
+    parser.add_argument('--keys', type=int, default=5000, help='合成卸载项数量')
+    parser.add_argument('--names', type=int, default=50, help='批量查找的名称数量')
+    args = parser.parse_args()
+
+    registry = synthetic_uninstall_registry(args.keys)
+    display_names = [values['DisplayName'] for _, _, _, values in iter_uninstall_entries(registry, INSTALL_FIELDS)
+                     if values.get('DisplayName')]
+    names = pick_names(display_names, args.names)
+
+    single, single_time = timed(lambda: {name: get_software_install_path(name, backend=registry) for name in names})
+    batch, batch_time = timed(lambda: batch_install_paths(names, backend=registry))
+    consistent = all((single[name] is None) == (not batch[name]) and
+                     (single[name] is None or single[name] == batch[name][0]) for name in names)
+    print(f"{len(names)}个名称, {len(display_names)}个卸载项:")
+    print(f"  逐个查找: {single_time * 1000:.1f}毫秒 (枚举注册表{len(names)}遍；"
+          f"没有winreg时需要启动{len(names) * 3}个PowerShell进程)")
+    print(f"  批量查找: {batch_time * 1000:.1f}毫秒 (枚举注册表1遍；没有winreg时1个PowerShell进程), "
+          f"共{sum(len(matches) for matches in batch.values())}个匹配项")
+    print(f"  与逐个查找的第一个匹配项{'一致' if consistent else '不一致!'}")
+
+    print("\n匹配方式比较（只计匹配，不含枚举）:")
+    for count in (10, 100, 1000, 5000):
+        query = pick_names(display_names, count, seed=count)
+        matcher, build_time = timed(lambda: NameMatcher(query))
+        automaton, automaton_time = timed(lambda: [matcher.match(display) for display in display_names])
+        naive, naive_time = timed(lambda: naive_match(query, display_names))
+        same = automaton == naive
+        print(f"  {len(query):>5}个名称: 自动机{automaton_time * 1000:8.1f}毫秒(建立{build_time * 1000:.1f}毫秒), "
+              f"逐个判断{naive_time * 1000:8.1f}毫秒{'' if same else '  结果不一致!'}")
+
+    if not consistent:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+采集流程基准测试
+项目名称项目组Seraphiel 作者 TraeAI - 日期 2025-11-19 版本 1.0
+描述: 把shims目录下的powershell/winget替身程序放到PATH最前面，回放录制的输出，
+      在没有Windows的机器上完整测量各采集函数、filter_software和export_results的耗时。
+      结果与JSON基线比较，超过阈值的项目视为性能回退，以非零退出码结束，便于在CI中使用。
+      仓库中的baseline_collectors.json是默认配置下的参考基线；找不到或无法读取基线时同样以非零退出码结束，
+      在其他机器上使用前先用--update-baseline生成本机的基线。
+
+用法:
+    python bench_collectors.py --update-baseline      # 生成或更新基线
+    python bench_collectors.py                        # 与基线比较
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+import synthetic  # noqa: F401  把仓库根目录加入sys.path
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SHIM_DIR = os.path.join(BENCH_DIR, 'shims')
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'baseline_collectors.json')
+
+FILTERS = [
+    {'name': 'microsoft'},
+    {'publisher': 'python'},
+    {'type': '系统服务'},
+    {'name': 'python', 'type': '传统软件'},
+]
+
+
+def configure_shims(args):
+    """让后续启动的powershell/winget都指向替身程序"""
+    os.environ['PATH'] = SHIM_DIR + os.pathsep + os.environ.get('PATH', '')
+    os.environ['SHIM_RECORDS'] = str(args.records)
+    os.environ['SHIM_STARTUP_LATENCY'] = str(args.startup_latency)
+    os.environ['SHIM_QUERY_LATENCY'] = str(args.query_latency)
+    os.environ.pop('POWERSHELL_WORKER', None)
+
+
+def best_of(func, repeat):
+    """执行repeat次，返回(最后一次的结果, 最短耗时)；被测函数的屏幕输出被丢弃"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            result = func()
+            elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def run_suite(args):
+    """执行全部测量，返回{项目: 秒}"""
+    import get_all_windows_software as inventory
+    from powershell_session import PowerShellSession
+
+    results = {}
+    session = None if args.no_session else PowerShellSession()
+    try:
+        if session is not None:
+            _, results['powershell_session_start'] = best_of(lambda: session.request(""), 1)
+
+        collected = []
+        collectors = [
+            ('get_registry_software', lambda: inventory.get_registry_software(session)),
+            ('get_store_apps', lambda: inventory.get_store_apps(session)),
+            ('get_winget_apps', inventory.get_winget_apps),
+            ('get_system_features', lambda: inventory.get_system_features(session)),
+            ('get_services', lambda: inventory.get_services(session)),
+        ]
+        for name, func in collectors:
+            records, results[name] = best_of(func, args.repeat)
+            collected.extend(records)
+    finally:
+        if session is not None:
+            session.close()
+
+    _, results['filter_software'] = best_of(
+        lambda: [inventory.filter_software(collected, filters) for filters in FILTERS], args.repeat)
+
+    with tempfile.TemporaryDirectory() as directory:
+        for format_type in ('json', 'ndjson', 'txt'):
+            _, results[f'export_results({format_type})'] = best_of(
+                lambda: inventory.export_results(collected, f'report.{format_type}', format_type, directory),
+                args.repeat)
+
+    return results, len(collected)
+
+
+def suite_config(args):
+    return {
+        'records': args.records,
+        'startup_latency': args.startup_latency,
+        'query_latency': args.query_latency,
+        'session': not args.no_session,
+    }
+
+
+def load_baseline(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_baseline(path, config, results):
+    baseline = {
+        'config': config,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(baseline, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+
+
+def compare(results, baseline, threshold, min_delta):
+    """逐项与基线比较并打印，返回回退的项目列表"""
+    regressions = []
+    print(f"{'项目':<28}{'基线(毫秒)':>12}{'本次(毫秒)':>12}{'比值':>8}")
+    for name, elapsed in results.items():
+        previous = baseline['results'].get(name)
+        if previous is None:
+            print(f"{name:<30}{'-':>12}{elapsed * 1000:>12.1f}{'':>8}  新项目")
+            continue
+        ratio = elapsed / previous if previous else float('inf')
+        regressed = elapsed > previous * (1 + threshold) and elapsed - previous > min_delta
+        status = "  回退!" if regressed else ""
+        print(f"{name:<30}{previous * 1000:>12.1f}{elapsed * 1000:>12.1f}{ratio:>8.2f}{status}")
+        if regressed:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='采集流程基准测试（使用powershell/winget替身程序）')
+    parser.add_argument('--records', type=int, default=2000, help='每个采集任务回放的记录数')
+    parser.add_argument('--startup-latency', type=float, default=0.0, help='替身程序每次启动的模拟延迟（秒）')
+    parser.add_argument('--query-latency', type=float, default=0.0, help='每次查询的模拟延迟（秒）')
+    parser.add_argument('--no-session', action='store_true', help='不使用PowerShell常驻会话')
+    parser.add_argument('--repeat', type=int, default=3, help='重复次数（取最短耗时）')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='基线文件')
+    parser.add_argument('--update-baseline', action='store_true', help='用本次结果覆盖基线')
+    parser.add_argument('--threshold', type=float, default=0.25, help='超过基线的比例阈值（默认0.25即慢25%%）')
+    parser.add_argument('--min-delta', type=float, default=0.005, help='同时要求至少慢这么多秒才算回退')
+    args = parser.parse_args()
+
+    configure_shims(args)
+    config = suite_config(args)
+    results, count = run_suite(args)
+    print(f"共采集 {count} 条记录, 配置: {config}")
+
+    if args.update_baseline:
+        save_baseline(args.baseline, config, results)
+        for name, elapsed in results.items():
+            print(f"  {name}: {elapsed * 1000:.1f}毫秒")
+        print(f"基线已写入: {args.baseline}")
+        return
+
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        # 没有基线时无法判断是否回退，不能当作通过
+        print(f"错误: 无法读取基线文件 {args.baseline}，请先用 --update-baseline 生成")
+        sys.exit(1)
+
+    if baseline.get('config') != config:
+        print(f"警告: 基线的配置 {baseline.get('config')} 与本次不同，比较结果仅供参考")
+
+    regressions = compare(results, baseline, args.threshold, args.min_delta)
+    if regressions:
+        print(f"\n{len(regressions)} 个项目比基线慢{args.threshold:.0%}以上: {', '.join(regressions)}")
+        sys.exit(1)
+    print("\n没有发现性能回退")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+列式清单格式查询测试
+项目名称项目组Seraphiel 作者 TraeAI - 日期 2025-11-19 版本 1.0
+描述: 同一份多主机清单分别保存为JSON导出和列式文件，比较每次查询的耗时:
+      JSON一侧是json.load整个文件后逐条过滤，列式一侧是mmap打开文件后只解码条件涉及的列。
+      同时检查两边查到的记录一致，列式文件的权限与直接新建的文件相同，以及列式文件转换回JSON后与原文件逐字节相同。
+"""
+
+import argparse
+import json
+import os
+import stat
+import tempfile
+import time
+
+from synthetic import synthetic_catalog, synthetic_host_records
+
+from export_writer import export_records
+from inventory_columnar import COLUMNS, ColumnarReader, pack_exports, unpack_export
+
+PER_HOST = 150
+
+QUERIES = [
+    {'name': 'python'},
+    {'publisher': 'mozilla'},
+    {'type': 'winget应用', 'publisher': 'microsoft'},
+    {'host': 'HOST-00007'},
+    {'name': 'studio', 'host': 'HOST-00003'},
+]
+
+
+def fleet_records(hosts, seed=0):
+    """多台主机的记录，每条带host和scanned_at"""
+    catalog = synthetic_catalog(3000, seed)
+    for host in range(hosts):
+        for record in synthetic_host_records(catalog, PER_HOST, seed + host):
+            record['host'] = f"HOST-{host:05d}"
+            record['scanned_at'] = f"2025-11-{host % 28 + 1:02d} 09:00:00"
+            yield record
+
+
+def json_query(path, filters):
+    """基线: 读入整个JSON文件再按条件过滤"""
+    with open(path, 'rb') as f:
+        records = json.load(f)
+    name = (filters.get('name') or '').lower()
+    publisher = (filters.get('publisher') or '').lower()
+    matched = []
+    for record in records:
+        if name and name not in record['name'].lower():
+            continue
+        if publisher and publisher not in record['publisher'].lower():
+            continue
+        if filters.get('type') and record['type'] != filters['type']:
+            continue
+        if filters.get('host') and record['host'] != filters['host']:
+            continue
+        matched.append({column: record[column] for column in COLUMNS})
+    return matched
+
+
+def columnar_query(path, filters):
+    """每次查询都重新打开文件，与命令行单次查询的情况一致"""
+    with ColumnarReader(path) as reader:
+        return reader.query(filters)
+
+
+def best_of(func, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='列式清单格式查询测试')
+    parser.add_argument('--hosts', type=int, default=5000, help='主机数量（每台150条记录）')
+    parser.add_argument('--repeat', type=int, default=3, help='每项测试重复次数，取最短耗时')
+    args = parser.parse_args()
+
+    ok = True
+    with tempfile.TemporaryDirectory() as temp_dir:
+        json_path = os.path.join(temp_dir, 'fleet.json')
+        columnar_path = os.path.join(temp_dir, 'fleet.swcol')
+        count = export_records(fleet_records(args.hosts), json_path, 'json')
+
+        started = time.perf_counter()
+        pack_exports([json_path], columnar_path)
+        print(f"{count}条记录: JSON {os.path.getsize(json_path) / 1024 / 1024:.1f}MB, "
+              f"列式 {os.path.getsize(columnar_path) / 1024 / 1024:.1f}MB, 转换{time.perf_counter() - started:.2f}秒")
+
+        for filters in QUERIES:
+            expected, json_elapsed = best_of(lambda: json_query(json_path, filters), args.repeat)
+            matched, columnar_elapsed = best_of(lambda: columnar_query(columnar_path, filters), args.repeat)
+            same = matched == expected
+            ok = ok and same
+            print(f"  {filters}: {len(matched)}条, json.load {json_elapsed * 1000:.1f}毫秒, "
+                  f"列式 {columnar_elapsed * 1000:.1f}毫秒 ({json_elapsed / columnar_elapsed:.0f}倍)"
+                  + ("" if same else " 结果不一致!"))
+
+        # 列式文件的权限应与open()直接新建的文件相同
+        reference = os.path.join(temp_dir, 'reference.txt')
+        with open(reference, 'w'):
+            pass
+        same = stat.S_IMODE(os.stat(columnar_path).st_mode) == stat.S_IMODE(os.stat(reference).st_mode)
+        print(f"列式文件权限{'与直接新建的文件相同' if same else '与直接新建的文件不同!'}")
+        ok = ok and same
+
+        copy_path = os.path.join(temp_dir, 'copy.json')
+        copy_path, _ = unpack_export(columnar_path, copy_path)
+        with open(json_path, 'rb') as original, open(copy_path, 'rb') as copy:
+            same = original.read() == copy.read()
+        print(f"转换回JSON与原文件{'一致' if same else '不一致!'}")
+        ok = ok and same
+
+    if not ok:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
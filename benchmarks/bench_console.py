@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+屏幕输出性能测试
+项目名称项目组Seraphiel 作者 TraeAI - 日期 2025-11-19 版本 1.0
+描述: 比较逐行print与report_output按大块写出结果列表的耗时。控制台每写一行就刷新一次，
+      这里用行缓冲的无缓冲文件（每行一次系统调用）和伪终端（有pty时，另一个线程负责读出）模拟。
+      同时核对两种方式的输出逐字节相同，以及文本导出与原来逐行写入的结果相同。
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import threading
+import time
+
+from synthetic import synthetic_records
+
+from report_output import print_results, render_text_report, iter_chunks
+
+
+def legacy_print(records):
+    """改用report_output之前main()中的输出方式，作为对照"""
+    print(f"\n所有结果 ({len(records)}个):")
+    print("=" * 80)
+    for i, item in enumerate(records, 1):
+        print(f"{i}. [{item['type']}] {item['name']}")
+        if item.get('version'):
+            print(f"   版本: {item['version']}")
+        if item.get('publisher'):
+            print(f"   发布者: {item['publisher']}")
+        if item.get('install_date'):
+            print(f"   安装日期: {item['install_date']}")
+        print()
+
+
+def legacy_text_report(records, generated_at):
+    """改用report_output之前export_results的文本导出，作为对照"""
+    out = io.StringIO()
+    out.write(f"Windows系统软件信息报告\n")
+    out.write(f"生成时间: {generated_at}\n")
+    out.write("=" * 80 + "\n\n")
+    types = {}
+    for item in records:
+        if item['type'] not in types:
+            types[item['type']] = []
+        types[item['type']].append(item)
+    for type_name, items in types.items():
+        out.write(f"{type_name} ({len(items)}个):\n")
+        out.write("-" * 60 + "\n")
+        for i, item in enumerate(items, 1):
+            out.write(f"{i}. {item['name']}\n")
+            if item.get('version'):
+                out.write(f"   版本: {item['version']}\n")
+            if item.get('publisher'):
+                out.write(f"   发布者: {item['publisher']}\n")
+            if item.get('install_date'):
+                out.write(f"   安装日期: {item['install_date']}\n")
+            out.write("\n")
+        out.write("\n")
+    return out.getvalue()
+
+
+def console_stream(fd):
+    """与控制台一样按行刷新的文本流"""
+    return io.TextIOWrapper(io.FileIO(fd, 'w', closefd=False), encoding='utf-8', line_buffering=True)
+
+
+def timed_output(func, stream, repeat):
+    best = None
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(stream):
+            started = time.perf_counter()
+            func()
+            stream.flush()
+            elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def compare(label, fd, records, repeat):
+    stream = console_stream(fd)
+    legacy = timed_output(lambda: legacy_print(records), stream, repeat)
+    chunked = timed_output(lambda: print_results(records, page=False), stream, repeat)
+    print(f"  {label}: 逐行print {legacy * 1000:.1f}毫秒, 分块写出 {chunked * 1000:.1f}毫秒, "
+          f"快{legacy / chunked:.1f}倍")
+
+
+@contextlib.contextmanager
+def drained_pty():
+    """打开伪终端，另一个线程不断读出，避免写满后阻塞"""
+    master, slave = os.openpty()
+    stop = threading.Event()
+
+    def drain():
+        while not stop.is_set():
+            try:
+                if not os.read(master, 1 << 16):
+                    break
+            except OSError:
+                break
+
+    thread = threading.Thread(target=drain, daemon=True)
+    thread.start()
+    try:
+        yield slave
+    finally:
+        stop.set()
+        os.close(slave)
+        os.close(master)
+        thread.join(timeout=1)
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='屏幕输出性能测试')
+    parser.add_argument('--records', type=int, default=20000, help='记录数量')
+    parser.add_argument('--repeat', type=int, default=3, help='重复次数（取最短耗时）')
+    args = parser.parse_args()
+
+    records = list(synthetic_records(args.records))
+
+    legacy = io.StringIO()
+    with contextlib.redirect_stdout(legacy):
+        legacy_print(records)
+    chunked = io.StringIO()
+    print_results(records, page=False, stream=chunked)
+    same_console = legacy.getvalue() == chunked.getvalue()
+
+    generated_at = '2025-11-19 00:00:00'
+    same_text = legacy_text_report(records, generated_at) == "".join(
+        iter_chunks(render_text_report(records, generated_at)))
+    print(f"{len(records)}条记录: 屏幕输出{'一致' if same_console else '不一致!'}, "
+          f"文本导出{'一致' if same_text else '不一致!'}")
+
+    with open(os.devnull, 'wb') as devnull:
+        compare("行缓冲文件", devnull.fileno(), records, args.repeat)
+    if hasattr(os, 'openpty'):
+        with drained_pty() as slave:
+            compare("伪终端", slave, records, args.repeat)
+
+    if not (same_console and same_text):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+快照比较性能测试
+项目名称项目组Seraphiel 作者 TraeAI - 日期 2025-11-19 版本 1.0
+描述: 生成两份合成快照（新快照中删除、新增并升级一部分记录），
+      分别测试读取加哈希比较、已排序快照的归并比较，并核对变化数量与构造的一致
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from synthetic import synthetic_records
+
+from export_writer import export_records, read_records
+from inventory_diff import diff_snapshots, record_key
+
+
+def make_snapshots(count, seed=0):
+    """返回(旧快照, 新快照, 期望的变化数量)"""
+    rng = random.Random(seed)
+    old = list(synthetic_records(count, seed))
+    new = []
+    expected = {'added': 0, 'removed': 0, 'changed': 0}
+    for record in old:
+        roll = rng.random()
+        if roll < 0.01:
+            expected['removed'] += 1
+            continue
+        if roll < 0.03:
+            record = dict(record, version=record['version'] + '.1')
+            expected['changed'] += 1
+        new.append(record)
+    for index in range(count // 100):
+        new.append({'type': '传统软件', 'name': f"New Product {index}", 'version': '1.0', 'publisher': 'Contoso'})
+        expected['added'] += 1
+    rng.shuffle(new)
+    return old, new, expected
+
+
+def timed(func):
+    started = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - started
+
+
+def run_diff(old, new, assume_sorted):
+    summary = {}
+    changes = list(diff_snapshots(old, new, assume_sorted, summary))
+    return changes, summary
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='快照比较性能测试')
+    parser.add_argument('--records', type=int, default=100000, help='每份快照的记录数量')
+    parser.add_argument('--format', choices=['json', 'ndjson'], default='json', help='快照文件格式')
+    args = parser.parse_args()
+
+    old, new, expected = make_snapshots(args.records)
+
+    with tempfile.TemporaryDirectory() as directory:
+        old_path = os.path.join(directory, f'old.{args.format}')
+        new_path = os.path.join(directory, f'new.{args.format}')
+        export_records(old, old_path, args.format)
+        export_records(new, new_path, args.format)
+        sorted_old = os.path.join(directory, f'old-sorted.{args.format}')
+        sorted_new = os.path.join(directory, f'new-sorted.{args.format}')
+        export_records(sorted(old, key=record_key), sorted_old, args.format)
+        export_records(sorted(new, key=record_key), sorted_new, args.format)
+
+        (changes, summary), in_memory = timed(lambda: run_diff(old, new, False))
+        (_, file_summary), hashed = timed(lambda: run_diff(read_records(old_path), read_records(new_path), False))
+        (_, merge_summary), merged = timed(lambda: run_diff(read_records(sorted_old), read_records(sorted_new), True))
+
+    counts = {kind: summary[kind] for kind in expected}
+    status = "一致" if counts == expected and file_summary == summary == merge_summary else "不一致!"
+    print(f"{args.records} 条记录: 新增{summary['added']}, 卸载{summary['removed']}, "
+          f"版本变化{summary['changed']}, 未变{summary['unchanged']} ({status})")
+    print(f"  内存中哈希比较: {in_memory * 1000:.1f}毫秒")
+    print(f"  读取{args.format}文件并哈希比较: {hashed * 1000:.1f}毫秒")
+    print(f"  读取已排序{args.format}文件并归并比较: {merged * 1000:.1f}毫秒")
+
+
+if __name__ == "__main__":
+    main()
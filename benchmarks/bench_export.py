@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+导出性能与内存测试
+项目名称项目组Seraphiel 作者 TraeAI - 日期 2025-11-19 版本 1.0
+描述: 比较json.dump整表导出与ExportWriter逐条导出的耗时和内存峰值，并检查导出文件的权限
+      与直接新建的文件相同、覆盖已有文件时保留原来的权限。
+      JSON数组格式的流式导出应与json.dump的文件逐字节一致，耗时不超过json.dump的JSON_SLOWDOWN_LIMIT倍。
+      权限、内容或耗时不对时以非零退出码结束。
+"""
+
+import argparse
+import json
+import os
+import stat
+import tempfile
+import time
+import tracemalloc
+
+from synthetic import synthetic_records
+
+from export_writer import export_records, COMPRESSION_SUFFIXES
+
+# 流式JSON数组导出相对json.dump整表导出允许的耗时倍数
+JSON_SLOWDOWN_LIMIT = 1.5
+
+
+def measure(func):
+    """返回 (耗时秒数, 内存峰值字节数)"""
+    tracemalloc.start()
+    started = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def file_mode(path):
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+def check_modes(temp_dir):
+    """导出文件的权限应与open()新建的文件相同；覆盖已有文件时沿用它的权限"""
+    reference = os.path.join(temp_dir, 'reference.txt')
+    with open(reference, 'w'):
+        pass
+    path = os.path.join(temp_dir, 'mode.ndjson')
+    export_records(synthetic_records(10), path, 'ndjson')
+    created = file_mode(path)
+
+    os.chmod(path, 0o640)
+    export_records(synthetic_records(10), path, 'ndjson')
+    kept = file_mode(path)
+
+    ok = created == file_mode(reference) and kept == 0o640
+    print(f"导出文件权限: 新建 {created:o} (直接新建的文件 {file_mode(reference):o}), 覆盖后 {kept:o} (原来 640)"
+          + ("" if ok else "  权限不对!"))
+    return ok
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='导出性能与内存测试')
+    parser.add_argument('--records', type=int, default=100000, help='记录数量')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        def dump_list():
+            data = list(synthetic_records(args.records))
+            with open(os.path.join(temp_dir, 'baseline.json'), 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+
+        baseline_elapsed, peak = measure(dump_list)
+        print(f"json.dump整表导出: {baseline_elapsed:.2f}秒, 内存峰值 {peak / 1024 / 1024:.1f}MB")
+
+        ok = True
+
+        cases = [('json', None), ('ndjson', None)]
+        cases += [('ndjson', compression) for compression in sorted(COMPRESSION_SUFFIXES)]
+        for format_type, compression in cases:
+            path = os.path.join(temp_dir, f"stream.{format_type}")
+            try:
+                elapsed, peak = measure(lambda: export_records(
+                    synthetic_records(args.records), path, format_type, compression))
+            except ValueError as e:
+                print(f"{format_type}/{compression}: 跳过 ({e})")
+                continue
+            print(f"流式导出 {format_type}/{compression or '不压缩'}: {elapsed:.2f}秒, "
+                  f"内存峰值 {peak / 1024 / 1024:.1f}MB, 文件 {os.path.getsize(path) / 1024 / 1024:.1f}MB")
+            if format_type == 'json':
+                with open(path, 'rb') as f, open(os.path.join(temp_dir, 'baseline.json'), 'rb') as g:
+                    same = f.read() == g.read()
+                fast = elapsed <= baseline_elapsed * JSON_SLOWDOWN_LIMIT
+                ok = ok and same and fast
+                print(f"  与json.dump的文件{'一致' if same else '不一致!'}, "
+                      f"耗时为json.dump的{elapsed / baseline_elapsed:.2f}倍" + ("" if fast else "  过慢!"))
+
+        ok = check_modes(temp_dir) and ok
+
+    if not ok:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
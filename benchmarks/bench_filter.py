@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+过滤查询性能测试
+项目名称项目组Seraphiel 作者 TraeAI - 日期 2025-11-19 版本 1.0
+描述: 比较原来的逐条线性扫描与InventoryIndex索引查询的耗时，并核对两者以及不带索引的filter_software结果一致
+"""
+
+import argparse
+import time
+
+from synthetic import synthetic_records
+
+from get_all_windows_software import filter_software
+from inventory_index import InventoryIndex
+
+QUERIES = [
+    {'name': 'visual studio'},
+    {'name': 'code 12'},
+    {'publisher': 'microsoft'},
+    {'type': '系统服务'},
+    {'name': 'driver', 'publisher': 'nvidia', 'type': '传统软件'},
+    {'name': 'no such product'},
+    {'name': 'sd'},
+]
+
+
+def linear_filter(all_software, filters):
+    """改用索引之前的filter_software实现，作为对照"""
+    filtered = all_software
+
+    if filters.get('name'):
+        filtered = [s for s in filtered if filters['name'].lower() in s['name'].lower()]
+
+    if filters.get('type'):
+        filtered = [s for s in filtered if filters['type'] == s['type']]
+
+    if filters.get('publisher'):
+        filtered = [s for s in filtered if filters['publisher'].lower() in s.get('publisher', '').lower()]
+
+    return filtered
+
+
+def best_of(func, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='过滤查询性能测试')
+    parser.add_argument('--records', type=int, default=100000, help='记录数量')
+    parser.add_argument('--repeat', type=int, default=5, help='重复次数（取最短耗时）')
+    args = parser.parse_args()
+
+    records = list(synthetic_records(args.records))
+
+    index, build = best_of(lambda: InventoryIndex(records), 1)
+    print(f"{len(records)} 条记录建立索引: {build * 1000:.1f}毫秒")
+
+    ok = True
+    for filters in QUERIES:
+        expected, linear = best_of(lambda: linear_filter(records, filters), args.repeat)
+        actual, indexed = best_of(lambda: index.filter(filters), args.repeat)
+        single, scanned = best_of(lambda: filter_software(records, filters), args.repeat)
+        same = actual == expected and single == expected
+        ok = ok and same
+        print(f"{filters}: 线性 {linear * 1000:.2f}毫秒, 索引 {indexed * 1000:.2f}毫秒, "
+              f"加速 {linear / max(indexed, 1e-9):.1f}倍, filter_software {scanned * 1000:.2f}毫秒, "
+              f"{len(actual)}条 ({'一致' if same else '不一致!'})")
+
+    if not ok:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
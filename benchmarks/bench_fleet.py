@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多主机汇总性能测试
+项目名称项目组Seraphiel 作者 TraeAI - 日期 2025-11-19 版本 1.0
+描述: 生成合成的主机导出文件，比较单进程与多进程汇总的耗时，并记录主进程的内存峰值
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from synthetic import write_synthetic_fleet
+
+from fleet_aggregate import aggregate_files
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='多主机汇总性能测试')
+    parser.add_argument('--hosts', type=int, nargs='+', default=[1000, 10000], help='主机数量（可给多个）')
+    parser.add_argument('--per-host', type=int, default=150, help='每台主机的软件数')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='多进程模式的进程数')
+    parser.add_argument('--chunk-size', type=int, default=64, help='每个任务处理的文件数')
+    args = parser.parse_args()
+
+    for hosts in args.hosts:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            write_synthetic_fleet(temp_dir, hosts, args.per_host)
+
+            for workers in (1, args.workers):
+                tracemalloc.start()
+                started = time.perf_counter()
+                summary = aggregate_files([temp_dir], workers, args.chunk_size)
+                elapsed = time.perf_counter() - started
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                print(f"{hosts}台主机, {workers}个进程: {elapsed:.2f}秒, "
+                      f"{len(summary['software'])}种软件, 主进程内存峰值 {peak / 1024 / 1024:.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
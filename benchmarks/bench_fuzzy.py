@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+模糊匹配性能测试
+项目名称项目组Seraphiel 作者 TraeAI - 日期 2025-11-19 版本 1.0
+描述: 在合成的显示名集合上测量FuzzyResolver建立索引和每次查询的耗时，
+      与不经索引筛选、对全部名称计算得分的结果对照，检查筛选没有丢掉最佳匹配
+"""
+
+import argparse
+import time
+
+from synthetic import synthetic_display_names
+
+from fuzzy_resolver import FuzzyResolver
+
+# 查询 -> 期望排在第一位的显示名
+QUERIES = {
+    'vscode': "Microsoft Visual Studio Code (User)",
+    'visual studio': "Microsoft Visual Studio Code (User)",
+    'vs community': "Microsoft Visual Studio Community 2022",
+    'chrome': "Google Chrome",
+    'firefx': "Mozilla Firefox (x64 en-US)",
+    'acrobat reader': "Adobe Acrobat Reader DC",
+    '7zip': "7-Zip 23.01 (x64)",
+    'notepad++': "Notepad++ (64-bit x64)",
+    'vlc': "VLC media player",
+    'pyhton': "Python 3.11.4 (64-bit)",
+    'vc++ redist': "Microsoft Visual C++ 2015-2022 Redistributable (x64) - 14.38.33130",
+    'nvidia driver': "NVIDIA Graphics Driver 546.33",
+    'pycharm': "JetBrains PyCharm Community Edition 2023.3",
+    'intellij': "IntelliJ IDEA Community Edition 2023.3",
+    'virtualbox': "Oracle VM VirtualBox 7.0.12",
+    'tortoise git': "TortoiseGit 2.15.0.0 (64 bit)",
+    'filezila': "FileZilla 3.66.4",
+    'obs': "OBS Studio",
+    'nodejs': "Node.js",
+    'docker': "Docker Desktop",
+    'putty': "PuTTY release 0.79 (64-bit)",
+}
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='模糊匹配性能测试')
+    parser.add_argument('--names', type=int, default=5000, help='显示名数量')
+    parser.add_argument('--repeat', type=int, default=5, help='每个查询重复次数')
+    parser.add_argument('--top', type=int, default=5, help='返回的匹配数')
+    args = parser.parse_args()
+
+    records = [{'name': name} for name in synthetic_display_names(args.names)]
+    started = time.perf_counter()
+    resolver = FuzzyResolver(records)
+    print(f"{len(records)}个显示名, 建立索引{(time.perf_counter() - started) * 1000:.1f}毫秒")
+
+    pruned_times = []
+    full_times = []
+    correct = 0
+    same_as_full = 0
+    for query, expected in QUERIES.items():
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            pruned = resolver.resolve(query, args.top)
+            pruned_times.append(time.perf_counter() - started)
+        started = time.perf_counter()
+        full = resolver.resolve(query, args.top, prune=False)
+        full_times.append(time.perf_counter() - started)
+
+        top_name = pruned[0][1]['name'] if pruned else None
+        correct += top_name == expected
+        same_as_full += [(score, record['name']) for score, record in pruned[:1]] == \
+            [(score, record['name']) for score, record in full[:1]]
+        mark = '' if top_name == expected else f"  (期望 {expected})"
+        score = f"{pruned[0][0]:5.1f}" if pruned else '  -  '
+        print(f"  {query:<16}{score}  {top_name}{mark}")
+
+    print(f"\n排第一的是期望结果: {correct}/{len(QUERIES)}, 与全量计算的第一名相同: {same_as_full}/{len(QUERIES)}")
+    print(f"索引筛选后查询: 中位数{percentile(pruned_times, 0.5) * 1000:.2f}毫秒, "
+          f"p99 {percentile(pruned_times, 0.99) * 1000:.2f}毫秒")
+    print(f"对全部名称计算得分: 中位数{percentile(full_times, 0.5) * 1000:.2f}毫秒, "
+          f"p99 {percentile(full_times, 0.99) * 1000:.2f}毫秒")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+安装路径查询缓存性能测试
+项目名称项目组Seraphiel 作者 TraeAI - 日期 2025-11-19 版本 1.0
+描述: 在内存注册表上比较不用缓存的查找、缓存命中（进程内和新进程首次加载缓存文件）
+      以及用导出文件预热后的查找耗时，并验证安装软件后缓存会失效
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from synthetic import synthetic_uninstall_registry
+
+from get_all_windows_software import get_registry_software
+from get_software_install_path import lookup_install_path
+from install_path_cache import InstallPathCache, MISS
+from registry_backend import UNINSTALL_KEYS
+
+# 命中的目标耗时（秒）
+HIT_BUDGET = 0.001
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def time_each(func, names):
+    """逐个查询，返回每次查询的耗时列表"""
+    samples = []
+    for name in names:
+        started = time.perf_counter()
+        func(name)
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def report(label, samples):
+    print(f"{label}: 中位数{percentile(samples, 0.5) * 1e6:.1f}微秒, "
+          f"p99 {percentile(samples, 0.99) * 1e6:.1f}微秒 ({len(samples)}次)")
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='安装路径查询缓存性能测试')
+    parser.add_argument('--keys', type=int, default=5000, help='合成卸载项数量')
+    parser.add_argument('--queries', type=int, default=200, help='查询的名称数量')
+    args = parser.parse_args()
+
+    registry = synthetic_uninstall_registry(args.keys)
+    software = get_registry_software(backend=registry)
+    step = max(1, len(software) // args.queries)
+    names = [record['name'] for record in software[::step]][:args.queries]
+    ok = True
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cache_path = os.path.join(temp_dir, 'install_path_cache.json')
+
+        uncached = time_each(lambda name: lookup_install_path(name, backend=registry), names)
+        report("不用缓存", uncached)
+
+        cache = InstallPathCache(cache_path, backend=registry)
+        time_each(lambda name: lookup_install_path(name, cache=cache, backend=registry), names)
+        hits = time_each(lambda name: lookup_install_path(name, cache=cache, backend=registry), names)
+        report("缓存命中（进程内）", hits)
+        cache.save()
+
+        # 新进程的情况：加载缓存文件（含校验和与注册表变化检查）后查一次
+        started = time.perf_counter()
+        reloaded = InstallPathCache(cache_path, backend=registry)
+        result = lookup_install_path(names[0], cache=reloaded, backend=registry)
+        cold = time.perf_counter() - started
+        print(f"加载缓存文件并命中一次: {cold * 1000:.2f}毫秒 (缓存{len(reloaded.queries)}条, "
+              f"命中{reloaded.stats['hits']}次)")
+
+        median_hit = percentile(hits, 0.5)
+        if median_hit > HIT_BUDGET or result is None:
+            print(f"缓存命中超过{HIT_BUDGET * 1000:.0f}毫秒或结果错误!")
+            ok = False
+
+        # 用完整扫描的结果预热：从未查询过的名称也直接在导出记录中找到
+        warm_path = os.path.join(temp_dir, 'warm_cache.json')
+        warmed = InstallPathCache(warm_path, backend=registry)
+        warmed.warm_from_records(software)
+        warm = time_each(lambda name: lookup_install_path(name, cache=warmed, backend=registry), names[::-1])
+        report(f"预热后首次查询（{len(warmed.warm['records'])}条记录中查找）", warm)
+        print(f"  预热命中{warmed.stats['warm_hits']}次, 真正查询{warmed.stats['misses']}次")
+
+        # 新增一个卸载项后，根键的最后写入时间变化，缓存整体失效
+        hive, root = UNINSTALL_KEYS[1]
+        registry.set_key(hive, f"{root}\\{{NEW-PRODUCT}}", {'DisplayName': 'Brand New Product'})
+        invalidated = InstallPathCache(cache_path, backend=registry)
+        state = '已失效' if invalidated.get(names[0]) is MISS else '仍命中!'
+        print(f"安装新软件后重新加载缓存: {state}")
+        ok = ok and not invalidated.queries
+
+    speedup = percentile(uncached, 0.5) / max(median_hit, 1e-9)
+    print(f"\n缓存命中比直接查询快{speedup:.0f}倍")
+    if not ok:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+规范化去重性能测试
+项目名称项目组Seraphiel 作者 TraeAI - 日期 2025-11-19 版本 1.0
+描述: 在不同规模的合成清单上运行dedupe_records，检查耗时随记录数近似线性增长，
+      并统计合并掉的重复记录数量
+"""
+
+import argparse
+import time
+
+from synthetic import synthetic_duplicate_records
+
+import inventory_normalize
+from inventory_normalize import dedupe_records
+
+
+def clear_caches():
+    """清空发布者规则缓存，让每一轮都从冷缓存开始"""
+    inventory_normalize.canonical_publisher.cache_clear()
+    inventory_normalize.vendor_tokens.cache_clear()
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='规范化去重性能测试')
+    parser.add_argument('--records', type=int, default=100000, help='最大记录数量')
+    parser.add_argument('--steps', type=int, default=4, help='从小到大测试的规模个数')
+    args = parser.parse_args()
+
+    previous = None
+    for step in range(1, args.steps + 1):
+        count = args.records * step // args.steps
+        records = list(synthetic_duplicate_records(count))
+
+        clear_caches()
+        started = time.perf_counter()
+        merged = dedupe_records(records)
+        elapsed = time.perf_counter() - started
+
+        multi_source = sum(1 for record in merged if len(record.get('sources', ())) > 1)
+        per_record = elapsed / count * 1e6
+        growth = f", 单条耗时为上一规模的{per_record / previous:.2f}倍" if previous else ""
+        previous = per_record
+        print(f"{count} 条记录 -> {len(merged)} 条 ({multi_source}条来自多个来源): "
+              f"{elapsed * 1000:.1f}毫秒, 每条 {per_record:.2f}微秒{growth}")
+
+    for func in (inventory_normalize.canonical_publisher, inventory_normalize.vendor_tokens):
+        info = func.cache_info()
+        print(f"{func.__name__}缓存: 命中{info.hits}次, 未命中{info.misses}次, "
+              f"命中率{info.hits / max(info.hits + info.misses, 1):.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+并行安装路径查找测试
+项目名称项目组Seraphiel 作者 TraeAI - 日期 2025-11-19 版本 1.0
+描述: 用shims目录下的powershell替身程序回放录制的输出，比较原来依次查询三个卸载位置和应用商店应用，
+      与search_install_paths同时查询全部来源的耗时，两种方式的结果必须一致。
+      名称带单引号时单个查找与--names-file的批量查找结果也必须一致（引号不能截断-like条件）。
+      另外让其中一个查询一直挂起（SHIM_STALL），检查找到结果后它会被取消、超时后不会阻塞结果，
+      并且不留下powershell进程。结果不一致时以非零退出码结束。
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import time
+
+import synthetic  # noqa: F401  把仓库根目录加入sys.path
+
+SHIM_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'shims')
+
+# (说明, 名称, 是否搜索应用商店)
+LOOKUPS = [
+    ("第一个位置命中", "7-Zip", False),
+    ("只在应用商店", "WindowsTerminal", True),
+    ("未找到", "NoSuchProduct", True),
+]
+
+# 含单引号的名称，录制的输出中没有
+QUOTED_NAME = "o'brien"
+
+
+def legacy_lookup(software_name, search_store):
+    """改用并行查找之前的实现：依次查询三个卸载位置，都没找到时再查应用商店，作为对照"""
+    from get_software_install_path import REGISTRY_PATHS
+
+    for registry_path in REGISTRY_PATHS:
+        cmd = [
+            "powershell", "-Command",
+            f"Get-ItemProperty '{registry_path}' | "
+            f"Where-Object DisplayName -like '*{software_name}*' | "
+            f"Select-Object DisplayName, InstallLocation, UninstallString | "
+            f"ConvertTo-Json"
+        ]
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
+        if result.returncode == 0 and result.stdout.strip():
+            data = json.loads(result.stdout)
+            if isinstance(data, dict):
+                data = [data]
+            for item in data:
+                if item.get('DisplayName') and item.get('InstallLocation'):
+                    return {
+                        'name': item.get('DisplayName', ''),
+                        'install_path': item.get('InstallLocation', ''),
+                        'uninstall_string': item.get('UninstallString', '')
+                    }
+    if not search_store:
+        return None
+
+    cmd = [
+        "powershell", "-Command",
+        f"Get-AppxPackage | "
+        f"Where-Object Name -like '*{software_name}*' | "
+        f"Select-Object Name, InstallLocation | "
+        f"ConvertTo-Json"
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
+    if result.returncode == 0 and result.stdout.strip():
+        data = json.loads(result.stdout)
+        if isinstance(data, dict):
+            data = [data]
+        for app in data:
+            if app.get('Name') and app.get('InstallLocation'):
+                return {'name': app['Name'], 'install_path': app['InstallLocation'], 'type': '应用商店应用'}
+    return None
+
+
+def timed(func):
+    started = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - started
+
+
+def child_processes():
+    """当前进程仍在运行的子进程数（读取/proc，其他平台返回0）"""
+    if not os.path.isdir('/proc'):
+        return 0
+    count = 0
+    for pid in os.listdir('/proc'):
+        if not pid.isdigit():
+            continue
+        try:
+            with open(f'/proc/{pid}/stat', 'r') as f:
+                fields = f.read().rsplit(')', 1)[1].split()
+        except OSError:
+            continue
+        if int(fields[1]) == os.getpid() and fields[0] != 'Z':
+            count += 1
+    return count
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='并行安装路径查找测试（使用powershell替身程序）')
+    parser.add_argument('--records', type=int, default=600, help='每个查询回放的记录数')
+    parser.add_argument('--startup-latency', type=float, default=0.2, help='替身程序每次启动的模拟延迟（秒）')
+    parser.add_argument('--query-latency', type=float, default=0.1, help='每次查询的模拟延迟（秒）')
+    args = parser.parse_args()
+
+    os.environ['PATH'] = SHIM_DIR + os.pathsep + os.environ.get('PATH', '')
+    os.environ['SHIM_RECORDS'] = str(args.records)
+    os.environ['SHIM_STARTUP_LATENCY'] = str(args.startup_latency)
+    os.environ['SHIM_QUERY_LATENCY'] = str(args.query_latency)
+    os.environ.pop('SHIM_STALL', None)
+
+    from get_software_install_path import batch_install_paths, lookup_install_path, search_install_paths
+
+    ok = True
+    for label, name, search_store in LOOKUPS:
+        expected, legacy = timed(lambda: legacy_lookup(name, search_store))
+        result, parallel = timed(lambda: lookup_install_path(name, search_store))
+        same = result == expected
+        ok = ok and same
+        print(f"{label} ({name}): 依次查询 {legacy * 1000:.0f}毫秒, 并行 {parallel * 1000:.0f}毫秒, "
+              f"快{legacy / parallel:.1f}倍" + ("" if same else "  结果不一致!"))
+
+    matches, elapsed = timed(lambda: search_install_paths("Microsoft", True, first=False))
+    stores = sum(1 for match in matches if match.get('type'))
+    print(f"全部匹配 (Microsoft): {len(matches)}项, 其中应用商店应用{stores}项, {elapsed * 1000:.0f}毫秒")
+    ok = ok and stores > 0 and len(matches) > stores
+
+    single = search_install_paths(QUOTED_NAME, True, first=False)
+    batch = batch_install_paths([QUOTED_NAME], True)[QUOTED_NAME]
+    same = sorted(match['install_path'] for match in single) == sorted(match['install_path'] for match in batch)
+    ok = ok and same
+    print(f"带引号的名称 ({QUOTED_NAME}): 单个查找{len(single)}项, 批量查找{len(batch)}项"
+          + ("" if same else "  结果不一致!"))
+
+    # HKCU的查询一直挂起：前面的位置命中时应被取消，全部未命中时到超时为止
+    os.environ['SHIM_STALL'] = 'HKCU'
+    result, elapsed = timed(lambda: search_install_paths("7-Zip", timeout=5))
+    time.sleep(0.2)
+    left = child_processes()
+    print(f"挂起的查询, 命中: {elapsed * 1000:.0f}毫秒, 剩余子进程{left}个")
+    ok = ok and len(result) == 1 and elapsed < 5 and left == 0
+
+    result, elapsed = timed(lambda: search_install_paths("NoSuchProduct", timeout=2))
+    time.sleep(0.2)
+    left = child_processes()
+    print(f"挂起的查询, 未命中: {elapsed * 1000:.0f}毫秒 (超时2秒), 剩余子进程{left}个")
+    ok = ok and result == [] and elapsed < 3 and left == 0
+
+    if not ok:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
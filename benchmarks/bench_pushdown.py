@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+过滤条件下推测试
+项目名称项目组Seraphiel 作者 TraeAI - 日期 2025-11-19 版本 1.0
+描述: 用shims目录下的powershell/winget替身程序回放录制的输出，比较带过滤条件扫描时
+      运行全部采集任务再筛选，与plan_collectors只运行可能匹配的来源、并把条件下推到查询中的耗时。
+      替身程序会模拟执行下推的Where-Object子串条件和winget list --name，两种方式的结果必须一致，
+      winget list --name也只能返回名称包含该子串的行。
+"""
+
+import argparse
+import os
+import time
+
+import synthetic  # noqa: F401  把仓库根目录加入sys.path
+
+SHIM_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'shims')
+
+QUERIES = [
+    ({'type': '系统服务'}, False),
+    ({'type': '传统软件'}, False),
+    ({'publisher': 'microsoft'}, False),
+    ({'name': 'python'}, False),
+    ({'name': 'windows', 'type': '系统功能'}, False),
+    ({'type': '传统软件'}, True),
+]
+
+
+def scan(inventory, filters, dedupe, plan, session):
+    """采集、（可选）去重并筛选，返回 (结果, 耗时秒数, 采集条数)"""
+    started = time.perf_counter()
+    collectors = inventory.build_collectors(plan=plan)
+    collected, timings = inventory.run_collectors(collectors, session, progress=False)
+    records = inventory.dedupe_records(collected) if dedupe else collected
+    matched = inventory.filter_software(records, filters)
+    return matched, time.perf_counter() - started, len(collected)
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='过滤条件下推测试（使用powershell/winget替身程序）')
+    parser.add_argument('--records', type=int, default=2000, help='每个采集任务回放的记录数')
+    parser.add_argument('--startup-latency', type=float, default=0.0, help='替身程序每次启动的模拟延迟（秒）')
+    parser.add_argument('--query-latency', type=float, default=0.05, help='每次查询的模拟延迟（秒）')
+    args = parser.parse_args()
+
+    os.environ['PATH'] = SHIM_DIR + os.pathsep + os.environ.get('PATH', '')
+    os.environ['SHIM_RECORDS'] = str(args.records)
+    os.environ['SHIM_STARTUP_LATENCY'] = str(args.startup_latency)
+    os.environ['SHIM_QUERY_LATENCY'] = str(args.query_latency)
+    os.environ.pop('POWERSHELL_WORKER', None)
+
+    import get_all_windows_software as inventory
+    from powershell_session import PowerShellSession
+
+    ok = True
+    session = PowerShellSession()
+    try:
+        session.request("")  # 先启动常驻进程，不计入各次扫描
+        for filters, dedupe in QUERIES:
+            label = f"{filters}{' 去重' if dedupe else ''}"
+            expected, full_elapsed, full_count = scan(inventory, filters, dedupe, None, session)
+            plan = inventory.plan_collectors(filters, dedupe)
+            matched, planned_elapsed, planned_count = scan(inventory, filters, dedupe, plan, session)
+            same = matched == expected
+            ok = ok and same
+            print(f"{label}: {len(matched)}条结果")
+            print(f"  全部采集: {full_elapsed * 1000:.1f}毫秒 (采集{full_count}条)")
+            print(f"  下推后:   {planned_elapsed * 1000:.1f}毫秒 (运行{len(plan)}个来源, 采集{planned_count}条), "
+                  f"快{full_elapsed / planned_elapsed:.1f}倍" + ("" if same else "  结果不一致!"))
+    finally:
+        session.close()
+
+    # 替身程序的winget list --name只应返回名称包含该子串的行，否则下推后的采集条数会偏大
+    for name in ('python', 'zzzz'):
+        pushed = inventory.get_winget_apps({'name': name})
+        expected = [app for app in inventory.get_winget_apps() if name in app['name'].lower()]
+        same = pushed == expected
+        ok = ok and same
+        print(f"winget list --name {name}: {len(pushed)}条" + ("" if same else f"  应为{len(expected)}条!"))
+
+    if not ok:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+软件记录内存占用测试
+项目名称项目组Seraphiel 作者 TraeAI - 日期 2025-11-19 版本 1.0
+描述: 用tracemalloc比较把导出文件读入内存后，字典记录与SoftwareRecord每条记录占用的字节数。
+      分两种数据: 单机清单（名称各不相同）和多主机清单（同一批软件在多台主机上重复出现），
+      记录都从NDJSON文件解析得到，与diff、serve等读入导出文件的情况一致。
+"""
+
+import argparse
+import gc
+import itertools
+import os
+import tempfile
+import time
+import tracemalloc
+
+from synthetic import synthetic_catalog, synthetic_host_records, synthetic_records
+
+from export_writer import export_records, read_records
+
+PER_HOST = 150
+
+
+def fleet_records(count, seed=0):
+    """多台主机的记录首尾相接，共count条"""
+    catalog = synthetic_catalog(3000, seed)
+    hosts = (synthetic_host_records(catalog, PER_HOST, seed + host) for host in itertools.count())
+    return itertools.islice(itertools.chain.from_iterable(hosts), count)
+
+
+def measure_load(path, compact):
+    """读入全部记录，返回 (记录列表, 读入后仍占用的字节数, 峰值字节数, 耗时秒数)"""
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    records = list(read_records(path, compact=compact))
+    elapsed = time.perf_counter() - started
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return records, current, peak, elapsed
+
+
+def report(kind, count, current, peak, elapsed):
+    print(f"  {kind:>14}: 每条{current / count:6.0f}字节, 共{current / 1024 / 1024:7.1f}MB, "
+          f"峰值{peak / 1024 / 1024:7.1f}MB, 读入{elapsed:.2f}秒")
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='软件记录内存占用测试')
+    parser.add_argument('--records', type=int, default=1000000, help='记录数量')
+    args = parser.parse_args()
+
+    datasets = [
+        ('单机清单', lambda: synthetic_records(args.records)),
+        ('多主机清单', lambda: fleet_records(args.records)),
+    ]
+    ok = True
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for label, generate in datasets:
+            path = os.path.join(temp_dir, 'records.ndjson')
+            count = export_records(generate(), path, 'ndjson')
+            print(f"{label}: {count}条记录, 文件{os.path.getsize(path) / 1024 / 1024:.1f}MB")
+
+            records, dict_bytes, peak, elapsed = measure_load(path, compact=False)
+            report('字典', count, dict_bytes, peak, elapsed)
+            # 先释放字典记录再测下一种，两份数据不同时占用内存
+            records = None
+            records, compact_bytes, peak, elapsed = measure_load(path, compact=True)
+            report('SoftwareRecord', count, compact_bytes, peak, elapsed)
+            print(f"  每条节省{(dict_bytes - compact_bytes) / count:.0f}字节 ({1 - compact_bytes / dict_bytes:.0%})")
+
+            # 导出时转换回字典，结果应与原文件逐字节相同
+            copy = os.path.join(temp_dir, 'copy.ndjson')
+            export_records(records, copy, 'ndjson')
+            with open(path, 'rb') as original, open(copy, 'rb') as exported:
+                same = original.read() == exported.read()
+            print(f"  重新导出与原文件{'一致' if same else '不一致!'}")
+            ok = ok and same
+            records = None
+
+    if not ok:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
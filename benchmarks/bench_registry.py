@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+注册表枚举性能测试
+项目名称项目组Seraphiel 作者 TraeAI - 日期 2025-11-19 版本 1.0
+描述: 在内存注册表上测量卸载项枚举和安装路径查找的耗时，可在Linux上运行。
+      增量扫描在无变化时重新读取了值、或结果与完整扫描不一致时以非零退出码结束
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from synthetic import synthetic_uninstall_registry
+
+from get_all_windows_software import UNINSTALL_FIELDS, get_registry_software
+from registry_backend import UNINSTALL_KEYS, list_subkeys
+from get_software_install_path import get_software_install_path
+
+
+def timed(func, repeat):
+    """执行repeat次，返回 (最后一次结果, 最短耗时秒数)"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='注册表枚举性能测试')
+    parser.add_argument('--keys', type=int, default=5000, help='合成卸载项数量')
+    parser.add_argument('--repeat', type=int, default=5, help='重复次数（取最短耗时）')
+    parser.add_argument('--changes', type=int, default=10, help='增量扫描测试中修改的卸载项数量')
+    args = parser.parse_args()
+
+    registry = synthetic_uninstall_registry(args.keys)
+
+    software, elapsed = timed(lambda: get_registry_software(backend=registry), args.repeat)
+    print(f"枚举 {len(software)} 个卸载项: {elapsed * 1000:.1f}毫秒 "
+          f"({elapsed / max(1, len(software)) * 1e6:.1f}微秒/项)")
+
+    target = software[-1]['name']
+    found, elapsed = timed(lambda: get_software_install_path(target, backend=registry), args.repeat)
+    print(f"查找最后一个安装路径 ({'命中' if found else '未命中'}): {elapsed * 1000:.1f}毫秒")
+
+    missing, elapsed = timed(lambda: get_software_install_path("NoSuchProduct", backend=registry), args.repeat)
+    print(f"查找不存在的软件: {elapsed * 1000:.1f}毫秒")
+
+    if not bench_incremental(registry, args.changes):
+        raise SystemExit(1)
+
+
+def bench_incremental(registry, changes):
+    """比较首次扫描与增量扫描，并统计增量扫描实际读取的值数量
+
+    无变化时不应读取任何值，修改若干项后只应重新读取这些项，结果都要与完整扫描一致；不满足时返回False。
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cache_path = os.path.join(temp_dir, 'uninstall_cache.json')
+
+        _, cold = timed(lambda: get_registry_software(backend=registry, cache_path=cache_path), 1)
+
+        registry.counters['value'] = 0
+        _, warm = timed(lambda: get_registry_software(backend=registry, cache_path=cache_path), 1)
+        unchanged_reads = registry.counters['value']
+
+        # 修改少量卸载项后再扫描一次
+        hive, root = UNINSTALL_KEYS[0]
+        subkeys = list_subkeys(registry, hive, root)[:changes]
+        for name in subkeys:
+            registry.set_value(hive, f"{root}\\{name}", 'DisplayVersion', '99.0')
+        registry.counters['value'] = 0
+        incremental, changed = timed(lambda: get_registry_software(backend=registry, cache_path=cache_path), 1)
+        changed_reads = registry.counters['value']
+    full = get_registry_software(backend=registry)
+    expected_reads = len(subkeys) * len(UNINSTALL_FIELDS)
+
+    print(f"增量扫描: 首次{cold * 1000:.1f}毫秒, 无变化{warm * 1000:.1f}毫秒(读取值{unchanged_reads}次), "
+          f"修改{len(subkeys)}项后{changed * 1000:.1f}毫秒(读取值{changed_reads}次, 预期{expected_reads}次)")
+    same = incremental == full
+    if not same:
+        print("增量扫描结果与完整扫描不一致!")
+    return same and unchanged_reads == 0 and changed_reads == expected_reads
+
+
+if __name__ == "__main__":
+    main()
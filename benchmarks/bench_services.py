@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+服务清单增量扫描测试
+项目名称项目组Seraphiel 作者 TraeAI - 日期 2025-11-19 版本 1.0
+描述: 在内存注册表上构造Services键，比较完整扫描与增量扫描的耗时和读取的值数量，
+      并检查增量扫描在无变化、修改启动类型、新增和删除服务之后的结果都与完整扫描一致。
+      运行状态查询使用shims目录下的powershell替身程序，可在Linux上运行。
+      结果不一致时以非零退出码结束。
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from synthetic import synthetic_services_registry
+
+from get_all_windows_software import SERVICE_FIELDS, get_services
+from registry_backend import SERVICES_KEYS, list_subkeys
+
+SHIM_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'shims')
+
+
+def timed(func):
+    started = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - started
+
+
+def scan(registry, cache_path):
+    """增量扫描一次，返回 (结果, 耗时, 读取的值数量)"""
+    registry.counters['value'] = 0
+    services, elapsed = timed(lambda: get_services(backend=registry, cache_path=cache_path))
+    return services, elapsed, registry.counters['value']
+
+
+def check(label, services, registry, expected_reads, reads):
+    """与完整扫描的结果和预期的读取次数比较"""
+    full = get_services(backend=registry)
+    ok = services == full and reads == expected_reads
+    print(f"  {label}: 读取值{reads}次 (预期{expected_reads}次), 与完整扫描{'一致' if services == full else '不一致!'}")
+    return ok
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='服务清单增量扫描测试')
+    parser.add_argument('--services', type=int, default=2000, help='合成服务键数量（约四分之一是驱动程序）')
+    parser.add_argument('--changes', type=int, default=10, help='修改启动类型的服务数量')
+    args = parser.parse_args()
+
+    os.environ['PATH'] = SHIM_DIR + os.pathsep + os.environ.get('PATH', '')
+    os.environ.pop('POWERSHELL_WORKER', None)
+
+    registry = synthetic_services_registry(args.services)
+    hive, root = SERVICES_KEYS[0]
+    fields = len(SERVICE_FIELDS)
+
+    registry.counters['value'] = 0
+    full, elapsed = timed(lambda: get_services(backend=registry))
+    print(f"完整扫描: {len(full)}个服务, {elapsed * 1000:.1f}毫秒, 读取值{registry.counters['value']}次")
+    disabled = sum(1 for service in full if service['start_type'] == 'Disabled')
+    automatic = sum(1 for service in full if service['start_type'].startswith('Automatic'))
+    print(f"  其中已禁用{disabled}个, 自动启动{automatic}个")
+
+    ok = True
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cache_path = os.path.join(temp_dir, 'service_cache.json')
+
+        services, cold, reads = scan(registry, cache_path)
+        print(f"增量扫描首次: {cold * 1000:.1f}毫秒")
+        ok = check("首次", services, registry, args.services * fields, reads) and ok
+
+        services, warm, reads = scan(registry, cache_path)
+        print(f"增量扫描无变化: {warm * 1000:.1f}毫秒")
+        ok = check("无变化", services, registry, 0, reads) and ok
+
+        # 修改若干服务的启动类型，删除一个服务，再安装一个新服务
+        names = list_subkeys(registry, hive, root)
+        for name in names[:args.changes]:
+            registry.set_value(hive, f"{root}\\{name}", 'Start', 4)
+        registry.delete_key(hive, f"{root}\\{names[-1]}")
+        registry.set_key(hive, f"{root}\\NewSynthSvc", {
+            'DisplayName': 'New Synthetic Service', 'Type': 0x10, 'Start': 2,
+            'ImagePath': 'C:\\Program Files\\New\\new.exe', 'ObjectName': 'LocalSystem',
+        })
+        services, changed, reads = scan(registry, cache_path)
+        print(f"增量扫描修改{args.changes}个、删除1个、新增1个后: {changed * 1000:.1f}毫秒")
+        ok = check("修改后", services, registry, (args.changes + 1) * fields, reads) and ok
+        ok = ok and not any(service['service_name'] == names[-1] for service in services)
+
+    if not ok:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
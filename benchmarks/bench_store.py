@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SQLite清单库查询测试
+项目名称项目组Seraphiel 作者 TraeAI - 日期 2025-11-19 版本 1.0
+描述: 把多台主机的合成扫描结果写入InventoryStore，比较名称/发布者子串查询走FTS5 trigram索引
+      与逐行LIKE的耗时，核对两者结果相同，并用EXPLAIN QUERY PLAN确认三个字符以上的子串查询用到了全文索引。
+      另外检查版本号过滤对超长数字段（时间戳形式的构建号）的顺序，旧版本数据库打开时重新计算排序键，
+      更新版本程序写入的数据库拒绝打开。
+      结果不一致或没有用到索引时以非零退出码结束。
+"""
+
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+
+from synthetic import synthetic_records
+
+from inventory_store import SCHEMA_VERSION, InventoryStore
+
+QUERIES = [
+    {'name': 'visual studio'},
+    {'name': 'code 12'},
+    {'publisher': 'microsoft'},
+    {'name': 'driver', 'publisher': 'nvidia', 'type': '传统软件'},
+    {'name': 'no such product'},
+    {'name': 'sd'},
+]
+
+
+def best_of(func, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+# 版本号过滤的分界，数字段超过10位
+VERSION_THRESHOLD = '1.100000000000'
+
+# (版本号, 是否不低于VERSION_THRESHOLD)
+VERSIONS = [('1.9', False), ('1.0000000002', False), ('1.9999999999', False),
+            ('1.100000000000', True), ('1.100000000000.1', True), ('1.20251119093000', True)]
+
+
+def version_names(store, filters):
+    return sorted(record['version'] for record in store.query(dict(filters, latest=False)))
+
+
+def check_versions(path):
+    """版本号过滤的顺序；把库改成旧版本（排序键作废）后重新打开应恢复正确结果；结构版本更新的库拒绝打开"""
+    expected = (sorted(version for version, newer in VERSIONS if not newer),
+                sorted(version for version, newer in VERSIONS if newer))
+    with InventoryStore(path) as store:
+        store.append_scan([{'type': '传统软件', 'name': 'Product', 'version': version} for version, _ in VERSIONS],
+                          'HOST-VERSION')
+        fresh = (version_names(store, {'version_below': VERSION_THRESHOLD}),
+                 version_names(store, {'version_at_least': VERSION_THRESHOLD}))
+
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute("UPDATE registry_software SET version_key = '0000000001'")
+        conn.execute("UPDATE meta SET value = '2' WHERE key = 'schema_version'")
+    conn.close()
+    with InventoryStore(path) as store:
+        migrated = (version_names(store, {'version_below': VERSION_THRESHOLD}),
+                    version_names(store, {'version_at_least': VERSION_THRESHOLD}))
+        upgraded = store.conn.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()[0]
+
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute("UPDATE meta SET value = ? WHERE key = 'schema_version'", (str(SCHEMA_VERSION + 1),))
+    conn.close()
+    try:
+        InventoryStore(path).close()
+        refused = False
+    except ValueError:
+        refused = True
+
+    ok = fresh == expected and migrated == expected and upgraded == str(SCHEMA_VERSION) and refused
+    print(f"版本号过滤: 低于{VERSION_THRESHOLD} {fresh[0]}, 不低于 {fresh[1]}"
+          + ("" if fresh == expected else "  顺序不对!"))
+    print(f"旧版本数据库: 重新计算排序键后{'结果一致' if migrated == expected else '结果不对!'}, "
+          f"结构版本 {upgraded}; 更新版本的数据库{'拒绝打开' if refused else '被打开了!'}")
+    return ok
+
+
+def uses_fts(plans):
+    """每张表的查询计划都用到了全文索引"""
+    return all(any('VIRTUAL TABLE INDEX' in step for step in steps) for steps in plans.values())
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='SQLite清单库查询测试')
+    parser.add_argument('--hosts', type=int, default=10, help='主机数量')
+    parser.add_argument('--records', type=int, default=10000, help='每台主机的记录数')
+    parser.add_argument('--repeat', type=int, default=3, help='重复次数（取最短耗时）')
+    args = parser.parse_args()
+
+    ok = True
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, 'inventory.db')
+        with InventoryStore(path) as store:
+            if not store.fts:
+                print("当前SQLite不支持FTS5 trigram，只能逐行LIKE")
+                raise SystemExit(1)
+            started = time.perf_counter()
+            for host in range(args.hosts):
+                store.append_scan(synthetic_records(args.records, seed=host), f"HOST-{host:03d}")
+            print(f"写入{args.hosts}台主机 x {args.records}条: {(time.perf_counter() - started) * 1000:.0f}毫秒")
+
+            for query in QUERIES:
+                filters = dict(query, latest=False)
+                indexed, fts_elapsed = best_of(lambda: store.query(filters), args.repeat)
+                store.fts = False
+                expected, like_elapsed = best_of(lambda: store.query(filters), args.repeat)
+                store.fts = True
+
+                same = indexed == expected
+                needs_index = any(len(query.get(key) or '') >= 3 for key in ('name', 'publisher'))
+                planned = uses_fts(store.query_plan(filters)) if needs_index else True
+                ok = ok and same and planned
+                print(f"{query}: 全文索引 {fts_elapsed * 1000:.1f}毫秒, 逐行LIKE {like_elapsed * 1000:.1f}毫秒, "
+                      f"快{like_elapsed / max(fts_elapsed, 1e-9):.1f}倍, {len(indexed)}条"
+                      + ("" if same else "  结果不一致!") + ("" if planned else "  未使用全文索引!"))
+
+        ok = check_versions(os.path.join(temp_dir, 'versions.db')) and ok
+
+    if not ok:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+winget输出解析测试
+项目名称项目组Seraphiel 作者 TraeAI - 日期 2025-11-19 版本 1.0
+描述: 用fixtures目录下录制的winget输出核对解析结果（与*.expected.json逐条比较），
+      检查用winget export补全被截断的包标识，再把表格行复制放大，比较按空白拆分的旧解析方式与按列位置切分的耗时，并核对放大后的解析结果。
+      结果不一致时以非零退出码结束。
+"""
+
+import argparse
+import json
+import os
+import time
+
+import synthetic  # noqa: F401  把仓库根目录加入sys.path
+
+from get_all_windows_software import complete_winget_ids, truncated_winget_ids
+from winget_parser import parse_list_output, read_export_file
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+LIST_FIXTURES = ['winget_list_en', 'winget_list_zh']
+
+
+def split_parser(stdout):
+    """改用列位置解析之前的get_winget_apps实现，作为对照"""
+    winget_apps = []
+    lines = stdout.split('\n')
+    for line in lines[3:]:  # 跳过表头
+        if line.strip() and '---' not in line:
+            parts = line.split()
+            if len(parts) >= 3:
+                name = ' '.join(parts[1:-2])
+                version = parts[-2]
+                publisher = parts[-1] if parts[-1] != 'Unknown' else '未知'
+
+                winget_apps.append({
+                    'type': 'winget应用',
+                    'name': name,
+                    'version': version,
+                    'publisher': publisher
+                })
+    return winget_apps
+
+
+def read_text(name):
+    with open(os.path.join(FIXTURES, name + '.txt'), 'r', encoding='utf-8', newline='') as f:
+        return f.read()
+
+
+def read_expected(name):
+    with open(os.path.join(FIXTURES, name + '.expected.json'), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def check(name, actual):
+    expected = read_expected(name)
+    mismatches = [(a, e) for a, e in zip(actual, expected) if a != e]
+    if len(actual) != len(expected) or mismatches:
+        print(f"{name}: 不一致! 解析出{len(actual)}条, 期望{len(expected)}条")
+        for a, e in mismatches[:5]:
+            print(f"  实际: {a}\n  期望: {e}")
+        return False
+    print(f"{name}: {len(actual)}条, 与期望一致")
+    return True
+
+
+def check_complete_ids():
+    """把英文样例中来自源的包标识截断，用winget export的结果补全后应与原来相同；前缀对应多个包时保持截断"""
+    records = parse_list_output(read_text('winget_list_en'))
+    expected = [dict(record) for record in records]
+    for record in records:
+        if record['source']:
+            record['package_id'] = record['package_id'][:-3] + '…'
+    # "Python.…"同时是Python.Python.3.11和Python.Launcher的前缀，无法确定
+    ambiguous = next(record for record in records if record['package_id'] == 'Python.Launc…')
+    ambiguous['package_id'] = 'Python.…'
+    complete_winget_ids(truncated_winget_ids(records), read_export_file(os.path.join(FIXTURES, 'winget_export.json')))
+
+    expected[records.index(ambiguous)]['package_id'] = 'Python.…'
+    same = records == expected
+    print(f"补全截断的包标识: {sum(1 for record in records if record['source']) - 1}条补全, 1条前缀不唯一保持截断"
+          + ("" if same else "  结果不一致!"))
+    return same
+
+
+def enlarge(text, rows):
+    """把表格数据行重复到rows行，表头和表格后的提示保持不变"""
+    lines = text.split('\n')
+    separator = next(index for index, line in enumerate(lines) if line.strip() and not line.strip().strip('-'))
+    end = lines.index('', separator)
+    body = lines[separator + 1:end]
+    repeated = (body * (rows // len(body) + 1))[:rows]
+    return '\n'.join(lines[:separator + 1] + repeated + lines[end:])
+
+
+def best_of(func, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='winget输出解析测试')
+    parser.add_argument('--rows', type=int, default=50000, help='放大后的表格行数')
+    parser.add_argument('--repeat', type=int, default=3, help='重复次数（取最短耗时）')
+    args = parser.parse_args()
+
+    ok = True
+    for name in LIST_FIXTURES:
+        ok = check(name, parse_list_output(read_text(name))) and ok
+    ok = check('winget_export', read_export_file(os.path.join(FIXTURES, 'winget_export.json'))) and ok
+    ok = check_complete_ids() and ok
+
+    print()
+    for name in LIST_FIXTURES:
+        text = enlarge(read_text(name), args.rows)
+        old, old_time = best_of(lambda: split_parser(text), args.repeat)
+        new, new_time = best_of(lambda: parse_list_output(text), args.repeat)
+        # 固定样例中每个数据行对应一条记录，放大后的结果就是期望结果的重复
+        expected = read_expected(name)
+        same = new == (expected * (args.rows // len(expected) + 1))[:args.rows]
+        ok = ok and same
+        print(f"{name} ×{args.rows}行: 按空白拆分 {old_time * 1000:.1f}毫秒, "
+              f"按列切分 {new_time * 1000:.1f}毫秒 (是前者的{new_time / max(old_time, 1e-9):.1f}倍, "
+              f"{len(new)}条, {args.rows / max(new_time, 1e-9):.0f}行/秒)" + ("" if same else "  结果不一致!"))
+
+    if not ok:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+替身程序共用的回放逻辑
+项目名称项目组Seraphiel 作者 TraeAI - 日期 2025-11-19 版本 1.0
+描述: 读取fixtures目录下录制的PowerShell和winget输出，按环境变量放大到指定条数并模拟延迟:
+      SHIM_RECORDS           每个采集任务回放的记录数（默认200）
+      SHIM_STARTUP_LATENCY   每次启动进程时等待的秒数，模拟powershell/winget冷启动（默认0）
+      SHIM_QUERY_LATENCY     每次查询等待的秒数（默认0）
+      SHIM_WINGET_EXPORT     设为0时winget export失败，winget list中被截断的包标识保持原样（默认1）
+      SHIM_STALL             脚本包含该子串时一直挂起，模拟卡住的查询（默认不设置）
+      SHIM_MANIFEST_LATENCY  脚本读取Appx包清单时每个包额外等待的秒数（默认0）
+      脚本中下推到Where-Object的子串条件、-like '*子串*' 和 @(...) -contains 条件会按录制的字段模拟执行，
+      只回放满足条件的记录。
+"""
+
+import json
+import os
+import re
+import time
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'fixtures')
+
+# 脚本中的关键字 -> (录制文件, 放大时需要加编号以保持唯一的名称字段（一个或多个）)
+POWERSHELL_FIXTURES = [
+    ('Uninstall', 'registry.jsonl', 'DisplayName'),
+    ('Get-AppxPackage', 'appx.jsonl', ('Name', 'PackageFullName')),
+    ('Get-WindowsOptionalFeature', 'features.jsonl', 'FeatureName'),
+    ('Win32_Service', 'services_cim.jsonl', 'DisplayName'),
+    ('Get-Service', 'services.jsonl', 'DisplayName'),
+]
+
+# 调用方下推到Where-Object中的子串条件: ([string]($_.字段)).IndexOf('子串', ...)
+PUSHDOWN_CONDITION = re.compile(r"\(\[string\]\(\$_\.(\w+)\)\)\.IndexOf\('((?:[^']|'')*)'")
+
+# Where-Object 字段 -like '*子串*'（get_software_install_path的单个查找）
+LIKE_CONDITION = re.compile(r"(\w+) -like '\*((?:[^'*]|'')*)\*'")
+
+# Where-Object { @('值1', '值2') -contains $_.字段 }（按PackageFullName获取Appx包详情）
+MEMBERSHIP_CONDITION = re.compile(r"@\(((?:'(?:[^']|'')*'\s*,?\s*)*)\) -contains \$_\.(\w+)")
+QUOTED = re.compile(r"'((?:[^']|'')*)'")
+
+# 注册表查询分三次（三个Uninstall位置），每次回放总数的三分之一
+REGISTRY_QUERIES = 3
+
+
+def env_float(name, default=0.0):
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def record_count():
+    return max(0, int(env_float('SHIM_RECORDS', 200)))
+
+
+def startup_delay():
+    time.sleep(env_float('SHIM_STARTUP_LATENCY'))
+
+
+def query_delay():
+    time.sleep(env_float('SHIM_QUERY_LATENCY'))
+
+
+def stall(script):
+    """脚本包含SHIM_STALL时挂起，直到被调用方结束"""
+    keyword = os.environ.get('SHIM_STALL')
+    if keyword and keyword in script:
+        while True:
+            time.sleep(3600)
+
+
+def _read_jsonl(name):
+    with open(os.path.join(FIXTURES, 'powershell', name), 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def scaled(records, count, name_field):
+    """循环使用录制的记录凑够count条，第二轮起在名称后加编号"""
+    name_fields = (name_field,) if isinstance(name_field, str) else name_field
+    for index in range(count):
+        record = records[index % len(records)]
+        round_number = index // len(records)
+        if round_number:
+            record = dict(record)
+            for field in name_fields:
+                if record.get(field):
+                    record[field] = f"{record[field]} {round_number}"
+        yield record
+
+
+def pushdown_conditions(script):
+    """脚本中下推的子串条件 [(字段, 小写子串), ...]；其他形式的条件不模拟，照常输出全部记录"""
+    matches = PUSHDOWN_CONDITION.findall(script) + LIKE_CONDITION.findall(script)
+    return [(field, needle.replace("''", "'").lower()) for field, needle in matches]
+
+
+def powershell_lines(script):
+    """按脚本内容选择录制的输出，逐行产出紧凑JSON"""
+    conditions = pushdown_conditions(script)
+    members = [(field, {value.replace("''", "'") for value in QUOTED.findall(values)})
+               for values, field in MEMBERSHIP_CONDITION.findall(script)]
+    for keyword, fixture, name_field in POWERSHELL_FIXTURES:
+        if keyword in script:
+            count = record_count()
+            if keyword == 'Uninstall':
+                count = -(-count // REGISTRY_QUERIES)
+            manifest_delay = env_float('SHIM_MANIFEST_LATENCY') if 'Get-AppxPackageManifest' in script else 0
+            for record in scaled(_read_jsonl(fixture), count, name_field):
+                if all(needle in str(record.get(field) or '').lower() for field, needle in conditions) and \
+                        all(record.get(field) in values for field, values in members):
+                    if manifest_delay:
+                        time.sleep(manifest_delay)
+                    yield json.dumps(record, ensure_ascii=False, separators=(',', ':'))
+            return
+
+
+def winget_list_text(name=None):
+    """把录制的winget list表格放大到SHIM_RECORDS行；给出name时与winget list --name一样只保留名称包含它的行"""
+    with open(os.path.join(FIXTURES, 'winget_list_en.txt'), 'r', encoding='utf-8', newline='') as f:
+        lines = f.read().split('\n')
+    separator = next(index for index, line in enumerate(lines) if line.strip() and not line.strip().strip('-'))
+    end = lines.index('', separator)
+    body = lines[separator + 1:end]
+
+    rows = []
+    for index in range(record_count()):
+        row = body[index % len(body)]
+        round_number = index // len(body)
+        if round_number:
+            # 名称列宽41，在名称末尾的空白里写编号，不改变列位置
+            row_name = row[:41].rstrip()
+            row = f"{row_name} {round_number}"[:40].ljust(41) + row[41:]
+        if name is None or name.lower() in row[:41].lower():
+            rows.append(row)
+    return '\n'.join(lines[:separator + 1] + rows + lines[end:])
+
+
+def winget_export_data():
+    """把录制的winget export结果放大到SHIM_RECORDS个包"""
+    with open(os.path.join(FIXTURES, 'winget_export.json'), 'r', encoding='utf-8-sig') as f:
+        data = json.load(f)
+    source = data['Sources'][0]
+    source['Packages'] = list(scaled(source['Packages'], record_count(), 'PackageIdentifier'))
+    return data
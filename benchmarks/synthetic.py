@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+性能测试用的合成数据
+项目名称项目组Seraphiel 作者 TraeAI - 日期 2025-11-19 版本 1.0
+描述: 生成可复现的合成注册表和软件清单，供benchmarks目录下的各个测试脚本使用
+"""
+
+import json
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from registry_backend import APPX_PACKAGES_KEYS, FakeRegistry, SERVICES_KEYS, UNINSTALL_KEYS
+
+PUBLISHERS = [
+    "Microsoft Corporation", "Google LLC", "Adobe Inc.", "Oracle Corporation",
+    "JetBrains s.r.o.", "Mozilla", "Intel Corporation", "NVIDIA Corporation",
+    "Python Software Foundation", "Tencent", "Alibaba", "7-Zip", "VideoLAN",
+]
+
+WORDS = [
+    "Visual", "Studio", "Code", "Office", "Runtime", "Redistributable", "Driver",
+    "Toolkit", "Player", "Browser", "Update", "Helper", "SDK", "Tools", "Server",
+    "Client", "Manager", "Audio", "Graphics", "Python", "Java", "Edge", "Chrome",
+]
+
+
+def synthetic_name(rng, index):
+    words = rng.sample(WORDS, rng.randint(2, 4))
+    return f"{' '.join(words)} {index}"
+
+
+def synthetic_version(rng):
+    return ".".join(str(rng.randint(0, 30)) for _ in range(rng.randint(2, 4)))
+
+
+def synthetic_uninstall_registry(count, seed=0):
+    """构造一个带count个卸载项的FakeRegistry，平均分布在三个Uninstall位置"""
+    rng = random.Random(seed)
+    registry = FakeRegistry()
+    for index in range(count):
+        hive, root = UNINSTALL_KEYS[index % len(UNINSTALL_KEYS)]
+        name = synthetic_name(rng, index)
+        registry.set_key(hive, f"{root}\\{{{index:08X}-SYNTH}}", {
+            'DisplayName': name,
+            'DisplayVersion': synthetic_version(rng),
+            'Publisher': rng.choice(PUBLISHERS),
+            'InstallDate': f"2025{rng.randint(1, 12):02d}{rng.randint(1, 28):02d}",
+            'InstallLocation': f"C:\\Program Files\\{name}",
+            'UninstallString': f"\"C:\\Program Files\\{name}\\uninstall.exe\"",
+        })
+    return registry
+
+
+SERVICE_ACCOUNTS = ["LocalSystem", "NT AUTHORITY\\LocalService", "NT AUTHORITY\\NetworkService"]
+
+
+def synthetic_services_registry(count, seed=0):
+    """构造一个带count个服务键的FakeRegistry，约四分之一是驱动程序，部分显示名称是未解析的资源字符串"""
+    rng = random.Random(seed)
+    registry = FakeRegistry()
+    hive, root = SERVICES_KEYS[0]
+    for index in range(count):
+        name = f"SynthSvc{index:05d}"
+        if index % 4 == 3:
+            registry.set_key(hive, f"{root}\\{name}", {
+                'Type': 1,
+                'Start': rng.choice([0, 1, 3]),
+                'ImagePath': f"\\SystemRoot\\System32\\drivers\\{name}.sys",
+            })
+            continue
+        shared = rng.random() < 0.6
+        display_name = synthetic_name(rng, index)
+        registry.set_key(hive, f"{root}\\{name}", {
+            'DisplayName': f"@%SystemRoot%\\system32\\{name}.dll,-100" if index % 10 == 0 else display_name,
+            'Type': 0x20 if shared else 0x10,
+            'Start': rng.choice([2, 2, 3, 3, 3, 4]),
+            'DelayedAutostart': rng.choice([0, 0, 1]),
+            'ImagePath': ("C:\\WINDOWS\\system32\\svchost.exe -k netsvcs -p" if shared
+                          else f"\"C:\\Program Files\\{display_name}\\{name}.exe\""),
+            'ObjectName': rng.choice(SERVICE_ACCOUNTS),
+        })
+        if shared:
+            registry.set_key(hive, f"{root}\\{name}\\Parameters", {'ServiceDll': f"%SystemRoot%\\system32\\{name}.dll"})
+    return registry
+
+
+def synthetic_appx_registry(full_names):
+    """构造一个FakeRegistry，AppModel\\Repository\\Packages下每个包全名一个子键"""
+    registry = FakeRegistry()
+    hive, root = APPX_PACKAGES_KEYS[0]
+    for full_name in full_names:
+        registry.set_key(hive, f"{root}\\{full_name}", {'PackageID': full_name})
+    return registry
+
+
+SOURCE_TYPES = ['传统软件', '应用商店应用', 'winget应用', '系统功能', '系统服务']
+
+
+def synthetic_records(count, seed=0):
+    """逐条产出count条合成软件记录，字段与各采集函数的输出一致"""
+    rng = random.Random(seed)
+    for index in range(count):
+        record_type = SOURCE_TYPES[index % len(SOURCE_TYPES)]
+        record = {
+            'type': record_type,
+            'name': synthetic_name(rng, index),
+            'version': synthetic_version(rng),
+            'publisher': rng.choice(PUBLISHERS),
+        }
+        if record_type == '传统软件':
+            record['install_date'] = f"2025{rng.randint(1, 12):02d}{rng.randint(1, 28):02d}"
+            record['uninstall_string'] = f"C:\\Program Files\\{record['name']}\\uninstall.exe"
+        yield record
+
+
+def synthetic_catalog(size, seed=0):
+    """生成size种软件组成的目录，每种软件带2~4个常见版本"""
+    rng = random.Random(seed)
+    catalog = []
+    for index in range(size):
+        catalog.append({
+            'type': rng.choice(SOURCE_TYPES[:3]),
+            'name': synthetic_name(rng, index),
+            'publisher': rng.choice(PUBLISHERS),
+            'versions': [synthetic_version(rng) for _ in range(rng.randint(2, 4))],
+        })
+    return catalog
+
+
+def synthetic_host_records(catalog, per_host, seed):
+    """从目录中为一台主机抽取per_host种软件"""
+    rng = random.Random(seed)
+    records = []
+    for product in rng.sample(catalog, min(per_host, len(catalog))):
+        records.append({
+            'type': product['type'],
+            'name': product['name'],
+            'version': rng.choice(product['versions']),
+            'publisher': product['publisher'],
+        })
+    return records
+
+
+def write_synthetic_fleet(directory, hosts, per_host=150, catalog_size=3000, seed=0):
+    """在directory下为每台主机建一个子目录并写入windows_software_report.json"""
+    catalog = synthetic_catalog(catalog_size, seed)
+    for host in range(hosts):
+        host_dir = os.path.join(directory, f"HOST-{host:05d}")
+        os.makedirs(host_dir, exist_ok=True)
+        with open(os.path.join(host_dir, 'windows_software_report.json'), 'w', encoding='utf-8') as f:
+            json.dump(synthetic_host_records(catalog, per_host, seed + host), f, ensure_ascii=False, indent=2)
+
+
+APPX_PUBLISHERS = {
+    "Microsoft Corporation": "CN=Microsoft Corporation, O=Microsoft Corporation, L=Redmond, S=Washington, C=US",
+}
+
+
+def synthetic_duplicate_records(count, seed=0):
+    """逐条产出count条软件记录，其中部分软件同时以注册表、winget和Appx的不同写法出现
+
+    winget名称会被截断或带架构后缀，Appx名称是"发布者.驼峰名"形式，用于测试去重。
+    """
+    rng = random.Random(seed)
+    emitted = 0
+    index = 0
+    while emitted < count:
+        words = rng.sample(WORDS, rng.randint(2, 4))
+        name = f"{' '.join(words)} {index}"
+        publisher = rng.choice(PUBLISHERS)
+        version = synthetic_version(rng)
+        index += 1
+
+        variants = [{'type': '传统软件', 'name': f"{name} (x64)", 'version': version, 'publisher': publisher,
+                     'install_date': f"2025{rng.randint(1, 12):02d}{rng.randint(1, 28):02d}"}]
+        if rng.random() < 0.5:
+            variants.append({'type': 'winget应用', 'name': name, 'version': version + ".0", 'publisher': '未知'})
+        if rng.random() < 0.3:
+            prefix = publisher.split()[0].replace('.', '')
+            variants.append({'type': '应用商店应用', 'name': f"{prefix}.{''.join(words)}{index - 1}",
+                             'version': version, 'publisher': APPX_PUBLISHERS.get(publisher, f"CN={publisher}"),
+                             'package_name': f"{prefix}.{''.join(words)}{index - 1}_{version}_x64__8wekyb3d8bbwe"})
+        if rng.random() < 0.1:
+            variants.append({'type': '系统服务', 'name': f"{words[0]}Svc{index - 1}", 'service_name': f"svc{index - 1}",
+                             'status': 'Running'})
+
+        for record in variants[:count - emitted]:
+            emitted += 1
+            yield record
+
+
+# 真实的软件显示名，模糊匹配测试的查询目标
+PRODUCT_NAMES = [
+    "Microsoft Visual Studio Code (User)", "Microsoft Visual Studio Community 2022", "Google Chrome",
+    "Mozilla Firefox (x64 en-US)", "Adobe Acrobat Reader DC", "7-Zip 23.01 (x64)", "Notepad++ (64-bit x64)",
+    "VLC media player", "Python 3.11.4 (64-bit)", "Python Launcher", "Git", "WinRAR 6.24 (64-bit)",
+    "Microsoft Visual C++ 2015-2022 Redistributable (x64) - 14.38.33130", "NVIDIA Graphics Driver 546.33",
+    "Microsoft Edge", "Microsoft Teams", "Zoom", "Slack", "Docker Desktop", "Node.js", "PuTTY release 0.79 (64-bit)",
+    "JetBrains PyCharm Community Edition 2023.3", "IntelliJ IDEA Community Edition 2023.3", "Oracle VM VirtualBox 7.0.12",
+    "TortoiseGit 2.15.0.0 (64 bit)", "WinSCP 6.1.2", "FileZilla 3.66.4", "Steam", "Spotify", "OBS Studio",
+]
+
+
+FILLER_WORDS = [
+    "Data", "Sync", "Backup", "Cloud", "Media", "Scanner", "Monitor", "Agent", "Service", "Suite",
+    "Desktop", "Connector", "Viewer", "Editor", "Converter", "Recorder", "Launcher", "Assistant",
+    "Center", "Framework", "Security", "Remote", "Print", "Network", "Studio", "Driver", "Update",
+]
+
+SYLLABLES = ["zen", "tri", "vo", "lex", "mar", "qua", "dor", "ix", "sol", "nu", "ra", "kin", "pho", "tel", "ga"]
+
+
+def synthetic_display_names(count, seed=0):
+    """count个显示名：PRODUCT_NAMES加上由虚构厂商名和常见单词拼成的名称（带版本号）"""
+    rng = random.Random(seed)
+    vendors = [''.join(rng.sample(SYLLABLES, rng.randint(2, 3))).capitalize() for _ in range(400)]
+    names = list(PRODUCT_NAMES[:count])
+    while len(names) < count:
+        words = rng.sample(FILLER_WORDS, rng.randint(1, 3))
+        names.append(f"{rng.choice(vendors)} {' '.join(words)} {synthetic_version(rng)}")
+    rng.shuffle(names)
+    return names
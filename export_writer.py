@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+流式导出写入器
+项目名称项目组Seraphiel 作者 TraeAI - 日期 2025-11-19 版本 1.0
+描述: 逐条写出软件记录，支持JSON数组、NDJSON（每行一条JSON）和文本格式，
+      可选gzip/bz2/xz/zstd压缩。默认先写临时文件，全部写完后再改名为目标文件，
+      导出中途失败不会覆盖已有的结果文件；改名前把权限换成与直接新建文件相同。
+      内存占用与记录数量无关。
+      read_records按同样的格式逐条读回导出文件。
+"""
+
+import bz2
+import codecs
+import gzip
+import io
+import itertools
+import json
+import lzma
+import os
+import stat
+import tempfile
+
+from software_record import compact_record, json_default
+
+try:
+    import zstandard
+except ImportError:  # zstd压缩是可选功能
+    zstandard = None
+
+EXPORT_FORMATS = ['json', 'ndjson', 'txt']
+
+# 读取时先取开头这么多字节判断是JSON数组还是NDJSON
+READ_HEAD_SIZE = 4096
+
+# JSON数组格式每攒够这么多条记录编码一次
+JSON_BATCH_SIZE = 1000
+
+COMPRESSION_SUFFIXES = {
+    'gzip': '.gz',
+    'bz2': '.bz2',
+    'xz': '.xz',
+    'zstd': '.zst',
+}
+
+
+def _current_umask():
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+# 进程的umask，新建导出文件的权限按它计算（与open()新建文件时一样）
+UMASK = _current_umask()
+
+
+def replace_file(temp_path, path):
+    """把写完的临时文件改名为目标文件
+
+    mkstemp创建的文件权限是0600，直接改名会让导出文件只有当前用户能读。
+    改名前换成目标文件原有的权限，目标文件不存在时用umask决定的新文件权限。
+    """
+    try:
+        mode = stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        mode = 0o666 & ~UMASK
+    os.chmod(temp_path, mode)
+    os.replace(temp_path, path)
+
+
+def export_path(output_dir, filename, compression=None):
+    """拼接导出文件的完整路径，压缩时追加对应的扩展名"""
+    if compression:
+        filename += COMPRESSION_SUFFIXES[compression]
+    return os.path.join(output_dir, filename)
+
+
+def _compressed_stream(raw, compression):
+    """在二进制文件对象外包一层压缩流"""
+    if compression is None:
+        return raw
+    if compression == 'gzip':
+        return gzip.GzipFile(fileobj=raw, mode='wb')
+    if compression == 'bz2':
+        return bz2.BZ2File(raw, mode='wb')
+    if compression == 'xz':
+        return lzma.LZMAFile(raw, mode='wb')
+    if compression == 'zstd':
+        if zstandard is None:
+            raise ValueError("zstd压缩需要安装zstandard模块: pip install zstandard")
+        return zstandard.ZstdCompressor().stream_writer(raw, closefd=False)
+    raise ValueError(f"不支持的压缩方式: {compression}")
+
+
+class ExportWriter:
+    """流式导出写入器，记录写入后即可释放
+
+    用法:
+        with ExportWriter(path, 'ndjson', compression='gzip') as writer:
+            for record in records:
+                writer.write(record)
+    """
+
+    def __init__(self, path, format_type='json', compression=None, atomic=True):
+        if format_type not in EXPORT_FORMATS:
+            raise ValueError(f"不支持的导出格式: {format_type}")
+        if compression is not None and compression not in COMPRESSION_SUFFIXES:
+            raise ValueError(f"不支持的压缩方式: {compression}")
+
+        self.path = path
+        self.format_type = format_type
+        self.compression = compression
+        self.atomic = atomic
+        self.count = 0
+
+        self._raw = None
+        self._text = None
+        self._temp_path = None
+        self._encoder = json.JSONEncoder(ensure_ascii=False, indent=2, default=json_default)
+        self._pending = []
+        self._encoded = 0
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def open(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+
+        if self.atomic:
+            fd, self._temp_path = tempfile.mkstemp(prefix='.tmp-', dir=directory)
+            self._raw = os.fdopen(fd, 'wb')
+        else:
+            self._raw = open(self.path, 'wb')
+
+        try:
+            binary = _compressed_stream(self._raw, self.compression)
+        except ValueError:
+            self.abort()
+            raise
+        self._text = io.TextIOWrapper(binary, encoding='utf-8')
+
+        if self.format_type == 'json':
+            self._text.write("[")
+
+    def write(self, record):
+        """写入一条记录
+
+        JSON数组格式先攒够JSON_BATCH_SIZE条再一起编码，写入后到下一次编码之前不要修改记录。
+        """
+        if self.format_type == 'ndjson':
+            self._text.write(json.dumps(record, ensure_ascii=False, default=json_default))
+            self._text.write("\n")
+        elif self.format_type == 'json':
+            self._pending.append(record)
+            if len(self._pending) >= JSON_BATCH_SIZE:
+                self._flush_json()
+        else:
+            raise ValueError("文本格式请使用write_text写入")
+        self.count += 1
+
+    def _flush_json(self):
+        """把攒下的记录编码成数组元素写出
+
+        整批编码成一个缩进数组后去掉首尾的"["和"\\n]"，元素的缩进正好是顶层数组里的一层，
+        与 json.dump(data, indent=2) 的输出逐字节一致；逐条编码再补缩进要慢一倍。
+        """
+        if not self._pending:
+            return
+        if self._encoded:
+            self._text.write(",")
+        self._text.write(self._encoder.encode(self._pending)[1:-2])
+        self._encoded += len(self._pending)
+        self._pending = []
+
+    def write_all(self, records):
+        """写入可迭代对象中的全部记录，返回写入条数"""
+        for record in records:
+            self.write(record)
+        return self.count
+
+    def write_text(self, text):
+        """写入一段文本（文本格式导出使用）"""
+        self._text.write(text)
+
+    def close(self):
+        """写完收尾内容并提交文件"""
+        if self._text is None:
+            return
+        if self.format_type == 'json':
+            self._flush_json()
+            self._text.write("\n]" if self.count else "]")
+        self._close_streams()
+        if self.atomic:
+            replace_file(self._temp_path, self.path)
+            self._temp_path = None
+
+    def abort(self):
+        """放弃本次导出，删除临时文件"""
+        self._pending = []
+        try:
+            self._close_streams()
+        except (OSError, ValueError):
+            pass
+        if self._temp_path:
+            try:
+                os.remove(self._temp_path)
+            except OSError:
+                pass
+            self._temp_path = None
+
+    def _close_streams(self):
+        text, raw = self._text, self._raw
+        self._text = self._raw = None
+        try:
+            if text is not None:
+                text.close()
+        finally:
+            # 压缩流关闭时不会关闭传入的文件对象，需要单独关闭
+            if raw is not None:
+                raw.close()
+
+
+def export_records(records, path, format_type='json', compression=None, atomic=True):
+    """把可迭代的记录流式写入文件，返回写入条数"""
+    with ExportWriter(path, format_type, compression, atomic) as writer:
+        return writer.write_all(records)
+
+
+def _open_compressed(path):
+    """按扩展名打开（可能压缩的）导出文件，返回二进制文件对象"""
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rb')
+    if path.endswith('.bz2'):
+        return bz2.open(path, 'rb')
+    if path.endswith('.xz'):
+        return lzma.open(path, 'rb')
+    if path.endswith('.zst'):
+        if zstandard is None:
+            raise ValueError("读取zstd文件需要安装zstandard模块: pip install zstandard")
+        raw = open(path, 'rb')
+        return zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+    return open(path, 'rb')
+
+
+def read_records(path, compact=False):
+    """逐条读取导出文件中的记录，支持JSON数组和NDJSON，以及上面的各种压缩格式
+
+    NDJSON逐行解析；JSON数组需要整体解析（直接解析字节串，省去一次解码和拼接），
+    但单台主机的导出文件通常不大。compact为True时产出SoftwareRecord，适合需要把记录留在内存中的调用方。
+    """
+    with _open_compressed(path) as binary:
+        head = binary.read(READ_HEAD_SIZE)
+        if head.startswith(codecs.BOM_UTF8):
+            head = head[len(codecs.BOM_UTF8):]
+        while head and not head.strip():
+            more = binary.read(READ_HEAD_SIZE)
+            if not more:
+                break
+            head += more
+
+        if head.lstrip()[:1] == b'[':
+            data = json.loads(head + binary.read())
+            for index, record in enumerate(data):
+                if isinstance(record, dict):
+                    if compact:
+                        # 边转换边释放解析出的字典，不让两份数据同时留在内存中
+                        data[index] = None
+                        record = compact_record(record)
+                    yield record
+            return
+
+        # 补齐到行尾，保证开头这一段不会截断多字节字符
+        head += binary.readline()
+        lines = head.decode('utf-8').splitlines()
+        for line in itertools.chain(lines, io.TextIOWrapper(binary, encoding='utf-8')):
+            line = line.strip()
+            if line:
+                record = json.loads(line)
+                yield compact_record(record) if compact else record
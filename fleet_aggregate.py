@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多主机软件清单汇总
+项目名称项目组Seraphiel 作者 TraeAI - 日期 2025-11-19 版本 1.0
+描述: 把大量主机的导出文件（windows_software_report.json等）按块分发给进程池，
+      每个进程解析一块文件并归约成部分汇总，主进程再逐块合并。
+      主进程只保存汇总结果，内存占用取决于软件种类数和块大小，与主机数量无关。
+"""
+
+import json
+import os
+import time
+from multiprocessing import Pool
+
+from export_writer import read_records
+
+EXPORT_SUFFIXES = ('.json', '.ndjson', '.gz', '.bz2', '.xz', '.zst')
+
+# 汇总中最多保留的错误明细条数，其余只计数
+MAX_ERROR_DETAILS = 100
+
+
+def iter_export_files(paths):
+    """展开文件和目录参数，逐个产出导出文件路径"""
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    if name.endswith(EXPORT_SUFFIXES):
+                        yield os.path.join(root, name)
+        else:
+            yield path
+
+
+def empty_summary():
+    return {
+        'hosts': 0,
+        'records': 0,
+        'error_count': 0,
+        'errors': [],
+        'software': {},
+        'publishers': {},
+    }
+
+
+def summarize_file(summary, path):
+    """把一台主机的导出文件归约进summary
+
+    同一台主机上重复出现的软件只计一次主机数，版本分布按主机计数。
+    """
+    versions_by_name = {}
+    publisher_records = {}
+    records = 0
+
+    for record in read_records(path):
+        name = record.get('name')
+        if not name:
+            continue
+        records += 1
+        versions_by_name.setdefault(name, set()).add(record.get('version') or '')
+        publisher = record.get('publisher') or ''
+        publisher_records[publisher] = publisher_records.get(publisher, 0) + 1
+
+    summary['hosts'] += 1
+    summary['records'] += records
+
+    software = summary['software']
+    for name, versions in versions_by_name.items():
+        entry = software.get(name)
+        if entry is None:
+            entry = software[name] = {'hosts': 0, 'versions': {}}
+        entry['hosts'] += 1
+        entry_versions = entry['versions']
+        for version in versions:
+            entry_versions[version] = entry_versions.get(version, 0) + 1
+
+    publishers = summary['publishers']
+    for publisher, count in publisher_records.items():
+        entry = publishers.get(publisher)
+        if entry is None:
+            entry = publishers[publisher] = {'hosts': 0, 'records': 0}
+        entry['hosts'] += 1
+        entry['records'] += count
+
+
+def _record_error(summary, path, error):
+    summary['error_count'] += 1
+    if len(summary['errors']) < MAX_ERROR_DETAILS:
+        summary['errors'].append({'path': path, 'error': str(error)})
+
+
+def summarize_chunk(paths):
+    """进程池任务：汇总一块文件，单个文件出错只记录错误"""
+    summary = empty_summary()
+    for path in paths:
+        try:
+            summarize_file(summary, path)
+        except Exception as e:
+            _record_error(summary, path, e)
+    return summary
+
+
+def merge_summary(total, partial):
+    """把部分汇总合并进total"""
+    total['hosts'] += partial['hosts']
+    total['records'] += partial['records']
+    total['error_count'] += partial['error_count']
+    room = MAX_ERROR_DETAILS - len(total['errors'])
+    if room > 0:
+        total['errors'].extend(partial['errors'][:room])
+
+    software = total['software']
+    for name, partial_entry in partial['software'].items():
+        entry = software.get(name)
+        if entry is None:
+            software[name] = partial_entry
+            continue
+        entry['hosts'] += partial_entry['hosts']
+        versions = entry['versions']
+        for version, count in partial_entry['versions'].items():
+            versions[version] = versions.get(version, 0) + count
+
+    publishers = total['publishers']
+    for publisher, partial_entry in partial['publishers'].items():
+        entry = publishers.get(publisher)
+        if entry is None:
+            publishers[publisher] = partial_entry
+            continue
+        entry['hosts'] += partial_entry['hosts']
+        entry['records'] += partial_entry['records']
+    return total
+
+
+def _chunks(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def aggregate_files(paths, workers=None, chunk_size=64):
+    """汇总多个导出文件，workers为1时在当前进程中执行"""
+    total = empty_summary()
+    chunks = _chunks(iter_export_files(paths), chunk_size)
+
+    if workers == 1:
+        for chunk in chunks:
+            merge_summary(total, summarize_chunk(chunk))
+        return total
+
+    with Pool(processes=workers) as pool:
+        # 部分结果完成一块合并一块，不在主进程中堆积
+        for partial in pool.imap_unordered(summarize_chunk, chunks):
+            merge_summary(total, partial)
+    return total
+
+
+def summary_report(summary, top=None):
+    """把汇总结果整理成可直接输出的报告，软件和发布者按主机数降序排列"""
+    software = sorted(summary['software'].items(), key=lambda item: (-item[1]['hosts'], item[0]))
+    publishers = sorted(summary['publishers'].items(), key=lambda item: (-item[1]['hosts'], item[0]))
+    if top:
+        software = software[:top]
+        publishers = publishers[:top]
+
+    return {
+        'hosts': summary['hosts'],
+        'records': summary['records'],
+        'error_count': summary['error_count'],
+        'errors': summary['errors'],
+        'software': [
+            {
+                'name': name,
+                'hosts': entry['hosts'],
+                'versions': dict(sorted(entry['versions'].items(), key=lambda item: (-item[1], item[0]))),
+            }
+            for name, entry in software
+        ],
+        'publishers': [
+            {'publisher': publisher, 'hosts': entry['hosts'], 'records': entry['records']}
+            for publisher, entry in publishers
+        ],
+    }
+
+
+def add_aggregate_arguments(parser):
+    """为aggregate子命令添加参数"""
+    parser.add_argument('paths', nargs='+', help='导出文件或包含导出文件的目录')
+    parser.add_argument('--workers', type=int, default=None, help='进程数（默认CPU核数）')
+    parser.add_argument('--chunk-size', type=int, default=64, help='每个任务处理的文件数')
+    parser.add_argument('--top', type=int, default=20, help='屏幕上显示的软件和发布者数量')
+    parser.add_argument('--output', help='把完整汇总写入JSON文件')
+
+
+def run_aggregate(args):
+    """执行aggregate子命令"""
+    started = time.perf_counter()
+    summary = aggregate_files(args.paths, args.workers, max(1, args.chunk_size))
+    elapsed = time.perf_counter() - started
+
+    print(f"汇总完成: {summary['hosts']}台主机, {summary['records']}条记录, "
+          f"{len(summary['software'])}种软件, 耗时{elapsed:.2f}秒")
+    if summary['error_count']:
+        print(f"有 {summary['error_count']} 个文件无法解析:")
+        for error in summary['errors'][:10]:
+            print(f"  {error['path']}: {error['error']}")
+
+    report = summary_report(summary, args.top)
+    print(f"\n安装最多的软件 (前{len(report['software'])}):")
+    for entry in report['software']:
+        versions = ", ".join(f"{version or '未知'}×{count}" for version, count in list(entry['versions'].items())[:3])
+        print(f"  {entry['name']}: {entry['hosts']}台主机 ({versions})")
+
+    print(f"\n发布者 (前{len(report['publishers'])}):")
+    for entry in report['publishers']:
+        print(f"  {entry['publisher'] or '未知'}: {entry['hosts']}台主机, {entry['records']}条记录")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(summary_report(summary), f, ensure_ascii=False, indent=2)
+        print(f"\n完整汇总已导出到: {os.path.abspath(args.output)}")
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+软件名称模糊匹配
+项目名称项目组Seraphiel 作者 TraeAI - 日期 2025-11-19 版本 1.0
+描述: 按不精确的名称查找软件，例如 "vscode" 找到 "Microsoft Visual Studio Code"，
+      "firefx" 找到 "Mozilla Firefox"。名称先用inventory_normalize.canonical_name拆成单词，
+      去掉版本号、架构等干扰；所有显示名预先建立三字母组（trigram）索引，查询时只对共享
+      足够多三字母组的候选计算得分，不必对每个名称都计算编辑距离。
+
+得分（0~100）取以下几种方式的最大值:
+    完全相同 100；查询包含在名称中 80~100；按单词前缀缩写（vscode = visual studio code）70~85；
+    按单词比较（允许单词拼写错误或只写前缀）最多75；单个词拼写错误（有界编辑距离）50~60
+"""
+
+import heapq
+import re
+from collections import Counter
+
+from inventory_normalize import canonical_name
+
+GRAM_SIZE = 3
+
+# 至少共享查询中这个比例的三字母组才进入候选，最多保留这么多个候选参与计算得分
+MIN_GRAM_OVERLAP = 0.3
+MAX_CANDIDATES = 300
+
+MIN_SCORE = 50
+DEFAULT_TOP = 5
+
+_FALLBACK_WORD = re.compile(r'[^\W_]+', re.UNICODE)
+
+
+def name_tokens(name):
+    """名称的单词序列；canonical_name把名称清理空了（例如只有版本号）时退回按字母数字拆分"""
+    tokens = canonical_name(name)
+    if not tokens:
+        tokens = tuple(_FALLBACK_WORD.findall(name.lower()))
+    return tokens
+
+
+def name_grams(compact):
+    """带首尾标记的三字母组，短查询也能靠首尾的组命中"""
+    padded = f"^{compact}$"
+    return {padded[i:i + GRAM_SIZE] for i in range(len(padded) - GRAM_SIZE + 1)}
+
+
+def edit_distance(first, second, limit):
+    """两个字符串之间的编辑距离（相邻字符交换算一次），一旦确定超过limit就提前返回limit + 1"""
+    if abs(len(first) - len(second)) > limit:
+        return limit + 1
+    previous2 = None
+    previous = list(range(len(second) + 1))
+    for i, char in enumerate(first, 1):
+        current = [i] + [0] * len(second)
+        for j in range(1, len(second) + 1):
+            cost = 0 if char == second[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (previous2 is not None and j > 1 and char == second[j - 2]
+                    and first[i - 2] == second[j - 1]):
+                value = min(value, previous2[j - 2] + 1)
+            current[j] = value
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1] if previous[-1] <= limit else limit + 1
+
+
+def typo_limit(length):
+    """允许的拼写错误数: 一般1个，8个字符以上的长词2个"""
+    return 1 if length < 8 else 2
+
+
+def abbreviation_tokens(query, tokens):
+    """query能否由若干单词的前缀按顺序拼成（可以跳过单词），返回最多用到的单词数，不能时返回0"""
+    memo = {}
+
+    def consume(position, start):
+        if position == len(query):
+            return 0
+        key = (position, start)
+        if key in memo:
+            return memo[key]
+        best = -1
+        for index in range(start, len(tokens)):
+            token = tokens[index]
+            length = 0
+            while (length < len(token) and position + length < len(query)
+                   and token[length] == query[position + length]):
+                length += 1
+                rest = consume(position + length, index + 1)
+                if rest >= 0:
+                    best = max(best, rest + 1)
+        memo[key] = best
+        return best
+
+    used = consume(0, 0)
+    return used if used >= 2 else 0
+
+
+def token_similarity(query_token, token):
+    if query_token == token:
+        return 1.0
+    if len(query_token) >= 3 and token.startswith(query_token):
+        return 0.7
+    if len(query_token) >= 4:
+        limit = typo_limit(len(query_token))
+        if edit_distance(query_token, token, limit) <= limit:
+            return 0.8
+    return 0.0
+
+
+def score_name(query_tokens, query_compact, tokens, compact):
+    """按模块说明中的几种方式计算得分，取最大值"""
+    if not query_compact or not compact:
+        return 0.0
+    if query_compact == compact:
+        return 100.0
+    if query_compact in compact:
+        return 80.0 + 20.0 * len(query_compact) / len(compact)
+
+    score = 0.0
+    used = abbreviation_tokens(query_compact, tokens)
+    if used:
+        score = 70.0 + 15.0 * used / len(tokens)
+
+    if len(query_tokens) > 1 or len(tokens) > 1:
+        matched = sum(max((token_similarity(query_token, token) for token in tokens), default=0.0)
+                      for query_token in query_tokens)
+        if matched:
+            coverage = matched / len(query_tokens)
+            score = max(score, 75.0 * coverage * (0.8 + 0.2 * min(1.0, len(query_tokens) / len(tokens))))
+
+    if score < 60 and len(query_tokens) == 1:
+        # 单个词的拼写错误：与名称中的每个单词以及相邻两个单词连在一起比较（多个词的查询已按单词比较过）
+        limit = typo_limit(len(query_compact))
+        pieces = list(tokens) + [tokens[i] + tokens[i + 1] for i in range(len(tokens) - 1)]
+        distance = min((edit_distance(query_compact, piece, limit) for piece in pieces), default=limit + 1)
+        if distance <= limit:
+            score = max(score, 60.0 - 10.0 * (distance - 1))
+    return score
+
+
+class FuzzyResolver:
+    """在一组记录的名称上做模糊查找，索引建立一次后可以反复查询"""
+
+    def __init__(self, records, field='name'):
+        self.records = list(records)
+        self.tokens = []
+        self.compact = []
+        postings = {}
+        for record_id, record in enumerate(self.records):
+            tokens = name_tokens(record.get(field) or '')
+            compact = ''.join(tokens)
+            self.tokens.append(tokens)
+            self.compact.append(compact)
+            for gram in name_grams(compact):
+                postings.setdefault(gram, []).append(record_id)
+        self.postings = postings
+
+    def __len__(self):
+        return len(self.records)
+
+    def candidates(self, query_compact):
+        """按共享三字母组的数量筛选候选记录编号；查询太短时返回全部"""
+        grams = name_grams(query_compact)
+        if len(query_compact) < GRAM_SIZE:
+            return range(len(self.records))
+        shared = Counter()
+        for gram in grams:
+            posting = self.postings.get(gram)
+            if posting:
+                shared.update(posting)
+        needed = max(1, round(len(grams) * MIN_GRAM_OVERLAP))
+        selected = [(count, record_id) for record_id, count in shared.items() if count >= needed]
+        if len(selected) > MAX_CANDIDATES:
+            selected = heapq.nlargest(MAX_CANDIDATES, selected, key=lambda item: (item[0], -item[1]))
+        return [record_id for _, record_id in selected]
+
+    def resolve(self, query, top=DEFAULT_TOP, min_score=MIN_SCORE, prune=True):
+        """返回得分最高的top个 (得分, 记录)；得分相同时名称较短、顺序靠前的优先
+
+        prune为False时对全部记录计算得分，用于和索引筛选的结果对照。
+        """
+        query_tokens = name_tokens(query)
+        query_compact = ''.join(query_tokens)
+        if not query_compact:
+            return []
+        record_ids = self.candidates(query_compact) if prune else range(len(self.records))
+
+        scored = []
+        for record_id in record_ids:
+            score = score_name(query_tokens, query_compact, self.tokens[record_id], self.compact[record_id])
+            if score >= min_score:
+                scored.append((score, -len(self.compact[record_id]), -record_id))
+        best = heapq.nlargest(top, scored)
+        return [(round(score, 1), self.records[-negative_id]) for score, _, negative_id in best]
@@ -7,15 +7,91 @@ Windows系统完整软件信息获取工具
 """
 
 import subprocess
-import json
 import argparse
 from datetime import datetime
 import os
+import tempfile
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 
-def get_registry_software():
-    """从注册表获取传统安装的软件信息"""
-    software_list = []
-    
+import trace_events
+from powershell_session import PowerShellSession, PowerShellSessionPool, ps_quote, stream_json_records
+from registry_backend import default_backend, iter_uninstall_entries, values_match, SERVICES_KEYS, UNINSTALL_KEYS
+from inventory_normalize import dedupe_records, SOFTWARE_SOURCES
+from software_record import SoftwareRecord, compact_records
+from winget_parser import parse_list_output, read_export_file
+from export_writer import ExportWriter, EXPORT_FORMATS, COMPRESSION_SUFFIXES, export_path
+from report_output import iter_chunks, print_results, render_summary, render_text_report, write_chunks
+from fleet_aggregate import add_aggregate_arguments, run_aggregate
+from inventory_diff import add_diff_arguments, run_diff
+from inventory_columnar import add_columnar_arguments, run_columnar
+from inventory_service import add_serve_arguments, run_serve
+from inventory_store import InventoryStore, add_query_arguments, run_query
+from appx_cache import APPX_CACHE_FILE, APPX_SELECT, load_appx_packages
+from scan_cache import current_host, default_cache_dir, load_cache, save_cache, incremental_registry_scan
+
+UNINSTALL_FIELDS = ['DisplayName', 'DisplayVersion', 'Publisher', 'InstallDate', 'UninstallString', 'InstallLocation']
+
+# 修改UNINSTALL_FIELDS时需要同时提升版本号，让旧缓存失效
+UNINSTALL_CACHE_KIND = 'uninstall'
+UNINSTALL_CACHE_VERSION = 2
+
+# Services下每个服务键中读取的值；Type用来排除驱动程序，只保留Get-Service能看到的Win32服务
+SERVICE_FIELDS = ['DisplayName', 'Start', 'Type', 'ImagePath', 'ObjectName', 'DelayedAutostart']
+SERVICE_CACHE_KIND = 'services'
+SERVICE_CACHE_VERSION = 1
+SERVICE_WIN32 = 0x30
+
+# Start值 -> 启动类型，名称与Get-Service的StartType一致
+SERVICE_START_TYPES = {0: 'Boot', 1: 'System', 2: 'Automatic', 3: 'Manual', 4: 'Disabled'}
+
+# PowerShell 5.1的ConvertTo-Json把ServiceControllerStatus输出为数字
+SERVICE_STATUSES = {1: 'Stopped', 2: 'StartPending', 3: 'StopPending', 4: 'Running',
+                    5: 'ContinuePending', 6: 'PausePending', 7: 'Paused'}
+
+# 附加在PowerShell管道末尾：每个对象单独输出一行紧凑JSON，便于流式解析
+JSON_LINES = " | ForEach-Object { $_ | ConvertTo-Json -Compress }"
+
+# 各采集任务产出的记录类型，按输出顺序排列
+COLLECTOR_TYPES = ['传统软件', '应用商店应用', 'winget应用', '系统功能', '系统服务']
+
+# 来源中取值固定的字段：winget不输出发布者，系统功能和服务没有发布者
+SOURCE_FIXED_FIELDS = {
+    'winget应用': {'publisher': '未知'},
+    '系统功能': {'publisher': ''},
+    '系统服务': {'publisher': ''},
+}
+
+# 下推到注册表查询时，过滤字段对应的卸载项值名
+REGISTRY_FILTER_FIELDS = {'name': 'DisplayName', 'publisher': 'Publisher'}
+
+# 在缓存的Appx包详情上判断过滤条件时，过滤字段对应的详情字段
+APPX_WHERE_FIELDS = {'name': 'Name', 'publisher': 'Publisher'}
+
+def get_registry_software(session=None, backend=None, cache_path=None, where=None):
+    """从注册表获取传统安装的软件信息
+    
+    有winreg时直接读注册表，否则通过PowerShell查询；backend可传入FakeRegistry等替代实现。
+    指定cache_path时进行增量扫描，只重新读取最后写入时间变化过的卸载项。
+    where为plan_collectors下推的名称/发布者条件，只返回可能满足条件的记录。
+    """
+    if backend is None:
+        backend = default_backend()
+    if backend is not None:
+        if cache_path:
+            return get_registry_software_incremental(backend, cache_path, where)
+        return get_registry_software_native(backend, where)
+    
+    return list(iter_registry_software_powershell(session, where))
+
+def registry_where(where):
+    """把下推的过滤条件换成卸载项的值名"""
+    return {REGISTRY_FILTER_FIELDS[key]: needle for key, needle in (where or {}).items()}
+
+def iter_registry_software_powershell(session=None, where=None):
+    """通过PowerShell逐条读取卸载项"""
     # 获取64位系统上的软件（Wow6432Node）
     registry_paths = [
         "HKLM:\\Software\\Wow6432Node\\Microsoft\\Windows\\CurrentVersion\\Uninstall\\*",
@@ -24,101 +100,217 @@ def get_registry_software():
     ]
     
     for registry_path in registry_paths:
-        try:
-            cmd = [
-                "powershell", "-Command",
-                f"Get-ItemProperty '{registry_path}' | "
-                f"Select-Object DisplayName, DisplayVersion, Publisher, InstallDate, UninstallString | "
-                f"Where-Object {{$_.DisplayName -ne $null}} | "
-                f"ConvertTo-Json"
-            ]
-            
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=20)
-            
-            if result.returncode == 0 and result.stdout.strip():
-                data = json.loads(result.stdout)
-                if isinstance(data, dict):
-                    data = [data]
-                
-                for item in data:
-                    if item.get('DisplayName'):
-                        software_list.append({
-                            'type': '传统软件',
-                            'name': item.get('DisplayName', ''),
-                            'version': item.get('DisplayVersion', ''),
-                            'publisher': item.get('Publisher', ''),
-                            'install_date': item.get('InstallDate', ''),
-                            'uninstall_string': item.get('UninstallString', '')
-                        })
+        script = (
+            f"Get-ItemProperty '{registry_path}' | "
+            f"Select-Object DisplayName, DisplayVersion, Publisher, InstallDate, UninstallString, InstallLocation"
+        ) + ps_where(["$_.DisplayName -ne $null"] + ps_conditions(where, {
+            'name': "$_.DisplayName",
+            'publisher': "$_.Publisher",
+        })) + JSON_LINES
         
-        except Exception as e:
-            print(f"获取注册表路径 {registry_path} 时出错: {e}")
+        for item in stream_records(script, 20, session, f"获取注册表路径 {registry_path}"):
+            if item.get('DisplayName'):
+                yield make_registry_record(item)
+
+def get_registry_software_native(backend, where=None):
+    """通过注册表后端直接枚举三个Uninstall位置"""
+    software_list = []
+    
+    try:
+        for hive, root, subkey, values in iter_uninstall_entries(backend, UNINSTALL_FIELDS,
+                                                                 where=registry_where(where)):
+            if values.get('DisplayName'):
+                software_list.append(make_registry_record(values))
+    except Exception as e:
+        print(f"读取注册表时出错: {e}")
     
     return software_list
 
-def get_store_apps():
-    """获取Windows应用商店应用"""
-    store_apps = []
+def get_registry_software_incremental(backend, cache_path, where=None):
+    """借助磁盘缓存增量枚举卸载项
+    
+    缓存需要完整的条目，因此所有卸载项照常增量读取，where只决定哪些条目转换成记录。
+    """
+    software_list = []
+    value_where = registry_where(where)
     
     try:
-        cmd = [
-            "powershell", "-Command",
-            "Get-AppxPackage | "
-            "Select-Object Name, Version, PackageFullName, Publisher, InstallLocation | "
-            "ConvertTo-Json"
-        ]
+        cached = load_cache(cache_path, UNINSTALL_CACHE_KIND, UNINSTALL_CACHE_VERSION)
+        entries, stats = incremental_registry_scan(backend, UNINSTALL_KEYS, UNINSTALL_FIELDS, cached)
+        
+        # 条目顺序与枚举顺序一致，因此输出顺序和完整扫描相同
+        for entry in entries.values():
+            if entry['values'].get('DisplayName') and values_match(entry['values'], value_where):
+                software_list.append(make_registry_record(entry['values']))
         
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=15)
+        if cached is None or stats['read'] or stats['removed']:
+            save_cache(cache_path, UNINSTALL_CACHE_KIND, UNINSTALL_CACHE_VERSION, entries)
         
-        if result.returncode == 0 and result.stdout.strip():
-            data = json.loads(result.stdout)
-            if isinstance(data, dict):
-                data = [data]
-            
-            for app in data:
-                if app.get('Name'):
-                    store_apps.append({
-                        'type': '应用商店应用',
-                        'name': app.get('Name', ''),
-                        'version': str(app.get('Version', '')),
-                        'publisher': app.get('Publisher', ''),
-                        'package_name': app.get('PackageFullName', ''),
-                        'install_location': app.get('InstallLocation', '')
-                    })
+        print(f"   注册表增量扫描: 复用{stats['reused']}项, 重新读取{stats['read']}项, 移除{stats['removed']}项")
+    except Exception as e:
+        print(f"增量读取注册表时出错: {e}")
+        return get_registry_software_native(backend, where)
     
+    return software_list
+
+def make_registry_record(values):
+    """把卸载项的注册表值转换成软件记录"""
+    return SoftwareRecord(
+        type='传统软件',
+        name=values.get('DisplayName') or '',
+        version=values.get('DisplayVersion') or '',
+        publisher=values.get('Publisher') or '',
+        install_date=values.get('InstallDate') or '',
+        uninstall_string=values.get('UninstallString') or '',
+        install_location=values.get('InstallLocation') or ''
+    )
+
+def stream_records(script, timeout, session, label):
+    """流式读取每行一条的JSON记录
+    
+    单条记录损坏只跳过该条；查询中途出错时保留已经读到的记录。
+    """
+    errors = []
+    try:
+        yield from stream_json_records(script, timeout=timeout, session=session, errors=errors)
     except Exception as e:
-        print(f"获取应用商店应用时出错: {e}")
+        print(f"{label}时出错: {e}")
+    if errors:
+        print(f"{label}时跳过 {len(errors)} 条无法解析的记录")
+
+def ps_contains(expression, needle):
+    """PowerShell条件: 表达式的字符串值包含needle（不区分大小写），与filter_software的判断一致"""
+    return f"([string]({expression})).IndexOf('{ps_quote(needle)}', [StringComparison]::OrdinalIgnoreCase) -ge 0"
+
+def ps_conditions(where, expressions):
+    """把下推的过滤条件转换成PowerShell条件，expressions为 {过滤字段: 对应的PowerShell表达式}"""
+    return [ps_contains(expressions[key], needle) for key, needle in (where or {}).items() if key in expressions]
+
+def ps_where(conditions):
+    """把条件拼成Where-Object管道段，没有条件时返回空字符串"""
+    if not conditions:
+        return ""
+    return " | Where-Object {" + " -and ".join(conditions) + "}"
+
+def iter_store_apps(session=None, where=None):
+    """逐条产出Windows应用商店应用"""
+    script = (
+        "Get-AppxPackage"
+    ) + ps_where(ps_conditions(where, {
+        'name': "$_.Name",
+        'publisher': "$_.Publisher",
+    })) + APPX_SELECT + JSON_LINES
+    
+    for app in stream_records(script, 60, session, "获取应用商店应用"):
+        if app.get('Name'):
+            yield make_store_record(app)
+
+def make_store_record(app):
+    """把一个Appx包的详情转换成软件记录"""
+    # 清单中未解析的资源引用（ms-resource:...）没有可读的名称
+    display_name = app.get('DisplayName') or ''
+    if display_name.startswith('ms-resource:'):
+        display_name = ''
+    return SoftwareRecord(
+        type='应用商店应用',
+        name=app.get('Name', ''),
+        version=str(app.get('Version', '')),
+        publisher=app.get('Publisher', ''),
+        package_name=app.get('PackageFullName', ''),
+        install_location=app.get('InstallLocation', ''),
+        display_name=display_name
+    )
+
+def get_store_apps(session=None, where=None, cache_path=None):
+    """获取Windows应用商店应用
+    
+    指定cache_path时包详情按PackageFullName缓存，只查询新出现的包；
+    这时where中的条件在缓存的详情上判断，不再下推到查询中。
+    """
+    if not cache_path:
+        return list(iter_store_apps(session, where))
     
-    return store_apps
+    try:
+        packages, stats = load_appx_packages(cache_path, session=session)
+    except Exception as e:
+        print(f"读取应用商店应用缓存时出错: {e}")
+        return list(iter_store_apps(session, where))
+    
+    print(f"   应用商店应用增量扫描: 复用{stats['reused']}项, 重新读取{stats['read']}项, 移除{stats['removed']}项")
+    conditions = {APPX_WHERE_FIELDS[key]: needle for key, needle in (where or {}).items() if key in APPX_WHERE_FIELDS}
+    return [make_store_record(app) for app in packages if values_match(app, conditions)]
+
+def get_winget_export_apps():
+    """通过winget export获取源中的包列表（用于补全包标识），不可用时返回None"""
+    fd, path = tempfile.mkstemp(prefix='winget-export-', suffix='.json')
+    os.close(fd)
+    try:
+        cmd = ["winget", "export", "-o", path, "--include-versions", "--accept-source-agreements"]
+        with trace_events.span("winget export", "winget") as span:
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=60, encoding='utf-8')
+            span.set(returncode=result.returncode)
+        if result.returncode != 0 or not os.path.getsize(path):
+            return None
+        trace_events.bytes_read("winget", os.path.getsize(path))
+        with trace_events.span("parse winget export", "parse") as span:
+            records = read_export_file(path)
+            span.set(records=len(records))
+        return records
+    except (subprocess.TimeoutExpired, ValueError, OSError):
+        return None
+    finally:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+def truncated_winget_ids(records):
+    """winget list中被截断（以"…"结尾）且来自源的包标识所在的记录，只有这些包能在winget export中找到"""
+    return [record for record in records
+            if record.get('source') and (record.get('package_id') or '').endswith('…')]
 
-def get_winget_apps():
-    """使用winget获取已安装的应用"""
+def complete_winget_ids(records, exported):
+    """用winget export中的完整包标识替换被截断的包标识，前缀只对应一个包时才替换"""
+    ids = [package['package_id'] for package in exported]
+    for record in records:
+        prefix = record['package_id'][:-1]
+        matches = [package_id for package_id in ids if package_id.startswith(prefix)]
+        if len(matches) == 1:
+            record['package_id'] = matches[0]
+
+def get_winget_apps(where=None):
+    """使用winget获取已安装的应用
+    
+    以winget list的表格输出为准：它包括只在"程序和功能"中登记、源中找不到的程序，名称也是显示名称。
+    winget export只列出源中的包、没有显示名称，只在表格中有被截断的包标识时调用，用来补全包标识。
+    where中的名称条件下推到winget list --name。
+    """
     winget_apps = []
     
     try:
         # 检查winget是否可用
-        subprocess.run(["winget", "--version"], capture_output=True, check=True)
+        with trace_events.span("winget --version", "winget"):
+            subprocess.run(["winget", "--version"], capture_output=True, check=True)
         
         # 获取winget安装的应用（使用UTF-8编码）
         cmd = ["winget", "list", "--accept-source-agreements"]
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30, encoding='utf-8')
+        if where and where.get('name'):
+            cmd += ["--name", where['name']]
+        with trace_events.span("winget list", "winget") as span:
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=30, encoding='utf-8')
+            span.set(returncode=result.returncode)
+        trace_events.bytes_read("winget", result.stdout)
         
         if result.returncode == 0 and result.stdout:
-            lines = result.stdout.split('\n')
-            for line in lines[3:]:  # 跳过表头
-                if line.strip() and '---' not in line:
-                    parts = line.split()
-                    if len(parts) >= 3:
-                        name = ' '.join(parts[1:-2])
-                        version = parts[-2]
-                        publisher = parts[-1] if parts[-1] != 'Unknown' else '未知'
-                        
-                        winget_apps.append({
-                            'type': 'winget应用',
-                            'name': name,
-                            'version': version,
-                            'publisher': publisher
-                        })
+            with trace_events.span("parse winget list", "parse") as span:
+                winget_apps = compact_records(parse_list_output(result.stdout))
+                span.set(records=len(winget_apps))
+        
+        truncated = truncated_winget_ids(winget_apps)
+        if truncated:
+            exported = get_winget_export_apps()
+            if exported:
+                complete_winget_ids(truncated, exported)
     
     except (subprocess.CalledProcessError, FileNotFoundError):
         pass  # winget不可用，跳过
@@ -127,132 +319,296 @@ def get_winget_apps():
     
     return winget_apps
 
-def get_system_features():
+def iter_system_features(session=None, where=None):
+    """逐条产出已启用的Windows系统功能"""
+    script = (
+        "Get-WindowsOptionalFeature -Online"
+    ) + ps_where(["$_.State -eq 'Enabled'"] + ps_conditions(where, {'name': "$_.FeatureName"})) + (
+        " | Select-Object FeatureName, State"
+    ) + JSON_LINES
+    
+    for feature in stream_records(script, 20, session, "获取系统功能"):
+        yield SoftwareRecord(
+            type='系统功能',
+            name=feature.get('FeatureName', ''),
+            state=feature.get('State', '')
+        )
+
+def get_system_features(session=None, where=None):
     """获取Windows系统功能和组件"""
-    features = []
+    return list(iter_system_features(session, where))
+
+def iter_services(session=None, where=None):
+    """通过一次Win32_Service查询逐条产出全部服务（包括已停止和已禁用的）"""
+    script = (
+        "Get-CimInstance Win32_Service"
+    ) + ps_where(ps_conditions(where, {
+        # 与make_service_record一致：没有显示名称时用服务名
+        'name': "$(if ($_.DisplayName) { $_.DisplayName } else { $_.Name })",
+    })) + (
+        " | Select-Object Name, DisplayName, State, StartMode, DelayedAutoStart, PathName, StartName"
+    ) + JSON_LINES
+    
+    for service in stream_records(script, 20, session, "获取服务信息"):
+        start_type = service.get('StartMode') or ''
+        if start_type == 'Auto':
+            start_type = 'Automatic'
+        yield make_service_record(
+            service.get('Name', ''),
+            service.get('DisplayName', ''),
+            service.get('State'),
+            start_type,
+            service.get('DelayedAutoStart'),
+            service.get('PathName'),
+            service.get('StartName')
+        )
+
+def get_services(session=None, backend=None, cache_path=None, where=None):
+    """获取全部Windows服务的状态、启动类型、映像路径和登录账户
+    
+    有注册表后端时从Services键读取服务配置，再用一次Get-Service补上运行状态；
+    指定cache_path时进行增量扫描，只重新读取最后写入时间变化过的服务键。
+    没有注册表后端时通过一次Win32_Service查询获取全部字段，where中的名称条件下推到这次查询；
+    读注册表时显示名称要等Get-Service的结果合并后才确定，名称条件留给filter_software判断。
+    """
+    if backend is None:
+        backend = default_backend()
+    if backend is None:
+        return list(iter_services(session, where))
     
     try:
-        cmd = [
-            "powershell", "-Command",
-            "Get-WindowsOptionalFeature -Online | "
-            "Where-Object {$_.State -eq 'Enabled'} | "
-            "Select-Object FeatureName, State | "
-            "ConvertTo-Json"
-        ]
-        
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=20)
-        
-        if result.returncode == 0 and result.stdout.strip():
-            data = json.loads(result.stdout)
-            if isinstance(data, dict):
-                data = [data]
-            
-            for feature in data:
-                features.append({
-                    'type': '系统功能',
-                    'name': feature.get('FeatureName', ''),
-                    'state': feature.get('State', '')
-                })
-    
+        if cache_path:
+            entries = scan_service_keys_incremental(backend, cache_path)
+        else:
+            entries = [(name, values) for hive, root, name, values
+                       in iter_uninstall_entries(backend, SERVICE_FIELDS, SERVICES_KEYS)]
     except Exception as e:
-        print(f"获取系统功能时出错: {e}")
+        print(f"读取服务注册表项时出错: {e}")
+        return list(iter_services(session, where))
     
-    return features
-
-def get_services():
-    """获取Windows服务信息"""
+    live = get_service_states(session)
     services = []
+    for name, values in entries:
+        if not isinstance(values.get('Type'), int) or not values['Type'] & SERVICE_WIN32:
+            continue
+        state = live.get(name.lower(), {})
+        start = values.get('Start')
+        services.append(make_service_record(
+            name,
+            state.get('DisplayName') or values.get('DisplayName'),
+            state.get('Status'),
+            SERVICE_START_TYPES.get(start, '' if start is None else str(start)),
+            values.get('DelayedAutostart'),
+            os.path.expandvars(values.get('ImagePath') or ''),
+            values.get('ObjectName')
+        ))
+    return services
+
+def scan_service_keys_incremental(backend, cache_path):
+    """借助磁盘缓存增量读取服务键，返回 [(服务名, {字段: 值}), ...]"""
+    cached = load_cache(cache_path, SERVICE_CACHE_KIND, SERVICE_CACHE_VERSION)
+    entries, stats = incremental_registry_scan(backend, SERVICES_KEYS, SERVICE_FIELDS, cached)
     
-    try:
-        cmd = [
-            "powershell", "-Command",
-            "Get-Service | "
-            "Where-Object {$_.Status -eq 'Running'} | "
-            "Select-Object Name, DisplayName, Status | "
-            "ConvertTo-Json"
-        ]
-        
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=15)
+    if cached is None or stats['read'] or stats['removed']:
+        save_cache(cache_path, SERVICE_CACHE_KIND, SERVICE_CACHE_VERSION, entries)
+    
+    print(f"   服务增量扫描: 复用{stats['reused']}项, 重新读取{stats['read']}项, 移除{stats['removed']}项")
+    return [(entry_id.rpartition("\\")[2], entry['values']) for entry_id, entry in entries.items()]
+
+def get_service_states(session=None):
+    """运行状态不在注册表中，用一次Get-Service查询全部服务的状态和显示名称
+    
+    返回 {服务名小写: 记录}；查询失败时返回空字典，服务记录的状态留空。
+    """
+    script = "Get-Service | Select-Object Name, DisplayName, Status" + JSON_LINES
+    return {service['Name'].lower(): service
+            for service in stream_records(script, 15, session, "获取服务状态")
+            if service.get('Name')}
+
+def make_service_record(service_name, display_name, status, start_type, delayed, image_path, account):
+    """把一个服务的信息转换成软件记录"""
+    if isinstance(status, int):
+        status = SERVICE_STATUSES.get(status, str(status))
+    if start_type == 'Automatic' and delayed:
+        start_type = 'AutomaticDelayedStart'
+    # 未解析的资源字符串（@%SystemRoot%\\...dll,-100）没有可读的名称，用服务名代替
+    if not display_name or display_name.startswith('@'):
+        display_name = service_name
+    return SoftwareRecord(
+        type='系统服务',
+        name=display_name,
+        service_name=service_name,
+        status=(status or '').replace(' ', ''),
+        start_type=start_type,
+        image_path=image_path or '',
+        account=account or ''
+    )
+
+def plan_collectors(filters, dedupe=False):
+    """根据过滤条件推算哪些来源可能产出匹配的记录
+    
+    返回 {记录类型: 下推到该来源的过滤条件}，不在结果中的来源不需要运行：
+    --filter-type只保留对应的来源；某个来源中取值固定的字段（例如winget的发布者）
+    不可能匹配时整个来源跳过；其余名称/发布者条件下推到来源的查询中。
+    下推只是预先排除，最终结果仍由filter_software判断。去重会把多个来源的记录合并，
+    合并后的类型、名称和发布者可能来自另一个来源，因此去重时参与合并的来源照常完整采集。
+    """
+    wanted = filters.get('type')
+    text_filters = {key: filters[key] for key in ('name', 'publisher') if filters.get(key)}
+    
+    plan = {}
+    for record_type in COLLECTOR_TYPES:
+        merged = dedupe and record_type in SOFTWARE_SOURCES
+        if wanted and wanted != record_type and not (merged and wanted in SOFTWARE_SOURCES):
+            continue
+        if merged:
+            plan[record_type] = {}
+            continue
         
-        if result.returncode == 0 and result.stdout.strip():
-            data = json.loads(result.stdout)
-            if isinstance(data, dict):
-                data = [data]
-            
-            for service in data:
-                services.append({
-                    'type': '系统服务',
-                    'name': service.get('DisplayName', ''),
-                    'service_name': service.get('Name', ''),
-                    'status': service.get('Status', '')
-                })
+        fixed = SOURCE_FIXED_FIELDS.get(record_type, {})
+        if any(key in fixed and needle.lower() not in fixed[key].lower() for key, needle in text_filters.items()):
+            continue
+        plan[record_type] = {key: needle for key, needle in text_filters.items() if key not in fixed}
+    return plan
+
+def build_collectors(skip_features=False, skip_services=False, cache_dir=None, plan=None):
+    """按输出顺序列出本次要运行的采集函数: (说明, 函数, 是否使用PowerShell会话)
+    
+    cache_dir不为空时注册表、应用商店应用和服务采集使用增量缓存。
+    plan为plan_collectors的结果时只列出其中的来源，并把过滤条件传给采集函数；为None时全部采集。
+    """
+    if plan is None:
+        plan = {record_type: {} for record_type in COLLECTOR_TYPES}
+    registry_cache = os.path.join(cache_dir, 'uninstall_cache.json') if cache_dir else None
+    service_cache = os.path.join(cache_dir, 'service_cache.json') if cache_dir else None
+    appx_cache = os.path.join(cache_dir, APPX_CACHE_FILE) if cache_dir else None
+    
+    sources = {
+        '传统软件': ("获取传统安装软件", partial(get_registry_software, cache_path=registry_cache), True),
+        '应用商店应用': ("获取应用商店应用", partial(get_store_apps, cache_path=appx_cache), True),
+        'winget应用': ("获取winget应用", get_winget_apps, False),
+        '系统功能': ("获取系统功能", get_system_features, True),
+        '系统服务': ("获取系统服务", partial(get_services, cache_path=service_cache), True),
+    }
+    skipped = set()
+    if skip_features:
+        skipped.add('系统功能')
+    if skip_services:
+        skipped.add('系统服务')
+    
+    collectors = []
+    for record_type in COLLECTOR_TYPES:
+        if record_type in skipped or record_type not in plan:
+            continue
+        label, func, uses_session = sources[record_type]
+        collectors.append((label, partial(func, where=plan[record_type] or None), uses_session))
+    return collectors
+
+def make_session(no_ps_session=False, jobs=1):
+    """创建采集使用的PowerShell常驻会话
+    
+    并发时每个线程需要各自的PowerShell进程，否则请求会在同一个会话上排队。
+    """
+    if no_ps_session:
+        return None
+    if jobs > 1:
+        return PowerShellSessionPool(jobs)
+    return PowerShellSession()
+
+def run_collectors(collectors, session=None, jobs=1, progress=True):
+    """执行采集函数并按collectors的顺序合并结果
+
+    jobs大于1时在线程池中并发执行，结果顺序与串行执行完全一致。progress为False时不打印进度。
+    返回 (全部结果, [(说明, 耗时秒数, 条数), ...])
+    """
+    def run_one(label, func, uses_session):
+        started = time.perf_counter()
+        with trace_events.span(label, "collect") as span:
+            items = func(session) if uses_session else func()
+            span.set(records=len(items))
+        return items, time.perf_counter() - started
+    
+    results = [None] * len(collectors)
+    
+    if jobs <= 1:
+        for index, (label, func, uses_session) in enumerate(collectors):
+            if progress:
+                print(f"{index + 1}. {label}...")
+            results[index] = run_one(label, func, uses_session)
+    else:
+        if progress:
+            print(f"并发执行 {len(collectors)} 个采集任务（{jobs} 个线程）...")
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            futures = [executor.submit(run_one, label, func, uses_session)
+                       for label, func, uses_session in collectors]
+            for index, future in enumerate(futures):
+                try:
+                    results[index] = future.result()
+                except Exception as e:
+                    print(f"{collectors[index][0]}时出错: {e}")
+                    results[index] = ([], 0.0)
     
-    except Exception as e:
-        print(f"获取服务信息时出错: {e}")
+    all_software = []
+    timings = []
+    for (label, func, uses_session), (items, elapsed) in zip(collectors, results):
+        all_software.extend(items)
+        timings.append((label, elapsed, len(items)))
     
-    return services
+    return all_software, timings
 
-def filter_software(all_software, filters):
-    """根据过滤器筛选软件"""
-    filtered = all_software
+def filter_software(all_software, filters, index=None):
+    """根据过滤器筛选软件
     
-    if filters.get('name'):
-        filtered = [s for s in filtered if filters['name'].lower() in s['name'].lower()]
+    只过滤一次时逐条扫描，建立索引比一次扫描更慢；对同一份清单反复过滤的调用方
+    （例如serve的快照）可传入已建立的InventoryIndex，由索引回答查询，结果与扫描一致。
+    """
+    if not any(filters.get(key) for key in ('name', 'type', 'publisher')):
+        return all_software
+    
+    if index is not None:
+        return index.filter(filters)
+    
+    filtered = all_software
     
     if filters.get('type'):
-        filtered = [s for s in filtered if filters['type'] == s['type']]
+        filtered = [s for s in filtered if filters['type'] == s.get('type')]
+    
+    if filters.get('name'):
+        name = filters['name'].lower()
+        filtered = [s for s in filtered if name in (s.get('name') or '').lower()]
     
     if filters.get('publisher'):
-        filtered = [s for s in filtered if filters['publisher'].lower() in s.get('publisher', '').lower()]
+        publisher = filters['publisher'].lower()
+        filtered = [s for s in filtered if publisher in (s.get('publisher') or '').lower()]
     
     return filtered
 
-def export_results(data, filename, format_type='txt'):
-    """导出结果到文件"""
+def export_results(data, filename, format_type='txt', output_dir="JSON", compression=None):
+    """导出结果到文件
+    
+    data可以是列表，也可以是逐条产出记录的迭代器；json/ndjson格式逐条写出，不在内存中拼接整个文档。
+    文件先写到临时文件，完成后再替换目标文件。
+    """
     try:
-        # 创建JSON文件夹（如果不存在）
-        json_dir = "JSON"
-        if not os.path.exists(json_dir):
-            os.makedirs(json_dir)
+        full_path = export_path(output_dir, filename, compression)
         
-        # 构建完整文件路径
-        full_path = os.path.join(json_dir, filename)
-        
-        if format_type == 'json':
-            with open(full_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-        else:
-            with open(full_path, 'w', encoding='utf-8') as f:
-                f.write(f"Windows系统软件信息报告\n")
-                f.write(f"生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write("=" * 80 + "\n\n")
-                
-                # 按类型分组输出
-                types = {}
-                for item in data:
-                    if item['type'] not in types:
-                        types[item['type']] = []
-                    types[item['type']].append(item)
-                
-                for type_name, items in types.items():
-                    f.write(f"{type_name} ({len(items)}个):\n")
-                    f.write("-" * 60 + "\n")
-                    
-                    for i, item in enumerate(items, 1):
-                        f.write(f"{i}. {item['name']}\n")
-                        if item.get('version'):
-                            f.write(f"   版本: {item['version']}\n")
-                        if item.get('publisher'):
-                            f.write(f"   发布者: {item['publisher']}\n")
-                        if item.get('install_date'):
-                            f.write(f"   安装日期: {item['install_date']}\n")
-                        f.write("\n")
-                    f.write("\n")
+        with trace_events.span("export_results", "export", format=format_type) as span, \
+                ExportWriter(full_path, format_type, compression) as writer:
+            if format_type in ('json', 'ndjson'):
+                writer.write_all(data)
+                span.set(records=writer.count)
+            else:
+                # 与屏幕输出共用渲染器，按类型分组，拼成大块写入
+                generated_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                for chunk in iter_chunks(render_text_report(data, generated_at)):
+                    writer.write_text(chunk)
         
         print(f"结果已导出到: {os.path.abspath(full_path)}")
+        return full_path
         
     except Exception as e:
         print(f"导出文件时出错: {e}")
+        return None
 
 def main():
     """主函数"""
@@ -260,36 +616,89 @@ def main():
     parser.add_argument('--filter-name', help='按名称过滤')
     parser.add_argument('--filter-type', help='按类型过滤（传统软件/应用商店应用/系统功能等）')
     parser.add_argument('--filter-publisher', help='按发布者过滤')
-    parser.add_argument('--export', choices=['txt', 'json'], help='导出格式')
+    parser.add_argument('--export', choices=EXPORT_FORMATS, help='导出格式')
     parser.add_argument('--output', default='windows_software_report', help='输出文件名')
+    parser.add_argument('--output-dir', default='JSON', help='导出目录（默认JSON）')
+    parser.add_argument('--compress', choices=sorted(COMPRESSION_SUFFIXES), help='压缩导出文件')
     parser.add_argument('--skip-services', action='store_true', help='跳过服务信息')
     parser.add_argument('--skip-features', action='store_true', help='跳过系统功能')
+    parser.add_argument('--no-ps-session', action='store_true', help='不复用PowerShell常驻进程，每次查询单独启动')
+    parser.add_argument('--jobs', type=int, default=1, help='并发运行的采集任务数（默认1，即依次执行）')
+    parser.add_argument('--cache-dir', default=default_cache_dir(), help='增量扫描缓存目录')
+    parser.add_argument('--no-cache', action='store_true', help='不使用增量缓存，完整扫描注册表')
+    parser.add_argument('--db', help='把扫描结果追加到SQLite清单库')
+    parser.add_argument('--dedupe', action='store_true', help='合并注册表、winget和应用商店中重复的软件记录')
+    output_mode = parser.add_mutually_exclusive_group()
+    output_mode.add_argument('--quiet', action='store_true', help='不显示进度、统计和结果列表，只输出导出路径和错误')
+    output_mode.add_argument('--summary', action='store_true', help='只显示统计，不列出每条结果')
+    parser.add_argument('--limit', type=int, help='屏幕上最多列出的结果数（导出文件不受影响）')
+    parser.add_argument('--no-pager', action='store_true', help='结果超过一屏时也不分页')
+    parser.add_argument('--trace', metavar='FILE', help='把各阶段耗时写入Chrome trace-event格式的JSON文件（可用Perfetto打开）')
+    
+    subparsers = parser.add_subparsers(dest='command', title='子命令')
+    add_query_arguments(subparsers.add_parser('query', help='查询SQLite清单库'))
+    add_aggregate_arguments(subparsers.add_parser('aggregate', help='汇总多台主机的导出文件'))
+    add_diff_arguments(subparsers.add_parser('diff', help='比较两次导出的软件清单'))
+    add_serve_arguments(subparsers.add_parser('serve', help='常驻运行，通过本机HTTP接口提供查询'))
+    add_columnar_arguments(subparsers.add_parser('columnar', help='列式清单文件的转换和查询'))
     
     args = parser.parse_args()
     
-    print("正在全面扫描Windows系统软件信息...")
-    
-    all_software = []
-    
-    # 获取各种类型的软件信息
-    print("1. 获取传统安装软件...")
-    all_software.extend(get_registry_software())
-    
-    print("2. 获取应用商店应用...")
-    all_software.extend(get_store_apps())
-    
-    print("3. 获取winget应用...")
-    all_software.extend(get_winget_apps())
-    
-    if not args.skip_features:
-        print("4. 获取系统功能...")
-        all_software.extend(get_system_features())
+    if args.command == 'query':
+        run_query(args)
+        return
+    if args.command == 'aggregate':
+        run_aggregate(args)
+        return
+    if args.command == 'diff':
+        run_diff(args)
+        return
+    if args.command == 'serve':
+        serve_inventory(args)
+        return
+    if args.command == 'columnar':
+        run_columnar(args)
+        return
+    
+    if not args.trace:
+        run_scan(args)
+        return
+    
+    trace_events.start()
+    try:
+        with trace_events.span("scan", "scan"):
+            run_scan(args)
+    finally:
+        try:
+            count = trace_events.stop(args.trace)
+            print(f"跟踪记录已写入: {os.path.abspath(args.trace)} ({count}个事件)")
+        except OSError as e:
+            print(f"写入跟踪文件时出错: {e}")
+
+def serve_inventory(args):
+    """serve子命令：每次刷新都按全局参数完整采集一次，整个服务期间复用同一个PowerShell会话"""
+    collectors = build_collectors(args.skip_features, args.skip_services,
+                                  None if args.no_cache else args.cache_dir)
+    jobs = max(1, min(args.jobs, len(collectors)))
+    session = make_session(args.no_ps_session, jobs)
+    
+    def scan():
+        all_software, timings = run_collectors(collectors, session, jobs, progress=False)
+        if args.dedupe:
+            all_software = dedupe_records(all_software)
+        return all_software
     
-    if not args.skip_services:
-        print("5. 获取系统服务...")
-        all_software.extend(get_services())
+    try:
+        run_serve(args, scan)
+    finally:
+        if session is not None:
+            session.close()
+
+def run_scan(args):
+    """扫描本机软件，输出统计、导出文件并显示结果"""
+    if not args.quiet:
+        print("正在全面扫描Windows系统软件信息...")
     
-    # 应用过滤器
     filters = {}
     if args.filter_name:
         filters['name'] = args.filter_name
@@ -298,46 +707,87 @@ def main():
     if args.filter_publisher:
         filters['publisher'] = args.filter_publisher
     
-    filtered_data = filter_software(all_software, filters)
+    # 写入数据库时需要完整的扫描结果，不按过滤条件裁剪来源
+    plan = plan_collectors(filters, args.dedupe) if filters and not args.db else None
+    cache_dir = None if args.no_cache else args.cache_dir
+    collectors = build_collectors(args.skip_features, args.skip_services, cache_dir, plan)
+    if plan is not None and len(plan) < len(COLLECTOR_TYPES) and not args.quiet:
+        print(f"按过滤条件跳过来源: {', '.join(t for t in COLLECTOR_TYPES if t not in plan)}")
+    jobs = max(1, min(args.jobs, len(collectors)))
     
-    # 输出统计信息
-    print(f"\n扫描完成！共找到 {len(all_software)} 个软件/组件")
-    
-    type_counts = {}
-    for item in all_software:
-        if item['type'] not in type_counts:
-            type_counts[item['type']] = 0
-        type_counts[item['type']] += 1
+    session = make_session(args.no_ps_session, jobs)
     
-    for type_name, count in type_counts.items():
-        print(f"  {type_name}: {count}个")
+    scan_started = time.perf_counter()
+    try:
+        # 获取各种类型的软件信息
+        all_software, timings = run_collectors(collectors, session, jobs, progress=not args.quiet)
+    finally:
+        if session is not None:
+            session.close()
+    
+    if not args.quiet:
+        print(f"\n各采集任务耗时:")
+        for label, elapsed, count in timings:
+            print(f"  {label}: {elapsed:.2f}秒 ({count}条)")
+        if timings:
+            slowest = max(timings, key=lambda t: t[1])
+            print(f"扫描耗时: {time.perf_counter() - scan_started:.2f}秒 (最慢: {slowest[0]} {slowest[1]:.2f}秒)")
+        if session is not None and session.stats['starts']:
+            stats = session.stats
+            print(f"PowerShell会话复用: {stats['requests']}次查询, 启动{stats['starts']}次"
+                  f"(重启{stats['restarts']}次), 约节省{session.saved_seconds():.2f}秒冷启动时间")
+    
+    if args.dedupe:
+        started = time.perf_counter()
+        collected = len(all_software)
+        with trace_events.span("dedupe_records", "filter", records=collected):
+            all_software = dedupe_records(all_software)
+        if not args.quiet:
+            print(f"去重: {collected}条 -> {len(all_software)}条, 耗时{time.perf_counter() - started:.2f}秒")
+    
+    # 应用过滤器（下推到来源的条件只是预先排除，这里仍按完整条件筛选）
+    with trace_events.span("filter_software", "filter", records=len(all_software), filters=filters) as span:
+        filtered_data = filter_software(all_software, filters)
+        span.set(matched=len(filtered_data))
     
-    if filters:
-        print(f"过滤后结果: {len(filtered_data)}个")
+    # 输出统计信息
+    if not args.quiet:
+        type_counts = {}
+        for item in all_software:
+            if item['type'] not in type_counts:
+                type_counts[item['type']] = 0
+            type_counts[item['type']] += 1
+        
+        write_chunks(sys.stdout, render_summary(len(all_software), type_counts,
+                                                len(filtered_data) if filters else None))
     
     # 导出结果 - 默认自动输出JSON
     if args.export:
         filename = f"{args.output}.{args.export}"
-        export_results(filtered_data if filters else all_software, filename, args.export)
+        export_results(filtered_data if filters else all_software, filename, args.export,
+                       args.output_dir, args.compress)
     else:
         # 默认自动输出JSON文件
         json_filename = f"{args.output}.json"
-        export_results(filtered_data if filters else all_software, json_filename, 'json')
-        print(f"\n数据已自动导出到JSON文件: {json_filename}")
-    
-    # 显示所有结果
-    if filtered_data:
-        print(f"\n所有结果 ({len(filtered_data)}个):")
-        print("=" * 80)
-        for i, item in enumerate(filtered_data, 1):
-            print(f"{i}. [{item['type']}] {item['name']}")
-            if item.get('version'):
-                print(f"   版本: {item['version']}")
-            if item.get('publisher'):
-                print(f"   发布者: {item['publisher']}")
-            if item.get('install_date'):
-                print(f"   安装日期: {item['install_date']}")
-            print()
+        export_results(filtered_data if filters else all_software, json_filename, 'json',
+                       args.output_dir, args.compress)
+        if not args.quiet:
+            print(f"\n数据已自动导出到JSON文件: {json_filename}")
+    
+    if args.db:
+        try:
+            with trace_events.span("append_scan", "export", records=len(all_software)), \
+                    InventoryStore(args.db) as store:
+                scan_id = store.append_scan(all_software, current_host())
+            print(f"扫描结果已写入数据库: {args.db} (扫描编号 {scan_id})")
+        except Exception as e:
+            print(f"写入数据库时出错: {e}")
+    
+    # 显示结果列表：拼成大块写出，超过一屏时分页
+    if filtered_data and not (args.quiet or args.summary):
+        with trace_events.span("print results", "print", records=len(filtered_data)) as span:
+            chunks = print_results(filtered_data, args.limit, page=not args.no_pager)
+            span.set(chunks=chunks)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
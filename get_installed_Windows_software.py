@@ -11,7 +11,8 @@ import json
 import re
 from datetime import datetime
 import argparse
-import os
+
+from export_writer import ExportWriter, EXPORT_FORMATS, COMPRESSION_SUFFIXES, export_path
 
 def get_windows_software():
     """获取Windows系统安装的软件信息"""
@@ -97,32 +98,25 @@ def filter_software(software_list, filters):
     
     return filtered_list
 
-def export_to_file(software_list, filename, format_type='txt'):
+def export_to_file(software_list, filename, format_type='txt', output_dir="JSON", compression=None):
     """导出软件列表到文件"""
     try:
-        # 创建JSON文件夹（如果不存在）
-        json_dir = "JSON"
-        if not os.path.exists(json_dir):
-            os.makedirs(json_dir)
-        
-        # 构建完整文件路径
-        full_path = os.path.join(json_dir, filename)
+        full_path = export_path(output_dir, filename, compression)
         
-        if format_type == 'json':
-            with open(full_path, 'w', encoding='utf-8') as f:
-                json.dump(software_list, f, ensure_ascii=False, indent=2)
-        else:
-            with open(full_path, 'w', encoding='utf-8') as f:
-                f.write(f"软件列表导出时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write("=" * 60 + "\n")
+        with ExportWriter(full_path, format_type, compression) as writer:
+            if format_type in ('json', 'ndjson'):
+                writer.write_all(software_list)
+            else:
+                writer.write_text(f"软件列表导出时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+                writer.write_text("=" * 60 + "\n")
                 
                 for i, software in enumerate(software_list, 1):
-                    f.write(f"{i}. {software['name']}\n")
-                    f.write(f"   版本: {software.get('version', '未知')}\n")
-                    f.write(f"   发布者: {software.get('publisher', '未知')}\n")
+                    writer.write_text(f"{i}. {software['name']}\n")
+                    writer.write_text(f"   版本: {software.get('version', '未知')}\n")
+                    writer.write_text(f"   发布者: {software.get('publisher', '未知')}\n")
                     if software.get('install_date'):
-                        f.write(f"   安装日期: {software.get('install_date')}\n")
-                    f.write("-" * 40 + "\n")
+                        writer.write_text(f"   安装日期: {software.get('install_date')}\n")
+                    writer.write_text("-" * 40 + "\n")
         
         print(f"软件列表已导出到: {full_path}")
         
@@ -134,8 +128,10 @@ def main():
     parser = argparse.ArgumentParser(description='获取Windows系统安装的软件信息')
     parser.add_argument('--filter-name', help='按软件名称过滤')
     parser.add_argument('--filter-publisher', help='按发布者过滤')
-    parser.add_argument('--export', choices=['txt', 'json'], help='导出格式')
+    parser.add_argument('--export', choices=EXPORT_FORMATS, help='导出格式')
     parser.add_argument('--output', default='software_list', help='输出文件名(不含扩展名)')
+    parser.add_argument('--output-dir', default='JSON', help='导出目录（默认JSON）')
+    parser.add_argument('--compress', choices=sorted(COMPRESSION_SUFFIXES), help='压缩导出文件')
     parser.add_argument('--include-store', action='store_true', help='包含应用商店应用')
     
     args = parser.parse_args()
@@ -174,11 +170,11 @@ def main():
     # 导出到文件 - 默认自动输出JSON
     if args.export:
         filename = f"{args.output}.{args.export}"
-        export_to_file(filtered_software, filename, args.export)
+        export_to_file(filtered_software, filename, args.export, args.output_dir, args.compress)
     else:
         # 默认自动输出JSON文件
         json_filename = f"{args.output}.json"
-        export_to_file(filtered_software, json_filename, 'json')
+        export_to_file(filtered_software, json_filename, 'json', args.output_dir, args.compress)
         print(f"\n数据已自动导出到JSON文件: {json_filename}")
 
 if __name__ == "__main__":
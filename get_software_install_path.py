@@ -1,122 +1,545 @@
-#!/usr/bin/env python3
-# -*- coding: utf-8 -*-
-"""
-软件安装路径获取工具
-项目名称项目组Seraphiel 作者 TraeAI 日期 2025-11-19 版本 1.0
-描述: 获取Windows系统指定软件的安装路径
-"""
-
-import subprocess
-import json
-import argparse
-
-def get_software_install_path(software_name):
-    """获取指定软件的安装路径"""
-    
-    # 注册表路径列表
-    registry_paths = [
-        "HKLM:\\Software\\Wow6432Node\\Microsoft\\Windows\\CurrentVersion\\Uninstall\\*",
-        "HKLM:\\Software\\Microsoft\\Windows\\CurrentVersion\\Uninstall\\*",
-        "HKCU:\\Software\\Microsoft\\Windows\\CurrentVersion\\Uninstall\\*"
-    ]
-    
-    for registry_path in registry_paths:
-        try:
-            cmd = [
-                "powershell", "-Command",
-                f"Get-ItemProperty '{registry_path}' | "
-                f"Where-Object DisplayName -like '*{software_name}*' | "
-                f"Select-Object DisplayName, InstallLocation, UninstallString | "
-                f"ConvertTo-Json"
-            ]
-            
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
-            
-            if result.returncode == 0 and result.stdout.strip():
-                try:
-                    data = json.loads(result.stdout)
-                    if isinstance(data, dict):
-                        data = [data]
-                    
-                    for item in data:
-                        if item.get('DisplayName') and item.get('InstallLocation'):
-                            return {
-                                'name': item.get('DisplayName', ''),
-                                'install_path': item.get('InstallLocation', ''),
-                                'uninstall_string': item.get('UninstallString', '')
-                            }
-                except json.JSONDecodeError:
-                    # 输出可能不是有效的JSON，尝试直接解析
-                    if software_name.lower() in result.stdout.lower():
-                        print(f"找到匹配项但JSON解析失败: {result.stdout}")
-                    continue
-        
-        except Exception as e:
-            print(f"搜索注册表路径 {registry_path} 时出错: {e}")
-            continue
-    
-    return None
-
-def get_store_app_path(app_name):
-    """获取应用商店应用的安装路径"""
-    
-    try:
-        cmd = [
-            "powershell", "-Command",
-            f"Get-AppxPackage | "
-            f"Where-Object Name -like '*{app_name}*' | "
-            f"Select-Object Name, InstallLocation | "
-            f"ConvertTo-Json"
-        ]
-        
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
-        
-        if result.returncode == 0 and result.stdout.strip():
-            data = json.loads(result.stdout)
-            if isinstance(data, dict):
-                data = [data]
-            
-            for app in data:
-                if app.get('Name') and app.get('InstallLocation'):
-                    return {
-                        'name': app.get('Name', ''),
-                        'install_path': app.get('InstallLocation', ''),
-                        'type': '应用商店应用'
-                    }
-    
-    except Exception:
-        pass
-    
-    return None
-
-def main():
-    """主函数"""
-    parser = argparse.ArgumentParser(description='获取指定软件的安装路径')
-    parser.add_argument('software_name', help='要查找的软件名称')
-    parser.add_argument('--search-store', action='store_true', help='同时搜索应用商店应用')
-    
-    args = parser.parse_args()
-    
-    # 首先搜索传统软件
-    result = get_software_install_path(args.software_name)
-    
-    if result:
-        print(f"软件名称: {result['name']}")
-        print(f"安装路径: {result['install_path']}")
-        if result.get('uninstall_string'):
-            print(f"卸载命令: {result['uninstall_string']}")
-        return
-    
-    # 如果没找到且启用了应用商店搜索
-    if args.search_store:
-        result = get_store_app_path(args.software_name)
-        if result:
-            print(f"应用名称: {result['name']}")
-            print(f"安装路径: {result['install_path']}")
-            print(f"类型: {result['type']}")
-            return
-    
-    print(f"未找到包含 '{args.software_name}' 的软件")
-
-if __name__ == "__main__":
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+软件安装路径获取工具
+项目名称项目组Seraphiel 作者 TraeAI 日期 2025-11-19 版本 1.0
+描述: 获取Windows系统指定软件的安装路径
+"""
+
+import subprocess
+import json
+import argparse
+import fnmatch
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from registry_backend import UNINSTALL_KEYS, default_backend, iter_uninstall_entries
+from install_path_cache import InstallPathCache, MISS, DEFAULT_TTL, DEFAULT_MAX_ENTRIES
+from fuzzy_resolver import FuzzyResolver, DEFAULT_TOP
+from multi_match import NameMatcher
+from powershell_session import ps_quote, stream_json_records
+from appx_cache import APPX_CACHE_FILE, load_appx_packages
+from scan_cache import default_cache_path
+
+# 注册表路径列表
+REGISTRY_PATHS = [
+    "HKLM:\\Software\\Wow6432Node\\Microsoft\\Windows\\CurrentVersion\\Uninstall\\*",
+    "HKLM:\\Software\\Microsoft\\Windows\\CurrentVersion\\Uninstall\\*",
+    "HKCU:\\Software\\Microsoft\\Windows\\CurrentVersion\\Uninstall\\*"
+]
+
+INSTALL_FIELDS = ['DisplayName', 'InstallLocation', 'UninstallString']
+
+def matches_name(display_name, software_name):
+    """与PowerShell的 -like '*name*' 等价：不区分大小写的通配符匹配"""
+    return fnmatch.fnmatchcase(display_name.lower(), f"*{software_name.lower()}*")
+
+# 单个PowerShell查询的超时秒数
+QUERY_TIMEOUT = 10
+
+# 并行查找时等待全部来源的最长秒数，超过后取消仍在运行的查询
+SEARCH_TIMEOUT = 15
+
+def install_entry(values):
+    """卸载项 -> 匹配项"""
+    return {
+        'name': values.get('DisplayName', ''),
+        'install_path': values.get('InstallLocation', ''),
+        'uninstall_string': values.get('UninstallString') or ''
+    }
+
+def store_entry(app):
+    """应用商店应用 -> 匹配项"""
+    return {
+        'name': app.get('Name', ''),
+        'install_path': app.get('InstallLocation', ''),
+        'type': '应用商店应用'
+    }
+
+class SourceQuery:
+    """在工作线程中执行的一个查找来源，可以随时从其他线程取消
+    
+    取消时结束该来源正在运行的PowerShell进程，查询函数随后返回空结果；
+    注册表后端的查询在每个键之间检查cancelled。
+    """
+    
+    def __init__(self, label, func):
+        self.label = label
+        self.func = func
+        self.cancelled = threading.Event()
+        self._lock = threading.Lock()
+        self._process = None
+    
+    def run(self, first):
+        return self.func(self, first)
+    
+    def run_powershell(self, script, timeout=QUERY_TIMEOUT):
+        """执行powershell -Command，返回标准输出；已取消、超时或失败时返回None"""
+        with self._lock:
+            if self.cancelled.is_set():
+                return None
+            self._process = subprocess.Popen(["powershell", "-Command", script],
+                                             stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        process = self._process
+        try:
+            stdout, _ = process.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.communicate()
+            print(f"{self.label} 查询超时")
+            return None
+        finally:
+            with self._lock:
+                self._process = None
+        if self.cancelled.is_set() or process.returncode != 0:
+            return None
+        return stdout
+    
+    def cancel(self):
+        with self._lock:
+            self.cancelled.set()
+            process = self._process
+        if process is not None and process.poll() is None:
+            process.kill()
+
+def parse_json_items(output):
+    """解析ConvertTo-Json的输出（单个对象或数组），返回字典列表"""
+    if not output or not output.strip():
+        return []
+    data = json.loads(output)
+    if isinstance(data, dict):
+        data = [data]
+    return [item for item in data if isinstance(item, dict)]
+
+def native_hive_source(software_name, backend, hive, root):
+    """通过注册表后端查找一个卸载位置"""
+    def search(query, first):
+        matches = []
+        for _, _, _, values in iter_uninstall_entries(backend, INSTALL_FIELDS, roots=[(hive, root)]):
+            if query.cancelled.is_set():
+                return []
+            display_name = values.get('DisplayName')
+            if display_name and values.get('InstallLocation') and matches_name(display_name, software_name):
+                matches.append(install_entry(values))
+                if first:
+                    break
+        return matches
+    return search
+
+def powershell_hive_source(software_name, registry_path):
+    """通过PowerShell查找一个卸载位置"""
+    def search(query, first):
+        output = query.run_powershell(
+            f"Get-ItemProperty '{registry_path}' | "
+            f"Where-Object DisplayName -like '*{ps_quote(software_name)}*' | "
+            f"Select-Object DisplayName, InstallLocation, UninstallString | "
+            f"ConvertTo-Json"
+        )
+        try:
+            items = parse_json_items(output)
+        except json.JSONDecodeError:
+            # 输出可能不是有效的JSON
+            if software_name.lower() in output.lower():
+                print(f"找到匹配项但JSON解析失败: {output}")
+            return []
+        matches = [install_entry(item) for item in items
+                   if item.get('DisplayName') and item.get('InstallLocation')]
+        return matches[:1] if first else matches
+    return search
+
+def store_source(app_name, appx_cache=None, backend=None):
+    """通过Get-AppxPackage查找应用商店应用；给出appx_cache时在缓存的包详情中查找"""
+    def search_cached(query, first):
+        packages, _ = load_appx_packages(appx_cache, backend, run=query.run_powershell)
+        matches = []
+        for app in packages:
+            if query.cancelled.is_set():
+                return []
+            if app.get('Name') and app.get('InstallLocation') and matches_name(app['Name'], app_name):
+                matches.append(store_entry(app))
+                if first:
+                    break
+        return matches
+    
+    def search(query, first):
+        output = query.run_powershell(
+            f"Get-AppxPackage | "
+            f"Where-Object Name -like '*{ps_quote(app_name)}*' | "
+            f"Select-Object Name, InstallLocation | "
+            f"ConvertTo-Json"
+        )
+        try:
+            items = parse_json_items(output)
+        except json.JSONDecodeError:
+            return []
+        matches = [store_entry(app) for app in items if app.get('Name') and app.get('InstallLocation')]
+        return matches[:1] if first else matches
+    return search_cached if appx_cache else search
+
+def install_path_sources(software_name, search_store=False, backend=None, appx_cache=None):
+    """按优先级排列的查找来源 [SourceQuery, ...]：三个卸载位置，search_store时再加应用商店应用"""
+    if backend is None:
+        backend = default_backend()
+    if backend is not None:
+        sources = [SourceQuery(f"{hive}\\{root}", native_hive_source(software_name, backend, hive, root))
+                   for hive, root in UNINSTALL_KEYS]
+    else:
+        sources = [SourceQuery(registry_path, powershell_hive_source(software_name, registry_path))
+                   for registry_path in REGISTRY_PATHS]
+    if search_store:
+        sources.append(SourceQuery("Get-AppxPackage", store_source(software_name, appx_cache, backend)))
+    return sources
+
+def search_install_paths(software_name, search_store=False, backend=None, first=True, timeout=SEARCH_TIMEOUT,
+                         appx_cache=None):
+    """同时查询所有来源，返回匹配项列表
+    
+    first为True时结果与按优先级依次查找相同：某个来源找到后立即取消优先级更低的来源，
+    优先级更高的来源都未找到时就返回，返回列表最多一项。first为False时合并全部来源的匹配项。
+    超过timeout秒仍未结束的查询会被取消，按未找到处理。appx_cache为应用商店应用详情缓存文件。
+    """
+    sources = install_path_sources(software_name, search_store, backend, appx_cache)
+    results = [None] * len(sources)
+    executor = ThreadPoolExecutor(max_workers=len(sources))
+    futures = {executor.submit(source.run, first): index for index, source in enumerate(sources)}
+    deadline = time.monotonic() + timeout
+    pending = set(futures)
+    try:
+        while pending:
+            done, pending = wait(pending, timeout=max(0.0, deadline - time.monotonic()),
+                                 return_when=FIRST_COMPLETED)
+            if not done:
+                print(f"查找 '{software_name}' 超时，已取消 {len(pending)} 个未完成的查询")
+                break
+            for future in done:
+                index = futures[future]
+                try:
+                    results[index] = future.result()
+                except Exception as e:
+                    print(f"搜索 {sources[index].label} 时出错: {e}")
+                    results[index] = []
+                if first and results[index]:
+                    for source in sources[index + 1:]:
+                        source.cancel()
+            if first:
+                # 按优先级找到第一个未完成或有结果的来源
+                for matches in results:
+                    if matches is None:
+                        break
+                    if matches:
+                        return matches[:1]
+                else:
+                    return []
+    finally:
+        for source in sources:
+            source.cancel()
+        executor.shutdown(wait=False, cancel_futures=True)
+    
+    # 超时后未完成的来源按未找到处理
+    if first:
+        for matches in results:
+            if matches:
+                return matches[:1]
+        return []
+    return [match for matches in results if matches for match in matches]
+
+def get_software_install_path(software_name, backend=None):
+    """获取指定软件的安装路径"""
+    matches = search_install_paths(software_name, backend=backend)
+    return matches[0] if matches else None
+
+def get_store_app_path(app_name, appx_cache=None, backend=None):
+    """获取应用商店应用的安装路径"""
+    query = SourceQuery("Get-AppxPackage", store_source(app_name, appx_cache, backend))
+    try:
+        matches = query.run(True)
+    except Exception:
+        return None
+    return matches[0] if matches else None
+
+def iter_install_entries(backend=None):
+    """一次枚举三个卸载位置，逐个产出 {DisplayName, InstallLocation, UninstallString}
+    
+    没有winreg时用一个PowerShell进程依次读取三个位置，而不是每个位置启动一次。
+    """
+    if backend is None:
+        backend = default_backend()
+    if backend is not None:
+        for hive, root, subkey, values in iter_uninstall_entries(backend, INSTALL_FIELDS):
+            yield values
+        return
+    
+    paths = ", ".join(f"'{registry_path}'" for registry_path in REGISTRY_PATHS)
+    script = (
+        f"Get-ItemProperty {paths} -ErrorAction SilentlyContinue | "
+        f"Where-Object {{$_.DisplayName -ne $null}} | "
+        f"Select-Object DisplayName, InstallLocation, UninstallString | "
+        f"ForEach-Object {{ $_ | ConvertTo-Json -Compress }}"
+    )
+    yield from stream_json_records(script, timeout=30)
+
+def iter_store_packages(appx_cache=None, backend=None):
+    """一次枚举全部应用商店应用，逐个产出 {Name, InstallLocation}；给出appx_cache时从缓存读取"""
+    if appx_cache:
+        yield from load_appx_packages(appx_cache, backend)[0]
+        return
+    script = (
+        "Get-AppxPackage | "
+        "Select-Object Name, InstallLocation | "
+        "ForEach-Object { $_ | ConvertTo-Json -Compress }"
+    )
+    yield from stream_json_records(script, timeout=30)
+
+def batch_install_paths(names, search_store=False, backend=None, appx_cache=None):
+    """一次查找多个软件的安装路径，返回 {名称: [全部匹配项]}
+    
+    卸载项（以及search_store时的应用商店应用）只枚举一遍，所有名称建成一个多模式匹配器，
+    每个显示名扫描一次就知道它匹配哪些名称。与单个查找不同，这里返回每个名称的全部匹配项。
+    """
+    queries = list(dict.fromkeys(' '.join(name.split()) for name in names if name.strip()))
+    results = {query: [] for query in queries}
+    if not queries:
+        return results
+    matcher = NameMatcher(queries)
+    
+    try:
+        for values in iter_install_entries(backend):
+            display_name = values.get('DisplayName')
+            install_path = values.get('InstallLocation')
+            if not display_name or not install_path:
+                continue
+            for name_id in matcher.match(display_name):
+                results[queries[name_id]].append({
+                    'name': display_name,
+                    'install_path': install_path,
+                    'uninstall_string': values.get('UninstallString') or ''
+                })
+    except Exception as e:
+        print(f"读取注册表时出错: {e}")
+    
+    if search_store:
+        try:
+            for app in iter_store_packages(appx_cache, backend):
+                if not app.get('Name') or not app.get('InstallLocation'):
+                    continue
+                for name_id in matcher.match(app['Name']):
+                    results[queries[name_id]].append({
+                        'name': app['Name'],
+                        'install_path': app['InstallLocation'],
+                        'type': '应用商店应用'
+                    })
+        except Exception as e:
+            print(f"获取应用商店应用时出错: {e}")
+    
+    return results
+
+def read_names(path):
+    """从文件读取名称，每行一个，忽略空行和#开头的注释；path为'-'时读取标准输入"""
+    if path == '-':
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(path, 'r', encoding='utf-8-sig') as f:
+            lines = f.read().splitlines()
+    return [line.strip() for line in lines if line.strip() and not line.strip().startswith('#')]
+
+def print_result(result):
+    """打印一个匹配项"""
+    if result.get('type'):
+        print(f"应用名称: {result['name']}")
+        print(f"安装路径: {result['install_path']}")
+        print(f"类型: {result['type']}")
+        return
+    print(f"软件名称: {result['name']}")
+    print(f"安装路径: {result['install_path']}")
+    if result.get('uninstall_string'):
+        print(f"卸载命令: {result['uninstall_string']}")
+
+def run_batch(names, args, backend):
+    """批量查找并输出全部结果"""
+    results = batch_install_paths(names, args.search_store, backend, appx_cache_path(args))
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return
+    
+    found = sum(1 for matches in results.values() if matches)
+    for name, matches in results.items():
+        print(f"== {name} ({len(matches)}个匹配)")
+        if not matches:
+            print(f"未找到包含 '{name}' 的软件")
+        for result in matches:
+            print_result(result)
+        print()
+    print(f"共查找 {len(results)} 个名称, 找到 {found} 个")
+
+def run_all(names, args, backend):
+    """并行查询全部来源，输出每个名称的所有匹配项"""
+    results = {name: search_install_paths(name, args.search_store, backend, first=False,
+                                          appx_cache=appx_cache_path(args))
+               for name in dict.fromkeys(' '.join(name.split()) for name in names if name.strip())}
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return
+    
+    for name, matches in results.items():
+        print(f"== {name} ({len(matches)}个匹配)")
+        if not matches:
+            print(f"未找到包含 '{name}' 的软件")
+        for result in matches:
+            print_result(result)
+        print()
+
+def fuzzy_install_paths(names, top=DEFAULT_TOP, search_store=False, backend=None, appx_cache=None):
+    """按不精确的名称查找，返回 {名称: [(得分, 匹配项)]}，每个名称最多top个，得分从高到低
+    
+    卸载项（以及search_store时的应用商店应用）只枚举一遍并建立一次索引，所有名称共用。
+    """
+    entries = []
+    try:
+        for values in iter_install_entries(backend):
+            if values.get('DisplayName') and values.get('InstallLocation'):
+                entries.append({
+                    'name': values['DisplayName'],
+                    'install_path': values['InstallLocation'],
+                    'uninstall_string': values.get('UninstallString') or ''
+                })
+    except Exception as e:
+        print(f"读取注册表时出错: {e}")
+    
+    if search_store:
+        try:
+            for app in iter_store_packages(appx_cache, backend):
+                if app.get('Name') and app.get('InstallLocation'):
+                    entries.append({
+                        'name': app['Name'],
+                        'install_path': app['InstallLocation'],
+                        'type': '应用商店应用'
+                    })
+        except Exception as e:
+            print(f"获取应用商店应用时出错: {e}")
+    
+    resolver = FuzzyResolver(entries)
+    queries = dict.fromkeys(' '.join(name.split()) for name in names if name.strip())
+    return {query: resolver.resolve(query, top) for query in queries}
+
+def run_fuzzy(names, args, backend):
+    """模糊查找并按得分输出"""
+    results = fuzzy_install_paths(names, args.top, args.search_store, backend, appx_cache_path(args))
+    if args.json:
+        output = {name: [dict(result, score=score) for score, result in matches]
+                  for name, matches in results.items()}
+        print(json.dumps(output, ensure_ascii=False, indent=2))
+        return
+    
+    for name, matches in results.items():
+        print(f"== {name} ({len(matches)}个候选)")
+        if not matches:
+            print(f"未找到与 '{name}' 相近的软件")
+        for score, result in matches:
+            print(f"得分: {score}")
+            print_result(result)
+        print()
+
+def lookup_install_path(software_name, search_store=False, cache=None, backend=None, appx_cache=None):
+    """先搜索传统软件，没找到且search_store为True时再搜索应用商店应用
+    
+    传入cache时先查缓存，未命中才真正查询，结果（包括未找到）写入缓存。
+    名称中连续的空白合并为一个，与缓存键的规范化一致。appx_cache为应用商店应用详情缓存文件，
+    与get_all_windows_software扫描时使用的是同一个文件。
+    """
+    software_name = ' '.join(software_name.split())
+    if cache is not None:
+        result = cache.get(software_name, search_store)
+        if result is not MISS:
+            return result
+    
+    matches = search_install_paths(software_name, search_store, backend, appx_cache=appx_cache)
+    result = matches[0] if matches else None
+    
+    if cache is not None:
+        cache.put(software_name, search_store, result)
+    return result
+
+def appx_cache_path(args):
+    """应用商店应用详情缓存文件，--no-cache时返回None"""
+    return None if args.no_cache else default_cache_path(APPX_CACHE_FILE)
+
+def open_cache(args, backend):
+    """按命令行参数打开查询缓存，--no-cache时返回None"""
+    if args.no_cache:
+        return None
+    cache = InstallPathCache(args.cache_file, args.cache_ttl, args.cache_size, backend)
+    if args.clear_cache:
+        cache.clear()
+    if args.warm_from:
+        try:
+            count = cache.warm_from_export(args.warm_from)
+            print(f"已用 {args.warm_from} 预热缓存: {count}条带安装路径的记录")
+        except (OSError, ValueError) as e:
+            print(f"读取导出文件 {args.warm_from} 时出错: {e}")
+    return cache
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='获取指定软件的安装路径')
+    parser.add_argument('software_name', nargs='*', help='要查找的软件名称，给出多个时批量查找')
+    parser.add_argument('--search-store', action='store_true', help='同时搜索应用商店应用')
+    parser.add_argument('--names-file', metavar='FILE', help='批量查找：从文件读取名称，每行一个，-表示标准输入')
+    parser.add_argument('--all', action='store_true', help='并行查询全部来源并列出所有匹配项，而不是只取第一个')
+    parser.add_argument('--json', action='store_true', help='批量查找或--all时以JSON输出全部结果')
+    parser.add_argument('--fuzzy', action='store_true', help='模糊查找：名称可以是缩写或有拼写错误，按得分列出候选')
+    parser.add_argument('--top', type=int, default=DEFAULT_TOP, help=f'模糊查找时每个名称最多列出的候选数（默认{DEFAULT_TOP}）')
+    parser.add_argument('--no-cache', action='store_true', help='不使用查询缓存和应用商店应用详情缓存')
+    parser.add_argument('--cache-file', help='缓存文件（默认放在扫描缓存目录中）')
+    parser.add_argument('--cache-ttl', type=float, default=DEFAULT_TTL, help=f'缓存结果的有效期秒数（默认{DEFAULT_TTL}）')
+    parser.add_argument('--cache-size', type=int, default=DEFAULT_MAX_ENTRIES, help=f'最多缓存的查询数（默认{DEFAULT_MAX_ENTRIES}）')
+    parser.add_argument('--warm-from', metavar='EXPORT', help='用完整扫描导出的JSON/NDJSON文件预热缓存')
+    parser.add_argument('--clear-cache', action='store_true', help='清空查询缓存')
+    
+    args = parser.parse_args()
+    names = list(args.software_name)
+    if args.names_file:
+        try:
+            names.extend(read_names(args.names_file))
+        except OSError as e:
+            parser.error(f"无法读取名称文件: {e}")
+    if not names and not (args.warm_from or args.clear_cache):
+        parser.error("需要指定要查找的软件名称")
+    
+    backend = default_backend()
+    
+    if args.fuzzy:
+        run_fuzzy(names, args, backend)
+        return
+    
+    if args.all and names:
+        run_all(names, args, backend)
+        return
+    
+    # 多个名称时一次枚举、全部匹配，不经过单个查询的缓存
+    if len(names) > 1 or args.names_file:
+        run_batch(names, args, backend)
+        return
+    
+    cache = open_cache(args, backend)
+    
+    try:
+        if not names:
+            return
+        result = lookup_install_path(names[0], args.search_store, cache, backend, appx_cache_path(args))
+    finally:
+        if cache is not None:
+            try:
+                cache.save()
+            except OSError as e:
+                print(f"写入缓存时出错: {e}")
+    
+    if result:
+        print_result(result)
+        return
+    
+    print(f"未找到包含 '{names[0]}' 的软件")
+
+if __name__ == "__main__":
     main()
\ No newline at end of file
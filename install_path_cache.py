@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+安装路径查询缓存
+项目名称项目组Seraphiel 作者 TraeAI - 日期 2025-11-19 版本 1.0
+描述: 保存get_software_install_path的查询结果（包括未找到），以规范化后的查询为键。
+      每条结果有有效期，条目数超过上限时淘汰最久未使用的；卸载项注册表根键发生变化
+      （安装或卸载了软件）时整个缓存失效。还可以用最近一次完整扫描的导出文件预热，
+      未缓存过的名称直接在导出的记录中查找，找不到再真正查询。
+      缓存文件通过scan_cache读写，带校验和，写入是原子的。
+"""
+
+import fnmatch
+import os
+import time
+from collections import OrderedDict
+
+from export_writer import read_records
+from registry_backend import uninstall_change_token
+from scan_cache import default_cache_path, load_cache, save_cache
+
+CACHE_KIND = 'install_path'
+CACHE_VERSION = 1
+
+DEFAULT_TTL = 24 * 3600
+DEFAULT_MAX_ENTRIES = 512
+
+# 命中时最后使用时间相差超过这么多秒才写回文件，避免每次命中都重写缓存
+TOUCH_INTERVAL = 60
+
+# get()的返回值：缓存中没有可用结果（缓存的"未找到"返回None）
+MISS = object()
+
+
+def normalize_query(name):
+    """查询键: 去掉首尾空白、合并连续空白、不区分大小写"""
+    return ' '.join(name.split()).casefold()
+
+
+def query_matcher(query):
+    """返回判断小写显示名是否匹配的函数，规则与get_software_install_path.matches_name相同:
+    *query*，不区分大小写，支持通配符；不含通配符时直接判断子串，比fnmatch快得多
+    """
+    query = query.lower()
+    if any(char in query for char in '*?['):
+        pattern = f"*{query}*"
+        return lambda name: fnmatch.fnmatchcase(name, pattern)
+    return lambda name: query in name
+
+
+class InstallPathCache:
+    """安装路径查询结果的持久化LRU缓存
+
+    backend为注册表后端时用卸载项根键的变化使缓存失效；为None时（没有winreg）只依靠有效期。
+    """
+
+    def __init__(self, path=None, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES, backend=None):
+        self.path = path or default_cache_path('install_path_cache.json')
+        self.ttl = ttl
+        self.max_entries = max(1, max_entries)
+        self.backend = backend
+        self.queries = OrderedDict()
+        self.warm = None
+        self._warm_names = None
+        self.token = None
+        self.dirty = False
+        self.stats = {'hits': 0, 'warm_hits': 0, 'misses': 0}
+        self._load()
+
+    def _current_token(self):
+        if self.backend is None:
+            return None
+        try:
+            return uninstall_change_token(self.backend)
+        except Exception:
+            return None
+
+    def _load(self):
+        self.token = self._current_token()
+        entries = load_cache(self.path, CACHE_KIND, CACHE_VERSION)
+        if entries is None:
+            return
+        if entries.get('token') != self.token:
+            # 安装或卸载过软件，旧结果全部作废
+            self.dirty = True
+            return
+
+        # 文件中按最后使用时间保存，最久未使用的在前
+        for key, entry in sorted(entries.get('queries', {}).items(), key=lambda item: item[1]['used']):
+            self.queries[key] = entry
+        self.warm = entries.get('warm')
+
+    @staticmethod
+    def key(name, search_store=False):
+        return f"{'store' if search_store else 'registry'}:{normalize_query(name)}"
+
+    def get(self, name, search_store=False):
+        """返回缓存的结果（None表示缓存的"未找到"），没有可用结果时返回MISS"""
+        key = self.key(name, search_store)
+        now = time.time()
+        entry = self.queries.get(key)
+        if entry is not None:
+            if now - entry['stored'] <= self.ttl:
+                self.queries.move_to_end(key)
+                if now - entry['used'] > TOUCH_INTERVAL:
+                    entry['used'] = now
+                    self.dirty = True
+                self.stats['hits'] += 1
+                return entry['result']
+            del self.queries[key]
+            self.dirty = True
+
+        result = self._lookup_warm(name, search_store, now)
+        if result is not None:
+            self.put(name, search_store, result)
+            self.stats['warm_hits'] += 1
+            return result
+
+        self.stats['misses'] += 1
+        return MISS
+
+    def put(self, name, search_store, result):
+        now = time.time()
+        key = self.key(name, search_store)
+        self.queries[key] = {'result': result, 'stored': now, 'used': now}
+        self.queries.move_to_end(key)
+        while len(self.queries) > self.max_entries:
+            self.queries.popitem(last=False)
+        self.dirty = True
+
+    def _lookup_warm(self, name, search_store, now):
+        """在预热的导出记录中查找，规则与实际查询相同: 先传统软件，再（可选）应用商店应用
+
+        导出文件可能经过过滤，这里找不到并不代表软件不存在，所以只返回找到的结果。
+        """
+        warm = self.warm
+        if not warm or now - warm['created'] > self.ttl:
+            return None
+        if self._warm_names is None:
+            self._warm_names = [record['name'].lower() for record in warm['records']]
+        matches = query_matcher(name.strip())
+        types = ['传统软件', '应用商店应用'] if search_store else ['传统软件']
+        for type_name in types:
+            for record, lowered in zip(warm['records'], self._warm_names):
+                if record['type'] == type_name and matches(lowered):
+                    if type_name == '传统软件':
+                        return {'name': record['name'], 'install_path': record['install_path'],
+                                'uninstall_string': record['uninstall_string']}
+                    return {'name': record['name'], 'install_path': record['install_path'], 'type': type_name}
+        return None
+
+    def warm_from_records(self, records, created=None):
+        """用完整扫描的记录预热，只保留带安装路径的传统软件和应用商店应用，返回保留的条数"""
+        kept = [
+            {
+                'type': record.get('type'),
+                'name': record.get('name') or '',
+                'install_path': record.get('install_location') or '',
+                'uninstall_string': record.get('uninstall_string') or '',
+            }
+            for record in records
+            if record.get('type') in ('传统软件', '应用商店应用') and record.get('install_location')
+        ]
+        self.warm = {'created': created if created is not None else time.time(), 'records': kept}
+        self._warm_names = None
+        self.dirty = True
+        return len(kept)
+
+    def warm_from_export(self, path):
+        """用导出的JSON/NDJSON文件预热，文件的修改时间作为扫描时间"""
+        return self.warm_from_records(read_records(path), os.path.getmtime(path))
+
+    def clear(self):
+        self.queries.clear()
+        self.warm = None
+        self._warm_names = None
+        self.dirty = True
+
+    def save(self):
+        """有变化时写回缓存文件"""
+        if not self.dirty:
+            return
+        entries = {'token': self.token, 'queries': dict(self.queries), 'warm': self.warm}
+        save_cache(self.path, CACHE_KIND, CACHE_VERSION, entries)
+        self.dirty = False
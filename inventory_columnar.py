@@ -0,0 +1,450 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+列式二进制清单格式
+项目名称项目组Seraphiel 作者 TraeAI - 日期 2025-11-19 版本 1.0
+描述: 把软件记录按列保存：名称、版本、发布者、类型、主机、扫描时间各占一列，
+      每列先写字典（不重复的取值，偏移表加UTF-8数据），再写每行的字典编号。
+      每个数据块前带8字节长度，文件末尾是JSON格式的列索引和索引长度。
+      ColumnarReader用mmap打开文件，查询时只解码条件涉及的列的字典和结果行用到的取值，
+      不需要像JSON导出那样先解析整个文件。pack/unpack与现有JSON/NDJSON导出互相转换。
+
+文件结构（整数均为小端序，数据块按8字节对齐）:
+    MAGIC | [长度 | 偏移表 | 字符串数据] [长度 | 行编号] ... | 索引JSON | 索引长度(4字节) | MAGIC
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import time
+from array import array
+from datetime import datetime
+
+from export_writer import COMPRESSION_SUFFIXES, export_records, read_records, replace_file
+from fleet_aggregate import iter_export_files
+from scan_cache import current_host
+
+MAGIC = b'SWCOL\x00\x01\x00'
+FORMAT_VERSION = 1
+
+COLUMNAR_SUFFIX = '.swcol'
+
+# 可直接查询的列
+COLUMNS = ('name', 'version', 'publisher', 'type', 'host', 'scanned_at')
+
+# 还原原始记录用的内部列: 字段名顺序（JSON数组，种类很少）和其余字段（JSON对象）
+KEYS_COLUMN = '_keys'
+EXTRA_COLUMN = '_extra'
+
+_BLOCK_HEADER = struct.Struct('<Q')
+_TRAILER = struct.Struct('<I')
+_ALIGN = 8
+
+# 字典大小对应的行编号宽度
+_CODE_TYPES = ((1 << 8, 'B'), (1 << 16, 'H'), (1 << 32, 'I'))
+
+
+def _little_endian(values):
+    if sys.byteorder != 'little':
+        values.byteswap()
+    return values.tobytes()
+
+
+def _int_view(view, typecode):
+    """把字节视图解释成整数序列；小端机器上直接转换视图，不复制数据"""
+    if sys.byteorder == 'little':
+        return view.cast(typecode)
+    values = array(typecode, view.tobytes())
+    values.byteswap()
+    return values
+
+
+class _ColumnBuilder:
+    """写入时的一列：取值到编号的字典加每行的编号"""
+
+    def __init__(self):
+        self.values = {}
+        self.codes = array('I')
+
+    def add(self, value):
+        code = self.values.get(value)
+        if code is None:
+            code = self.values[value] = len(self.values)
+        self.codes.append(code)
+
+
+class ColumnarWriter:
+    """逐条写入记录，关闭时把各列写成列式文件
+
+    与ExportWriter一样先写临时文件再改名。每列每行只在内存中保留4字节编号，加上不重复的取值。
+
+    用法:
+        with ColumnarWriter(path) as writer:
+            for record in records:
+                writer.add(record, host, scanned_at)
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self._columns = {name: _ColumnBuilder() for name in COLUMNS + (KEYS_COLUMN, EXTRA_COLUMN)}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+
+    def add(self, record, host='', scanned_at=''):
+        """添加一条记录；记录自带的host/scanned_at优先于参数"""
+        values = {'host': host, 'scanned_at': scanned_at}
+        extra = {}
+        for key, value in record.items():
+            if key in COLUMNS and type(value) is str:
+                values[key] = value
+            else:
+                # 非字符串的取值（例如去重后的sources）原样保存在_extra中
+                extra[key] = value
+
+        for name in COLUMNS:
+            self._columns[name].add(values.get(name, ''))
+        self._columns[KEYS_COLUMN].add(json.dumps(list(record.keys()), ensure_ascii=False))
+        self._columns[EXTRA_COLUMN].add(json.dumps(extra, ensure_ascii=False) if extra else '')
+        self.count += 1
+
+    def add_all(self, records, host='', scanned_at=''):
+        for record in records:
+            self.add(record, host, scanned_at)
+        return self.count
+
+    def close(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(prefix='.tmp-', dir=directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                self._write(f)
+            replace_file(temp_path, self.path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+
+    def _write(self, f):
+        f.write(MAGIC)
+        columns = {}
+        for name, column in self._columns.items():
+            offsets = array('I', [0])
+            chunks = []
+            size = 0
+            for value in column.values:
+                data = value.encode('utf-8')
+                chunks.append(data)
+                size += len(data)
+                if size >= 1 << 32:
+                    raise ValueError(f"列 {name} 的取值超过4GB，无法写入")
+                offsets.append(size)
+
+            typecode = next(code for limit, code in _CODE_TYPES if len(column.values) <= limit)
+            meta = {'count': len(column.values), 'width': array(typecode).itemsize}
+            meta['offsets'] = _write_block(f, _little_endian(offsets))
+            meta['blob'] = _write_block(f, b''.join(chunks))
+            meta['blob_size'] = size
+            meta['codes'] = _write_block(f, _little_endian(array(typecode, column.codes)))
+            columns[name] = meta
+
+        footer = json.dumps({'format': FORMAT_VERSION, 'rows': self.count, 'columns': columns}).encode('utf-8')
+        f.write(footer)
+        f.write(_TRAILER.pack(len(footer)))
+        f.write(MAGIC)
+
+
+def _write_block(f, payload):
+    """写入一个带长度前缀的数据块，返回数据部分的偏移"""
+    f.write(_BLOCK_HEADER.pack(len(payload)))
+    offset = f.tell()
+    f.write(payload)
+    padding = -f.tell() % _ALIGN
+    if padding:
+        f.write(b'\x00' * padding)
+    return offset
+
+
+class _Column:
+    """读取时的一列：字典取值按需解码并缓存"""
+
+    def __init__(self, view, meta):
+        width = meta['width']
+        typecode = next(code for limit, code in _CODE_TYPES if array(code).itemsize == width)
+        self.count = meta['count']
+        self.offsets = _int_view(_block(view, meta['offsets']), 'I')
+        self.blob = _block(view, meta['blob'])
+        self.codes = _int_view(_block(view, meta['codes']), typecode)
+        self._decoded = {}
+
+    def value(self, code):
+        value = self._decoded.get(code)
+        if value is None:
+            value = self._decoded[code] = str(self.blob[self.offsets[code]:self.offsets[code + 1]], 'utf-8')
+        return value
+
+    def at(self, row):
+        return self.value(self.codes[row])
+
+    def matching_codes(self, predicate):
+        """对字典中每个取值调用predicate，返回满足条件的编号集合"""
+        return {code for code in range(self.count) if predicate(self.value(code))}
+
+    def release(self):
+        for view in (self.offsets, self.blob, self.codes):
+            if isinstance(view, memoryview):
+                view.release()
+
+
+def _block(view, offset):
+    size, = _BLOCK_HEADER.unpack_from(view, offset - _BLOCK_HEADER.size)
+    return view[offset:offset + size]
+
+
+class ColumnarReader:
+    """用mmap读取列式文件，列在第一次使用时才建立视图
+
+    用法:
+        with ColumnarReader(path) as reader:
+            rows = reader.match(name='python')
+            records = [reader.row(row) for row in rows]
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # 空文件无法映射
+            self._file.close()
+            raise ValueError(f"不是列式清单文件: {path}")
+        self._view = memoryview(self._map)
+        self._columns = {}
+        self._keys = {}
+        try:
+            self._read_footer()
+        except ValueError:
+            self.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __len__(self):
+        return self.rows
+
+    def _read_footer(self):
+        size = len(self._map)
+        trailer = _TRAILER.size + len(MAGIC)
+        if size < len(MAGIC) + trailer or self._map[:len(MAGIC)] != MAGIC or self._map[-len(MAGIC):] != MAGIC:
+            raise ValueError(f"不是列式清单文件: {self.path}")
+        footer_size, = _TRAILER.unpack_from(self._map, size - trailer)
+        footer = json.loads(self._map[size - trailer - footer_size:size - trailer])
+        if footer.get('format') != FORMAT_VERSION:
+            raise ValueError(f"不支持的列式文件版本: {footer.get('format')}")
+        self.rows = footer['rows']
+        self._meta = footer['columns']
+
+    def column(self, name):
+        column = self._columns.get(name)
+        if column is None:
+            if name not in self._meta:
+                raise ValueError(f"列式文件中没有列: {name}")
+            column = self._columns[name] = _Column(self._view, self._meta[name])
+        return column
+
+    def match(self, name=None, publisher=None, type=None, host=None):
+        """返回满足条件的行号列表；名称和发布者为不区分大小写的包含匹配，类型和主机为精确匹配
+
+        先在各列的字典上求出满足条件的编号，再扫描这几列的行编号，其余列不会被读取。
+        """
+        conditions = []
+        if name:
+            needle = name.lower()
+            conditions.append(('name', lambda value: needle in value.lower()))
+        if publisher:
+            needle_publisher = publisher.lower()
+            conditions.append(('publisher', lambda value: needle_publisher in value.lower()))
+        if type:
+            conditions.append(('type', lambda value: value == type))
+        if host:
+            conditions.append(('host', lambda value: value == host))
+
+        if not conditions:
+            return range(self.rows)
+
+        selections = []
+        for column_name, predicate in conditions:
+            column = self.column(column_name)
+            codes = column.matching_codes(predicate)
+            if not codes:
+                return []
+            if len(codes) < column.count:
+                selections.append((column.codes, codes))
+        if not selections:
+            return range(self.rows)
+
+        # 字典上命中的取值最少的列通常也最有选择性，先扫描它
+        selections.sort(key=lambda selection: len(selection[1]))
+        codes, wanted = selections[0]
+        if len(wanted) == 1:
+            code, = wanted
+            rows = [row for row, value in enumerate(codes) if value == code]
+        else:
+            rows = [row for row, value in enumerate(codes) if value in wanted]
+        for codes, wanted in selections[1:]:
+            rows = [row for row in rows if codes[row] in wanted]
+        return rows
+
+    def row(self, row, columns=COLUMNS):
+        """读取一行中指定的列"""
+        return {name: self.column(name).at(row) for name in columns}
+
+    def record(self, row):
+        """还原写入时的原始记录，字段顺序与写入前相同"""
+        keys_column = self.column(KEYS_COLUMN)
+        code = keys_column.codes[row]
+        keys = self._keys.get(code)
+        if keys is None:
+            keys = self._keys[code] = json.loads(keys_column.value(code))
+        extra = self.column(EXTRA_COLUMN).at(row)
+        extra = json.loads(extra) if extra else {}
+
+        record = {}
+        for key in keys:
+            record[key] = extra[key] if key in extra else self.column(key).at(row)
+        return record
+
+    def records(self):
+        """按写入顺序逐条产出原始记录"""
+        for row in range(self.rows):
+            yield self.record(row)
+
+    def query(self, filters, columns=COLUMNS, limit=None):
+        """接受与filter_software相同的过滤器字典（另外支持host），返回各行指定列组成的字典列表"""
+        rows = self.match(filters.get('name'), filters.get('publisher'), filters.get('type'), filters.get('host'))
+        if limit is not None:
+            rows = rows[:limit]
+        return [self.row(row, columns) for row in rows]
+
+    def close(self):
+        for column in self._columns.values():
+            column.release()
+        self._columns = {}
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+
+def file_scan_time(path):
+    """没有记录扫描时间时，用导出文件的修改时间代替"""
+    return datetime.fromtimestamp(os.path.getmtime(path)).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def pack_exports(paths, output, host=None):
+    """把导出文件转换成一个列式文件，返回 (文件数, 记录数)
+
+    主机名依次取: 记录中的host字段、host参数、只转换一个文件时为本机名，
+    多个文件时为导出文件所在目录名（与fleet汇总的 主机名/windows_software_report.json 目录结构一致）。
+    """
+    paths = list(iter_export_files(paths))
+    files = 0
+    with ColumnarWriter(output) as writer:
+        for path in paths:
+            if host:
+                file_host = host
+            elif len(paths) == 1:
+                file_host = current_host()
+            else:
+                file_host = os.path.basename(os.path.dirname(os.path.abspath(path)))
+            writer.add_all(read_records(path), file_host, file_scan_time(path))
+            files += 1
+        return files, writer.count
+
+
+def unpack_export(path, output, format_type='json', compression=None):
+    """把列式文件转换回JSON/NDJSON导出，返回 (导出文件路径, 记录数)；压缩时追加对应的扩展名"""
+    if compression and not output.endswith(COMPRESSION_SUFFIXES[compression]):
+        output += COMPRESSION_SUFFIXES[compression]
+    with ColumnarReader(path) as reader:
+        return output, export_records(reader.records(), output, format_type, compression)
+
+
+def add_columnar_arguments(parser):
+    """为columnar子命令添加参数"""
+    actions = parser.add_subparsers(dest='columnar_action', title='操作')
+    actions.required = True
+
+    pack = actions.add_parser('pack', help='把JSON/NDJSON导出文件转换成列式文件')
+    pack.add_argument('paths', nargs='+', help='导出文件或包含导出文件的目录')
+    pack.add_argument('--output', required=True, help=f'列式文件路径（建议使用{COLUMNAR_SUFFIX}扩展名）')
+    pack.add_argument('--host', help='记录所属主机（默认单个文件为本机名，多个文件为所在目录名）')
+
+    unpack = actions.add_parser('unpack', help='把列式文件转换回JSON/NDJSON导出')
+    unpack.add_argument('path', help='列式文件')
+    unpack.add_argument('--output', required=True, help='导出文件路径')
+    unpack.add_argument('--format', choices=['json', 'ndjson'], default='json', help='导出格式')
+    unpack.add_argument('--compress', choices=sorted(COMPRESSION_SUFFIXES), help='压缩导出文件')
+
+    query = actions.add_parser('query', help='查询列式文件')
+    query.add_argument('path', help='列式文件')
+    query.add_argument('--name', help='名称包含（不区分大小写）')
+    query.add_argument('--publisher', help='发布者包含（不区分大小写）')
+    query.add_argument('--type', help='记录类型（传统软件/应用商店应用/系统功能等）')
+    query.add_argument('--host', help='只查询指定主机')
+    query.add_argument('--columns', default=','.join(COLUMNS), help=f'输出的列，逗号分隔（默认{",".join(COLUMNS)}）')
+    query.add_argument('--limit', type=int, default=100, help='最多显示的记录数')
+    query.add_argument('--json', action='store_true', help='以JSON格式输出')
+
+
+def run_columnar(args):
+    """执行columnar子命令"""
+    started = time.perf_counter()
+    try:
+        if args.columnar_action == 'pack':
+            files, count = pack_exports(args.paths, args.output, args.host)
+            print(f"已转换 {files} 个文件, {count} 条记录, 耗时{time.perf_counter() - started:.2f}秒")
+            print(f"列式文件: {os.path.abspath(args.output)} ({os.path.getsize(args.output) / 1024:.1f}KB)")
+        elif args.columnar_action == 'unpack':
+            output, count = unpack_export(args.path, args.output, args.format, args.compress)
+            print(f"已导出 {count} 条记录到: {os.path.abspath(output)}")
+        else:
+            query_columnar(args)
+    except (OSError, ValueError) as e:
+        print(f"处理列式文件时出错: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+def query_columnar(args):
+    columns = [name.strip() for name in args.columns.split(',') if name.strip()]
+    unknown = [name for name in columns if name not in COLUMNS]
+    if unknown:
+        raise ValueError(f"未知的列: {', '.join(unknown)}")
+    filters = {'name': args.name, 'publisher': args.publisher, 'type': args.type, 'host': args.host}
+
+    with ColumnarReader(args.path) as reader:
+        records = reader.query(filters, columns, args.limit)
+    if args.json:
+        print(json.dumps(records, ensure_ascii=False, indent=2))
+        return
+    print(f"查询结果 ({len(records)}条):")
+    for i, record in enumerate(records, 1):
+        print(f"{i}. " + "  ".join(f"{name}: {record[name]}" for name in columns))
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+软件清单快照比较
+项目名称项目组Seraphiel 作者 TraeAI - 日期 2025-11-19 版本 1.0
+描述: 比较两次导出的软件清单，列出新安装、已卸载和版本变化的记录。
+      每条记录以（类型, 名称）为键：默认把两份快照按键放入哈希表后比较；
+      两份快照都已按键排序时可以用--sorted逐条归并，内存占用与记录数无关。
+      结果输出为JSON或NDJSON，便于其他程序处理。
+"""
+
+import gc
+import itertools
+import json
+import os
+import sys
+import time
+
+from export_writer import read_records
+from inventory_normalize import parse_version
+
+CHANGE_KINDS = ['added', 'removed', 'changed']
+
+
+def record_key(record):
+    """记录的比较键: 类型加上不区分大小写的名称"""
+    return (record.get('type') or '', (record.get('name') or '').strip().casefold())
+
+
+def same_version(old, new):
+    """版本号相同（1.2 与 1.2.0 视为相同）"""
+    old = (old or '').strip()
+    new = (new or '').strip()
+    return old == new or parse_version(old) == parse_version(new)
+
+
+def change_record(kind, old, new):
+    """把一处变化整理成输出用的字典"""
+    base = new if new is not None else old
+    change = {'change': kind, 'type': base.get('type'), 'name': base.get('name')}
+    if kind == 'changed':
+        change['old_version'] = old.get('version', '')
+        change['new_version'] = new.get('version', '')
+    else:
+        change['version'] = base.get('version', '')
+    if base.get('publisher'):
+        change['publisher'] = base['publisher']
+    return change
+
+
+def diff_group(old_records, new_records, summary):
+    """比较同一个键下的记录，逐条产出(类型, 旧记录, 新记录)
+
+    同名软件可能并存多个版本：先配对版本相同的记录，剩下的按顺序配对为版本变化，多出来的算新增或卸载。
+    """
+    if len(old_records) == 1 and len(new_records) == 1:
+        old, new = old_records[0], new_records[0]
+        if same_version(old.get('version'), new.get('version')):
+            summary['unchanged'] += 1
+        else:
+            yield 'changed', old, new
+        return
+
+    remaining = list(old_records)
+    unmatched = []
+    for new in new_records:
+        for index, old in enumerate(remaining):
+            if same_version(old.get('version'), new.get('version')):
+                del remaining[index]
+                summary['unchanged'] += 1
+                break
+        else:
+            unmatched.append(new)
+
+    for old, new in itertools.zip_longest(remaining, unmatched):
+        if old is None:
+            yield 'added', None, new
+        elif new is None:
+            yield 'removed', old, None
+        else:
+            yield 'changed', old, new
+
+
+def _group_by_key(records):
+    """按键分组；只有一条记录的键直接存记录本身，重复的键才建列表
+
+    键的计算与record_key相同，这里展开写以减少函数调用。
+    """
+    groups = {}
+    for record in records:
+        key = (record.get('type') or '', (record.get('name') or '').strip().casefold())
+        group = groups.get(key)
+        if group is None:
+            groups[key] = record
+        elif isinstance(group, list):
+            group.append(record)
+        else:
+            groups[key] = [group, record]
+    return groups
+
+
+def diff_hashed(old_records, new_records, summary):
+    """把两份快照按键放入哈希表后比较，输入顺序不限"""
+    # 建表时会创建大量小对象，暂停垃圾回收避免反复扫描（这些对象之间没有循环引用）
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        old_groups = _group_by_key(old_records)
+        new_groups = _group_by_key(new_records)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    unchanged = 0
+    for key, new in new_groups.items():
+        old = old_groups.pop(key, None)
+        if old is None:
+            for record in new if isinstance(new, list) else [new]:
+                yield 'added', None, record
+        elif isinstance(old, list) or isinstance(new, list):
+            yield from diff_group(old if isinstance(old, list) else [old],
+                                  new if isinstance(new, list) else [new], summary)
+        elif old.get('version') == new.get('version') or same_version(old.get('version'), new.get('version')):
+            # 绝大多数键在两边各只有一条记录，且版本没有变化
+            unchanged += 1
+        else:
+            yield 'changed', old, new
+    summary['unchanged'] += unchanged
+    for old in old_groups.values():
+        for record in old if isinstance(old, list) else [old]:
+            yield 'removed', record, None
+
+
+def _sorted_groups(records, label):
+    """按键分组，同时检查输入确实按键排序"""
+    previous = None
+    for key, group in itertools.groupby(records, key=record_key):
+        if previous is not None and key <= previous:
+            raise ValueError(f"{label}未按（类型, 名称）排序，出现在 {key[1]!r} 附近，请去掉--sorted")
+        previous = key
+        yield key, list(group)
+
+
+def diff_sorted(old_records, new_records, summary):
+    """两份快照都已按键排序时逐组归并，只在内存中保留当前这一组"""
+    old_groups = _sorted_groups(old_records, "旧快照")
+    new_groups = _sorted_groups(new_records, "新快照")
+    old = next(old_groups, None)
+    new = next(new_groups, None)
+
+    while old is not None or new is not None:
+        if new is None or (old is not None and old[0] < new[0]):
+            for record in old[1]:
+                yield 'removed', record, None
+            old = next(old_groups, None)
+        elif old is None or new[0] < old[0]:
+            for record in new[1]:
+                yield 'added', None, record
+            new = next(new_groups, None)
+        else:
+            yield from diff_group(old[1], new[1], summary)
+            old = next(old_groups, None)
+            new = next(new_groups, None)
+
+
+def diff_snapshots(old_records, new_records, assume_sorted=False, summary=None):
+    """比较两份快照，逐条产出变化字典；summary中累计各类变化的数量"""
+    if summary is None:
+        summary = {}
+    for kind in CHANGE_KINDS + ['unchanged']:
+        summary.setdefault(kind, 0)
+
+    diff = diff_sorted if assume_sorted else diff_hashed
+    for kind, old, new in diff(old_records, new_records, summary):
+        summary[kind] += 1
+        yield change_record(kind, old, new)
+
+
+def write_diff(changes, summary, stream, format_type='json'):
+    """把变化写入文本流: json为按类型分组的单个对象，ndjson每行一处变化，最后一行是统计"""
+    if format_type == 'ndjson':
+        for change in changes:
+            stream.write(json.dumps(change, ensure_ascii=False))
+            stream.write("\n")
+        stream.write(json.dumps({'summary': summary}, ensure_ascii=False))
+        stream.write("\n")
+        return
+
+    grouped = {kind: [] for kind in CHANGE_KINDS}
+    for change in changes:
+        grouped[change['change']].append(change)
+    json.dump(dict(summary=summary, **grouped), stream, ensure_ascii=False, indent=2)
+    stream.write("\n")
+
+
+def add_diff_arguments(parser):
+    """为diff子命令添加参数"""
+    parser.add_argument('old', help='旧快照（导出的JSON/NDJSON文件，可压缩）')
+    parser.add_argument('new', help='新快照')
+    parser.add_argument('--sorted', action='store_true', help='两份快照都已按（类型, 名称）排序，逐条归并比较')
+    parser.add_argument('--format', choices=['json', 'ndjson'], default='json', help='输出格式')
+    parser.add_argument('--output', help='输出文件（默认输出到屏幕）')
+
+
+def run_diff(args):
+    """执行diff子命令"""
+    started = time.perf_counter()
+    summary = {}
+    try:
+        changes = diff_snapshots(read_records(args.old, compact=True), read_records(args.new, compact=True),
+                                 args.sorted, summary)
+        if not args.output:
+            write_diff(changes, summary, sys.stdout, args.format)
+            return
+        with open(args.output, 'w', encoding='utf-8') as f:
+            write_diff(changes, summary, f, args.format)
+    except (OSError, ValueError) as e:
+        print(f"比较快照时出错: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print(f"比较完成: 新增{summary['added']}个, 卸载{summary['removed']}个, "
+          f"版本变化{summary['changed']}个, 未变{summary['unchanged']}个, "
+          f"耗时{time.perf_counter() - started:.2f}秒")
+    print(f"结果已导出到: {os.path.abspath(args.output)}")
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+软件清单内存索引
+项目名称项目组Seraphiel 作者 TraeAI - 日期 2025-11-19 版本 1.0
+描述: 为软件清单建立索引，加速按名称、发布者（子串、不区分大小写）和类型（精确匹配）的查询。
+      名称和发布者预先转成小写并建立三字母组（trigram）倒排表，类型建立哈希索引；
+      多个条件同时出现时对候选集合求交集，最后再逐条核对子串，结果与线性扫描完全一致。
+"""
+
+from collections import defaultdict
+
+GRAM_SIZE = 3
+
+
+class TextIndex:
+    """单个文本字段的trigram子串索引
+
+    相同的值只索引一次（发布者、类型这类字段重复度很高），倒排表记录的是去重后的值编号。
+    """
+
+    def __init__(self, values):
+        self.distinct = []
+        self.value_records = []
+        value_ids = {}
+        for record_id, value in enumerate(values):
+            value_id = value_ids.get(value)
+            if value_id is None:
+                value_id = value_ids[value] = len(self.distinct)
+                self.distinct.append(value)
+                self.value_records.append([])
+            self.value_records[value_id].append(record_id)
+
+        postings = defaultdict(list)
+        for value_id, value in enumerate(self.distinct):
+            for gram in {value[i:i + GRAM_SIZE] for i in range(len(value) - GRAM_SIZE + 1)}:
+                postings[gram].append(value_id)
+        self.postings = dict(postings)
+
+    def matching_values(self, needle):
+        """返回包含needle的去重值编号；needle短于三个字符时直接扫描去重后的值"""
+        if len(needle) < GRAM_SIZE:
+            return [value_id for value_id, value in enumerate(self.distinct) if needle in value]
+
+        postings = []
+        for gram in {needle[i:i + GRAM_SIZE] for i in range(len(needle) - GRAM_SIZE + 1)}:
+            posting = self.postings.get(gram)
+            if not posting:
+                return []
+            postings.append(posting)
+        postings.sort(key=len)
+
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates.intersection_update(posting)
+            if not candidates:
+                return []
+
+        # trigram只能排除不可能的值，命中的候选仍需核对完整子串
+        return [value_id for value_id in candidates if needle in self.distinct[value_id]]
+
+    def matching_records(self, needle):
+        """返回字段值包含needle的记录编号集合"""
+        records = set()
+        for value_id in self.matching_values(needle):
+            records.update(self.value_records[value_id])
+        return records
+
+
+class InventoryIndex:
+    """软件记录列表上的查询索引，建立后可反复查询"""
+
+    def __init__(self, records):
+        self.records = list(records)
+        self.names = TextIndex([(record.get('name') or '').lower() for record in self.records])
+        self.publishers = TextIndex([(record.get('publisher') or '').lower() for record in self.records])
+        self.types = {}
+        for record_id, record in enumerate(self.records):
+            self.types.setdefault(record.get('type'), []).append(record_id)
+        self.type_sets = {type_name: set(ids) for type_name, ids in self.types.items()}
+
+    def __len__(self):
+        return len(self.records)
+
+    def search(self, name=None, type=None, publisher=None):
+        """按条件查询，返回的记录保持原始顺序；未给出的条件不参与过滤"""
+        if type and not name and not publisher:
+            return [self.records[record_id] for record_id in self.types.get(type, ())]
+
+        candidate_sets = []
+        if type:
+            candidate_sets.append(self.type_sets.get(type, set()))
+        if name:
+            candidate_sets.append(self.names.matching_records(name.lower()))
+        if publisher:
+            candidate_sets.append(self.publishers.matching_records(publisher.lower()))
+
+        if not candidate_sets:
+            return list(self.records)
+
+        # 从最小的集合开始求交集
+        candidate_sets.sort(key=len)
+        result = candidate_sets[0]
+        for candidates in candidate_sets[1:]:
+            result = result & candidates
+            if not result:
+                return []
+
+        return [self.records[record_id] for record_id in sorted(result)]
+
+    def filter(self, filters):
+        """接受与filter_software相同的过滤器字典"""
+        return self.search(filters.get('name'), filters.get('type'), filters.get('publisher'))
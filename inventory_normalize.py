@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+软件清单规范化与去重
+项目名称项目组Seraphiel 作者 TraeAI - 日期 2025-11-19 版本 1.0
+描述: 同一个软件经常同时以注册表项、winget条目和Appx包三种形式出现，名称、版本和发布者的写法各不相同。
+      这里把名称和发布者规范化（发布者只有几十种写法，规范化结果带缓存；名称几乎各不相同，不缓存），
+      版本只解析一次，再按规范化后的键把不同来源的重复记录合并，
+      合并后的记录在sources中保留每个来源的原始信息。整个过程按记录数线性执行。
+"""
+
+import re
+from functools import lru_cache
+
+from software_record import SoftwareRecord, compact_record
+
+# 参与去重的来源，按优先级排列：合并时以优先级最高的记录为基础
+SOFTWARE_SOURCES = ['传统软件', 'winget应用', '应用商店应用']
+
+_SOURCE_PRIORITY = {source: index for index, source in enumerate(SOFTWARE_SOURCES)}
+
+_TRADEMARKS = re.compile(r'[®™©]')
+# 括号内容和架构标记（小写后匹配）
+_NOISE = re.compile(r'\([^)]*\)|\[[^\]]*\]|\b(?:x64|x86|amd64|arm64|64[- ]?bit|32[- ]?bit|win64|win32)\b')
+_VERSION_TAIL = re.compile(r'(\s+v?\d+(\.\d+)+[a-z0-9.-]*)+$')
+_CAMEL = re.compile(r'(?<=[a-z0-9])(?=[A-Z])|(?<=[A-Z])(?=[A-Z][a-z])')
+_LETTER_DIGIT = re.compile(r'(?<=[^\W\d_])(?=\d)')
+_NON_WORD = re.compile(r'[^\w+#]+')
+_PUBLISHER_SUFFIX = re.compile(
+    r'\b(corporation|corp|incorporated|inc|llc|ltd|limited|co|company|gmbh|ag|s\.?r\.?o|sa|bv|plc)\b\.?')
+_DN_FIELD = re.compile(r'(?:^|,)\s*(O|CN)=("[^"]*"|[^,]*)')
+_VERSION_TOKEN = re.compile(r'\d+|[a-z]+')
+
+UNKNOWN_PUBLISHERS = {'', 'unknown', '未知'}
+
+_STOPWORDS = {'the'}
+
+# 名称开头最多用几个词去匹配发布者（"Video LAN VLC" 中的 "video lan"）
+MAX_VENDOR_WORDS = 3
+
+
+@lru_cache(maxsize=65536)
+def canonical_publisher(publisher):
+    """规范化发布者: 提取证书DN中的组织名，去掉公司后缀和标点，转小写"""
+    if not publisher:
+        return ''
+    text = publisher.strip()
+    if '=' in text:
+        # Appx发布者形如 "CN=Microsoft Corporation, O=Microsoft Corporation, L=Redmond, ..."
+        fields = dict((key, value.strip('"')) for key, value in _DN_FIELD.findall(text))
+        text = fields.get('O') or fields.get('CN') or text
+    text = _TRADEMARKS.sub('', text.lower())
+    if text in UNKNOWN_PUBLISHERS:
+        return ''
+    text = _PUBLISHER_SUFFIX.sub(' ', text)
+    return ' '.join(_NON_WORD.sub(' ', text).split())
+
+
+@lru_cache(maxsize=65536)
+def vendor_tokens(publisher):
+    """规范化发布者可能出现在软件名开头的写法：整个名称去掉空格，以及第一个有意义的词"""
+    words = [word for word in publisher.split() if word not in _STOPWORDS]
+    if not words:
+        return ()
+    return tuple({''.join(words), words[0]})
+
+
+def canonical_name(name, identifier=False):
+    """规范化名称，返回词元组: 拆开驼峰，去掉括号、架构标记和末尾版本号
+
+    identifier为True时name是"发布者.软件"形式的包标识（Appx包名、winget包ID），
+    返回的第一个词是去掉空格后的发布者段。
+    """
+    if not name:
+        return ()
+    text = name.strip().rstrip('…').rstrip('.')
+    vendor = ()
+    if identifier and '.' in text:
+        segment, text = text.split('.', 1)
+        vendor = (_NON_WORD.sub('', segment.lower()),)
+        text = text.replace('.', ' ')
+    text = _CAMEL.sub(' ', text)
+    text = _TRADEMARKS.sub('', text.lower())
+    text = _NOISE.sub(' ', text)
+    text = _VERSION_TAIL.sub('', ' '.join(text.split()))
+    # 包标识没有空格，"Player11" 与 "Player 11" 视为同一写法
+    text = _LETTER_DIGIT.sub(' ', text)
+    return vendor + tuple(_NON_WORD.sub(' ', text).split())
+
+
+def _strip_vendor(words, tokens):
+    """名称以发布者开头时去掉发布者（"Microsoft Visual Studio Code" -> "visual studio code"），返回剩下的词"""
+    for size in range(1, min(MAX_VENDOR_WORDS, len(words) - 1) + 1):
+        if ''.join(words[:size]) in tokens:
+            return words[size:]
+    return None
+
+
+def parse_version(version):
+    """解析版本号为可比较的元组，末尾的0段被去掉，因此 1.2 与 1.2.0.0 相等"""
+    if version is None:
+        return ()
+    parts = [int(token) if token.isdigit() else token for token in _VERSION_TOKEN.findall(str(version).lower())]
+    while parts and parts[-1] == 0:
+        parts.pop()
+    return tuple(parts)
+
+
+def _version_order(parsed):
+    """让数字段与字母段可以互相比较（数字段排在前面）"""
+    return tuple((0, part) if isinstance(part, int) else (1, part) for part in parsed)
+
+
+def _compatible(group, publisher, record_type, version):
+    """发布者一致（或有一方未知），且组内没有同一来源的其他版本（并存安装的多个版本不合并）"""
+    group_publisher, position, versions = group
+    if group_publisher and publisher and group_publisher != publisher:
+        return False
+    return versions.get(record_type, version) == version
+
+
+def _provenance(record):
+    source = {'type': record.get('type'), 'name': record.get('name', '')}
+    for field in ('version', 'publisher', 'package_name', 'package_id'):
+        if record.get(field):
+            source[field] = record[field]
+    return source
+
+
+def canonical_keys(record, vendors):
+    """计算记录的候选去重键，返回[(键, 规范化发布者), ...]，越靠前越优先
+
+    名称开头的发布者被去掉，这样 "Microsoft Edge"、"Edge" 和 "Microsoft.MicrosoftEdge" 得到同一个键。
+    记录没有发布者时，用vendors（其他记录中出现过的发布者）识别名称开头的发布者并当作这条记录的发布者，
+    同时保留不去掉开头的键作为备选（"Python Tools" 也可能是别的发布者的软件）。
+    """
+    publisher = canonical_publisher(record.get('publisher') or '')
+    identifier = bool(record.get('package_name')) or record.get('package_id') == record.get('name')
+    words = canonical_name(record.get('name') or '', identifier)
+
+    if identifier and len(words) > 1:
+        return [(' '.join(words[1:]), publisher or vendors.get(words[0], ''))]
+    if publisher:
+        return [(' '.join(_strip_vendor(words, vendor_tokens(publisher)) or words), publisher)]
+
+    keys = []
+    for size in range(1, min(MAX_VENDOR_WORDS, len(words) - 1) + 1):
+        vendor = vendors.get(''.join(words[:size]))
+        if vendor:
+            keys.append((' '.join(words[size:]), vendor))
+            break
+    keys.append((' '.join(words), ''))
+    return keys
+
+
+def dedupe_records(records):
+    """合并不同来源的重复软件记录
+
+    只有SOFTWARE_SOURCES中的记录参与去重，系统功能、服务等原样保留。
+    去重键相同且发布者一致（或有一方未知）的记录合并为一条，同一来源中版本不同的记录视为并存安装，不合并；
+    以来源优先级最高的记录为基础，缺失字段从其余记录补齐，version取最高版本，
+    sources列出所有来源。返回的记录顺序与每组第一次出现的位置一致。
+    """
+    records = records if isinstance(records, list) else list(records)
+
+    # 第一遍收集发布者，用来识别没有发布者信息的记录（winget）名称中的发布者
+    vendors = {}
+    for record in records:
+        if record.get('type') in _SOURCE_PRIORITY:
+            publisher = canonical_publisher(record.get('publisher') or '')
+            if publisher:
+                for token in vendor_tokens(publisher):
+                    vendors.setdefault(token, publisher)
+
+    output = []
+    groups = {}  # 去重键 -> [[规范化发布者, 输出位置, {来源: 解析后的版本}], ...]
+
+    for record in records:
+        record_type = record.get('type')
+        if record_type not in _SOURCE_PRIORITY:
+            output.append(record)
+            continue
+
+        keys = canonical_keys(record, vendors)
+        key, publisher = next((item for item in keys if item[0] in groups), keys[0])
+        if not key:
+            output.append(record)
+            continue
+
+        version = parse_version(record.get('version'))
+        bucket = groups.setdefault(key, [])
+        candidates = [group for group in bucket if _compatible(group, publisher, record_type, version)]
+        if candidates:
+            # 同名软件并存多个版本时，优先归入版本相同的那一组
+            group = next((group for group in candidates if version in group[2].values()), candidates[0])
+            output[group[1]].append((record, version))
+            group[2][record_type] = version
+            if not group[0]:
+                group[0] = publisher
+        else:
+            bucket.append([publisher, len(output), {record_type: version}])
+            output.append([(record, version)])
+
+    return [_merge_group(item) if isinstance(item, list) else item for item in output]
+
+
+def _merge_group(group):
+    """把一组重复记录合并成一条；group是 [(记录, 解析后的版本), ...]，输入是SoftwareRecord时输出也是SoftwareRecord"""
+    first = group[0][0]
+    if len(group) == 1:
+        record = dict(first)
+        record['sources'] = [_provenance(first)]
+        return compact_record(record) if isinstance(first, SoftwareRecord) else record
+
+    ordered = sorted(group, key=lambda item: _SOURCE_PRIORITY[item[0]['type']])
+    merged = dict(ordered[0][0])
+    for record, _ in ordered[1:]:
+        for field, value in record.items():
+            if value and not merged.get(field):
+                merged[field] = value
+
+    # 发布者以可读性最好的来源为准，尽量不用Appx的证书DN，也不用"未知"
+    known = [record['publisher'] for record, _ in ordered if canonical_publisher(record.get('publisher') or '')]
+    if known:
+        merged['publisher'] = next((publisher for publisher in known if '=' not in publisher), known[0])
+
+    best = max(ordered, key=lambda item: _version_order(item[1]))[0]
+    if best.get('version'):
+        merged['version'] = best['version']
+
+    merged['sources'] = [_provenance(record) for record, _ in group]
+    return compact_record(merged) if isinstance(first, SoftwareRecord) else merged
@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+常驻软件清单服务
+项目名称项目组Seraphiel 作者 TraeAI - 日期 2025-11-19 版本 1.0
+描述: 长期运行，在内存中保存最近一次扫描的软件清单并建立索引，通过本机HTTP接口回答查询，
+      监控程序不必每次都完整扫描一遍。后台线程按计划刷新，或在卸载项注册表发生变化时立即刷新；
+      刷新完成后整体替换清单快照，查询只读取当时的快照，不需要加锁，刷新期间也不会被阻塞。
+
+接口（GET，返回UTF-8编码的JSON）:
+    /software?name=&publisher=&type=&limit=    按名称、发布者（子串）和类型（精确）查询
+    /install-path?name=                        查找安装路径，规则与get_software_install_path相同（*name*）
+    /status                                    快照编号、记录数、扫描时间等
+POST /refresh 立即在后台刷新一次，请求必须带X-Inventory-Client头。
+
+访问控制: 监听本机地址时只接受Host（以及浏览器发送的Origin）是本机名称或地址的请求，
+防止网页通过DNS重绑定访问接口；POST必须带自定义请求头，浏览器跨站发送时需要预检，
+服务不响应预检，网页无法触发刷新。设置了令牌时每个请求都要带 Authorization: Bearer <令牌>；
+监听非本机地址时必须设置令牌。
+"""
+
+import fnmatch
+import hmac
+import ipaddress
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from inventory_index import InventoryIndex
+from registry_backend import default_backend, uninstall_change_token
+from software_record import json_default
+
+DEFAULT_PORT = 8765
+
+# 也可以用环境变量传入令牌，不出现在命令行参数中
+TOKEN_ENV = 'INVENTORY_SERVICE_TOKEN'
+
+# POST请求必须带的自定义请求头
+CLIENT_HEADER = 'X-Inventory-Client'
+
+LOOPBACK_NAMES = ('localhost', '127.0.0.1', '::1')
+
+
+def is_loopback(host):
+    """监听地址是否只能从本机访问"""
+    if host.lower() == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def split_host(value):
+    """把Host头或Origin中的主机部分拆成 (小写主机名, 端口)，格式不对时返回None"""
+    try:
+        url = urlsplit('//' + value)
+        return (url.hostname or ''), url.port
+    except ValueError:
+        return None
+
+
+class InventorySnapshot:
+    """一次扫描的结果及其索引，创建后不再修改"""
+
+    def __init__(self, records, generation, reason, scan_seconds):
+        self.index = InventoryIndex(records)
+        self.records = self.index.records
+        self.generation = generation
+        self.reason = reason
+        self.scan_seconds = scan_seconds
+        self.scanned_at = datetime.now().isoformat(timespec='seconds')
+
+    def search(self, name=None, type=None, publisher=None):
+        return self.index.search(name, type, publisher)
+
+    def install_paths(self, name):
+        """返回名称匹配 *name* 且带安装路径的全部记录，name中可以使用通配符"""
+        if any(char in name for char in '*?['):
+            pattern = f"*{name.lower()}*"
+            candidates = [record for record in self.records
+                          if fnmatch.fnmatchcase((record.get('name') or '').lower(), pattern)]
+        else:
+            candidates = self.index.search(name=name)
+        return [
+            {
+                'name': record.get('name', ''),
+                'type': record.get('type', ''),
+                'install_path': record['install_location'],
+                'uninstall_string': record.get('uninstall_string', ''),
+            }
+            for record in candidates if record.get('install_location')
+        ]
+
+
+class InventoryService:
+    """持有最新的清单快照，并在后台线程中刷新
+
+    scan是无参数的函数，返回软件记录列表；backend用于检测卸载项变化，为None时只按计划刷新。
+    """
+
+    def __init__(self, scan, interval=3600, poll_interval=10, backend=None):
+        self.scan = scan
+        self.interval = interval
+        self.poll_interval = poll_interval
+        self.backend = backend
+        self.snapshot = None
+        self.started = time.time()
+        self.queries = 0
+        self.refreshing = False
+        self.last_error = None
+
+        self._refresh_lock = threading.Lock()
+        self._requested = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._token = None
+
+    def change_token(self):
+        if self.backend is None:
+            return None
+        try:
+            return uninstall_change_token(self.backend)
+        except Exception as e:
+            print(f"检查注册表变化时出错: {e}")
+            return None
+
+    def refresh(self, reason='manual'):
+        """扫描一次并替换快照；同一时间只进行一次刷新，失败时保留旧快照"""
+        with self._refresh_lock:
+            self.refreshing = True
+            # 扫描前记录变化标记，扫描期间发生的变化会在下一次检查时再触发刷新
+            self._token = self.change_token()
+            started = time.perf_counter()
+            try:
+                records = self.scan()
+                generation = self.snapshot.generation + 1 if self.snapshot is not None else 1
+                self.snapshot = InventorySnapshot(records, generation, reason, time.perf_counter() - started)
+                self.last_error = None
+                print(f"[{self.snapshot.scanned_at}] 清单已刷新({reason}): {len(records)}条, "
+                      f"耗时{self.snapshot.scan_seconds:.2f}秒")
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"刷新软件清单时出错: {e}")
+            finally:
+                self.refreshing = False
+        return self.snapshot
+
+    def request_refresh(self):
+        self._requested.set()
+
+    def start(self):
+        """启动后台刷新线程"""
+        self._thread = threading.Thread(target=self._refresh_loop, name='inventory-refresh', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._requested.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def _refresh_loop(self):
+        next_refresh = time.monotonic() + self.interval
+        while not self._stopped.is_set():
+            self._requested.wait(max(0.0, min(self.poll_interval, next_refresh - time.monotonic())))
+            if self._stopped.is_set():
+                break
+
+            if self._requested.is_set():
+                self._requested.clear()
+                reason = 'request'
+            elif time.monotonic() >= next_refresh:
+                reason = 'schedule'
+            elif self.backend is not None and self.change_token() != self._token:
+                reason = 'change'
+            else:
+                continue
+
+            self.refresh(reason)
+            next_refresh = time.monotonic() + self.interval
+
+    def status(self):
+        snapshot = self.snapshot
+        status = {
+            'uptime_seconds': round(time.time() - self.started, 1),
+            'queries': self.queries,
+            'refreshing': self.refreshing,
+            'refresh_interval': self.interval,
+            'watch_registry': self.backend is not None,
+        }
+        if snapshot is not None:
+            status.update({
+                'generation': snapshot.generation,
+                'records': len(snapshot.records),
+                'scanned_at': snapshot.scanned_at,
+                'scan_seconds': round(snapshot.scan_seconds, 3),
+                'reason': snapshot.reason,
+            })
+        if self.last_error:
+            status['last_error'] = self.last_error
+        return status
+
+
+class InventoryRequestHandler(BaseHTTPRequestHandler):
+    """把HTTP请求转换成对InventoryService的查询"""
+
+    server_version = 'InventoryService/1.0'
+
+    def check_request(self, post=False):
+        """检查Host、Origin、令牌和POST的自定义请求头，不通过时发送错误响应并返回False"""
+        server = self.server
+        if server.allowed_hosts is not None:
+            if not server.is_allowed_host(self.headers.get('Host')):
+                self.send_json(403, {'error': 'Host不是本机地址'})
+                return False
+            origin = self.headers.get('Origin')
+            if origin is not None and not server.is_allowed_host(urlsplit(origin).netloc):
+                self.send_json(403, {'error': f"不接受来自 {origin} 的请求"})
+                return False
+
+        if server.token is not None:
+            scheme, _, token = (self.headers.get('Authorization') or '').partition(' ')
+            if scheme.lower() != 'bearer' or not hmac.compare_digest(token.strip().encode(), server.token.encode()):
+                self.send_json(401, {'error': '缺少令牌或令牌不正确'}, {'WWW-Authenticate': 'Bearer'})
+                return False
+
+        if post and not self.headers.get(CLIENT_HEADER):
+            self.send_json(403, {'error': f"POST请求必须带{CLIENT_HEADER}头"})
+            return False
+        return True
+
+    def do_GET(self):
+        if not self.check_request():
+            return
+        url = urlsplit(self.path)
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        service = self.server.service
+
+        if url.path == '/status':
+            self.send_json(200, service.status())
+            return
+
+        snapshot = service.snapshot
+        if snapshot is None:
+            self.send_json(503, {'error': '清单尚未扫描完成'})
+            return
+        service.queries += 1
+
+        if url.path == '/software':
+            try:
+                limit = int(params['limit']) if params.get('limit') else None
+            except ValueError:
+                self.send_json(400, {'error': 'limit必须是整数'})
+                return
+            records = snapshot.search(params.get('name'), params.get('type'), params.get('publisher'))
+            self.send_json(200, {
+                'generation': snapshot.generation,
+                'scanned_at': snapshot.scanned_at,
+                'count': len(records),
+                'records': records[:limit] if limit is not None else records,
+            })
+        elif url.path == '/install-path':
+            name = params.get('name', '').strip()
+            if not name:
+                self.send_json(400, {'error': '缺少name参数'})
+                return
+            self.send_json(200, {
+                'generation': snapshot.generation,
+                'scanned_at': snapshot.scanned_at,
+                'matches': snapshot.install_paths(name),
+            })
+        else:
+            self.send_json(404, {'error': f"未知路径: {url.path}"})
+
+    def do_POST(self):
+        if not self.check_request(post=True):
+            return
+        if urlsplit(self.path).path != '/refresh':
+            self.send_json(404, {'error': f"未知路径: {self.path}"})
+            return
+        self.server.service.request_refresh()
+        self.send_json(202, {'refresh_requested': True})
+
+    def send_json(self, status, payload, headers=None):
+        body = json.dumps(payload, ensure_ascii=False, default=json_default).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class InventoryHTTPServer(ThreadingHTTPServer):
+    """每个连接一个线程，慢客户端不会影响其他查询和后台刷新"""
+
+    daemon_threads = True
+
+    def __init__(self, address, service, verbose=False, token=None):
+        super().__init__(address, InventoryRequestHandler)
+        self.service = service
+        self.verbose = verbose
+        self.token = token or None
+        # 监听本机地址时只接受这些主机名；监听其他地址时必须使用令牌，不再检查Host
+        host = address[0]
+        self.allowed_hosts = {host.lower(), *LOOPBACK_NAMES} if is_loopback(host) else None
+
+    def is_allowed_host(self, value):
+        host = split_host(value or '')
+        return (host is not None and host[0] in self.allowed_hosts
+                and host[1] in (None, self.server_address[1]))
+
+
+def add_serve_arguments(parser):
+    """为serve子命令添加参数"""
+    parser.add_argument('--host', default='127.0.0.1', help='监听地址（默认只监听本机；监听其他地址时必须设置令牌）')
+    parser.add_argument('--token', default=os.environ.get(TOKEN_ENV),
+                        help=f'访问令牌，请求需带 Authorization: Bearer <令牌>（默认取环境变量{TOKEN_ENV}）')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'监听端口（默认{DEFAULT_PORT}）')
+    parser.add_argument('--refresh-interval', type=float, default=3600, help='定时刷新的间隔秒数（默认3600）')
+    parser.add_argument('--poll-interval', type=float, default=10, help='检查卸载项注册表变化的间隔秒数（默认10）')
+    parser.add_argument('--no-watch', action='store_true', help='不检测注册表变化，只按计划刷新')
+    parser.add_argument('--verbose', action='store_true', help='打印每个HTTP请求')
+
+
+def run_serve(args, scan):
+    """执行serve子命令；scan是完成一次完整采集的函数"""
+    if not is_loopback(args.host) and not args.token:
+        print(f"拒绝监听 {args.host}: 监听非本机地址时必须用 --token 或环境变量{TOKEN_ENV}设置访问令牌")
+        return
+
+    backend = None if args.no_watch else default_backend()
+    service = InventoryService(scan, args.refresh_interval, args.poll_interval, backend)
+
+    print("正在进行首次扫描...")
+    service.refresh('startup')
+
+    try:
+        server = InventoryHTTPServer((args.host, args.port), service, args.verbose, args.token)
+    except OSError as e:
+        print(f"无法监听 {args.host}:{args.port}: {e}")
+        return
+
+    service.start()
+    host, port = server.server_address[:2]
+    print(f"软件清单服务已启动: http://{host}:{port}/ (刷新间隔{args.refresh_interval:g}秒, "
+          f"{'检测注册表变化' if backend is not None else '只按计划刷新'})，按Ctrl+C退出")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n正在停止服务...")
+    finally:
+        service.stop()
+        server.server_close()
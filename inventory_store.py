@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SQLite软件清单库
+项目名称项目组Seraphiel 作者 TraeAI - 日期 2025-11-19 版本 1.0
+描述: 把每次扫描的结果追加到SQLite数据库中，每种记录类型一张表，
+      在名称、发布者、版本和扫描编号上建立索引，过滤和统计都在SQL中完成。
+      名称和发布者的子串条件（LIKE '%x%'）用不上普通索引，每张表另有一个FTS5 trigram全文索引，
+      三个字符以上的子串先通过它找出候选行；SQLite没有FTS5 trigram时退回逐行LIKE。
+"""
+
+import json
+import re
+import sqlite3
+from datetime import datetime
+
+# 数据库结构版本: 2 增加FTS5 trigram全文索引，3 version_key的数字段改为带长度前缀
+SCHEMA_VERSION = 3
+
+# 全文索引覆盖的列，trigram分词器可以回答任意三个字符以上的子串查询
+FTS_COLUMNS = ['name', 'publisher']
+FTS_MIN_LENGTH = 3
+
+# 记录类型 -> (表名, 该类型特有的字段)
+RECORD_TABLES = {
+    '传统软件': ('registry_software', ['install_date', 'uninstall_string']),
+    '应用商店应用': ('store_apps', ['package_name', 'install_location']),
+    'winget应用': ('winget_apps', []),
+    '系统功能': ('system_features', ['state']),
+    '系统服务': ('services', ['service_name', 'status']),
+}
+
+# 未知类型的记录统一放入这张表，并保留type列
+OTHER_TABLE = 'other_records'
+
+COMMON_COLUMNS = ['name', 'version', 'publisher']
+
+INSERT_BATCH_SIZE = 1000
+
+_VERSION_PART = re.compile(r'\d+|[^\d.]+')
+
+
+def version_key(version):
+    """把版本号转换成可按字符串排序的形式: 数字段去掉前导零后加上两位数的长度前缀，其余部分原样保留
+
+    例如 '1.10.2' -> '011.0210.012'，位数少的数字段排在前面，使SQL中的比较符合版本顺序；
+    补零到固定宽度的写法在数字段超过该宽度时（例如日期时间戳形式的构建号）会排错。
+    """
+    if version is None:
+        return None
+    parts = []
+    for token in _VERSION_PART.findall(str(version).strip()):
+        if token.isdigit():
+            digits = token.lstrip('0') or '0'
+            parts.append(f"{len(digits):02d}{digits}")
+        else:
+            parts.append(token.lower())
+    return '.'.join(parts)
+
+
+def _table_columns(table):
+    """返回表中除id和scan_id之外的列"""
+    if table == OTHER_TABLE:
+        return ['type'] + COMMON_COLUMNS + ['version_key', 'extra']
+    for table_name, extra_columns in RECORD_TABLES.values():
+        if table_name == table:
+            return COMMON_COLUMNS + ['version_key'] + extra_columns + ['extra']
+    raise KeyError(table)
+
+
+def all_tables():
+    return [table for table, _ in RECORD_TABLES.values()] + [OTHER_TABLE]
+
+
+# 每张表的列和直接存储的字段，插入时反复使用
+TABLE_COLUMNS = {table: _table_columns(table) for table in all_tables()}
+TABLE_FIELDS = {table: [column for column in columns if column not in ('version_key', 'extra')]
+                for table, columns in TABLE_COLUMNS.items()}
+TABLE_KNOWN_FIELDS = {table: set(fields) | {'type'} for table, fields in TABLE_FIELDS.items()}
+
+
+class InventoryStore:
+    """SQLite软件清单库"""
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.fts = True
+        try:
+            self._create_schema()
+        except Exception:
+            self.conn.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def _create_schema(self):
+        """建表；打开旧版本的数据库时就地升级，更新版本程序写入的数据库拒绝打开"""
+        with self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS scans (
+                    scan_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    host TEXT NOT NULL,
+                    scanned_at TEXT NOT NULL,
+                    record_count INTEGER NOT NULL DEFAULT 0
+                )""")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_scans_host ON scans(host)")
+            self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            row = self.conn.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+            stored = int(row[0]) if row else SCHEMA_VERSION
+            if stored > SCHEMA_VERSION:
+                raise ValueError(f"数据库结构版本为{stored}，当前程序只支持到{SCHEMA_VERSION}: {self.path}")
+
+            for table in all_tables():
+                columns = ", ".join(f"{column} TEXT" for column in _table_columns(table))
+                self.conn.execute(f"""
+                    CREATE TABLE IF NOT EXISTS {table} (
+                        id INTEGER PRIMARY KEY,
+                        scan_id INTEGER NOT NULL REFERENCES scans(scan_id),
+                        {columns}
+                    )""")
+                for column in ('scan_id', 'name', 'publisher', 'version_key'):
+                    self.conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_{column} ON {table}({column})")
+
+            if stored < 3:
+                self._rebuild_version_keys()
+            self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('schema_version', ?)", (str(SCHEMA_VERSION),))
+
+        for table in all_tables():
+            if not self.fts or not self._create_fts(table):
+                self.fts = False
+                break
+
+    def _create_fts(self, table):
+        """为表建立trigram全文索引；SQLite不支持FTS5 trigram时返回False
+
+        旧版本数据库第一次打开时根据已有的行重建索引。
+        """
+        fts_table = f"{table}_fts"
+        columns = ", ".join(FTS_COLUMNS)
+        exists = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (fts_table,)).fetchone()
+        try:
+            with self.conn:
+                self.conn.execute(f"""
+                    CREATE VIRTUAL TABLE IF NOT EXISTS {fts_table}
+                    USING fts5({columns}, content='{table}', content_rowid='id', tokenize='trigram')""")
+                if not exists:
+                    self.conn.execute(f"INSERT INTO {fts_table} ({fts_table}) VALUES ('rebuild')")
+        except sqlite3.OperationalError:
+            return False
+        return True
+
+    def _rebuild_version_keys(self):
+        """按当前的version_key重新计算已有行的排序键（旧版本数据库用的是补零写法）"""
+        self.conn.create_function('version_key', 1, version_key, deterministic=True)
+        for table in all_tables():
+            self.conn.execute(f"UPDATE {table} SET version_key = version_key(version)")
+
+    def append_scan(self, records, host, scanned_at=None):
+        """在一个事务中追加一次扫描结果，返回scan_id"""
+        scanned_at = scanned_at or datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        batches = {}
+        total = 0
+
+        with self.conn:
+            cursor = self.conn.execute("INSERT INTO scans (host, scanned_at) VALUES (?, ?)", (host, scanned_at))
+            scan_id = cursor.lastrowid
+
+            for record in records:
+                table, row = self._record_row(scan_id, record)
+                batch = batches.setdefault(table, [])
+                batch.append(row)
+                total += 1
+                if len(batch) >= INSERT_BATCH_SIZE:
+                    self._flush(table, batch)
+            for table, batch in batches.items():
+                self._flush(table, batch)
+                if self.fts:
+                    self._index_scan(table, scan_id)
+
+            self.conn.execute("UPDATE scans SET record_count = ? WHERE scan_id = ?", (total, scan_id))
+
+        return scan_id
+
+    def _record_row(self, scan_id, record):
+        record_type = record.get('type')
+        table = RECORD_TABLES.get(record_type, (OTHER_TABLE, None))[0]
+        fields = TABLE_FIELDS[table]
+
+        row = [scan_id]
+        for field in fields:
+            value = record.get(field)
+            row.append(None if value is None else str(value))
+
+        # 列顺序: 通用字段, version_key, 类型特有字段, extra
+        row.insert(len(COMMON_COLUMNS) + 1 + (table == OTHER_TABLE), version_key(record.get('version')))
+        known = TABLE_KNOWN_FIELDS[table]
+        extra = {key: value for key, value in record.items() if key not in known}
+        row.append(json.dumps(extra, ensure_ascii=False) if extra else None)
+        return table, row
+
+    def _index_scan(self, table, scan_id):
+        """把一次扫描新增的行加入全文索引；整批写入比逐行触发器快得多"""
+        columns = ", ".join(FTS_COLUMNS)
+        self.conn.execute(f"INSERT INTO {table}_fts (rowid, {columns}) "
+                          f"SELECT id, {columns} FROM {table} WHERE scan_id = ?", (scan_id,))
+
+    def _flush(self, table, batch):
+        if not batch:
+            return
+        columns = ['scan_id'] + TABLE_COLUMNS[table]
+        placeholders = ", ".join("?" for _ in columns)
+        self.conn.executemany(
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})", batch)
+        batch.clear()
+
+    def scans(self):
+        return [dict(row) for row in self.conn.execute("SELECT * FROM scans ORDER BY scan_id")]
+
+    def _where(self, filters, table):
+        """根据过滤条件拼出table上的WHERE条件列表和参数（不含类型条件）"""
+        clauses = []
+        params = []
+
+        if filters.get('latest'):
+            # 每台主机只看最近一次扫描
+            clauses.append("r.scan_id IN (SELECT MAX(scan_id) FROM scans GROUP BY host)")
+        if filters.get('scan_id') is not None:
+            clauses.append("r.scan_id = ?")
+            params.append(filters['scan_id'])
+        if filters.get('host'):
+            clauses.append("s.host = ?")
+            params.append(filters['host'])
+        for column in FTS_COLUMNS:
+            needle = filters.get(column)
+            if not needle:
+                continue
+            if self.fts and len(needle) >= FTS_MIN_LENGTH:
+                # 全文索引给出候选行，LIKE保证结果与逐行匹配完全相同（大小写规则一致）
+                clauses.append(f"r.id IN (SELECT rowid FROM {table}_fts WHERE {table}_fts MATCH ?)")
+                params.append(_fts_phrase(column, needle))
+            clauses.append(f"r.{column} LIKE ? ESCAPE '\\'")
+            params.append(f"%{_escape_like(needle)}%")
+        if filters.get('version_below'):
+            clauses.append("r.version_key < ?")
+            params.append(version_key(filters['version_below']))
+        if filters.get('version_at_least'):
+            clauses.append("r.version_key >= ?")
+            params.append(version_key(filters['version_at_least']))
+
+        return clauses, params
+
+    def _sources(self, filters):
+        """返回需要查询的 (表名, type列SQL, type列参数, WHERE子句, WHERE参数)
+
+        已知类型的表中type是常量；未知类型表按type列过滤。
+        """
+        record_type = filters.get('type')
+        sources = []
+
+        for type_name, (table, _) in RECORD_TABLES.items():
+            if not record_type or record_type == type_name:
+                clauses, params = self._where(filters, table)
+                where = " WHERE " + " AND ".join(clauses) if clauses else ""
+                sources.append((table, "?", [type_name], where, params))
+
+        if not record_type or record_type not in RECORD_TABLES:
+            other_clauses, other_params = self._where(filters, OTHER_TABLE)
+            if record_type:
+                other_clauses.append("r.type = ?")
+                other_params.append(record_type)
+            where = " WHERE " + " AND ".join(other_clauses) if other_clauses else ""
+            sources.append((OTHER_TABLE, "r.type", [], where, other_params))
+
+        return sources
+
+    def query(self, filters, limit=None):
+        """查询记录，返回字典列表（附带host和scanned_at）"""
+        results = []
+        for table, type_sql, type_params, where, params in self._sources(filters):
+            sql = self._select_sql(table, type_sql, where)
+            if limit is not None:
+                sql += f" LIMIT {int(limit) - len(results)}"
+
+            for row in self.conn.execute(sql, type_params + params):
+                results.append(_row_to_record(row))
+            if limit is not None and len(results) >= limit:
+                break
+        return results
+
+    @staticmethod
+    def _select_sql(table, type_sql, where):
+        return (f"SELECT {type_sql} AS type, r.*, s.host, s.scanned_at FROM {table} r "
+                f"JOIN scans s ON s.scan_id = r.scan_id{where} ORDER BY r.scan_id, r.id")
+
+    def query_plan(self, filters):
+        """返回query在每张表上的EXPLAIN QUERY PLAN: {表名: [步骤说明, ...]}"""
+        plans = {}
+        for table, type_sql, type_params, where, params in self._sources(filters):
+            rows = self.conn.execute("EXPLAIN QUERY PLAN " + self._select_sql(table, type_sql, where),
+                                     type_params + params)
+            plans[table] = [row['detail'] for row in rows]
+        return plans
+
+    def aggregate(self, filters, group_by):
+        """按字段分组统计: 返回 [(值, 记录数, 主机数), ...]，按记录数降序"""
+        if group_by not in ('name', 'publisher', 'version', 'host', 'type'):
+            raise ValueError(f"不支持的分组字段: {group_by}")
+
+        parts = []
+        all_params = []
+        for table, type_sql, type_params, where, params in self._sources(filters):
+            if group_by == 'host':
+                value_sql, value_params = "s.host", []
+            elif group_by == 'type':
+                value_sql, value_params = type_sql, type_params
+            else:
+                value_sql, value_params = f"r.{group_by}", []
+            parts.append(f"SELECT {value_sql} AS value, s.host AS host FROM {table} r "
+                         f"JOIN scans s ON s.scan_id = r.scan_id{where}")
+            all_params.extend(value_params + params)
+
+        sql = (f"SELECT value, COUNT(*) AS records, COUNT(DISTINCT host) AS hosts "
+               f"FROM ({' UNION ALL '.join(parts)}) GROUP BY value ORDER BY records DESC, value")
+        return [(row['value'], row['records'], row['hosts']) for row in self.conn.execute(sql, all_params)]
+
+
+def _fts_phrase(column, text):
+    """FTS5查询: 指定列中包含text（整个text作为一个短语，双引号需要成对书写）"""
+    return f'{column} : "{text.replace(chr(34), chr(34) * 2)}"'
+
+
+def _escape_like(text):
+    return text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def _row_to_record(row):
+    record = {}
+    for key in row.keys():
+        if key in ('id', 'version_key', 'extra'):
+            continue
+        value = row[key]
+        if value is not None:
+            record[key] = value
+    if row['extra']:
+        record.update(json.loads(row['extra']))
+    return record
+
+
+def add_query_arguments(parser):
+    """为query子命令添加参数"""
+    parser.add_argument('--db', required=True, help='SQLite数据库文件')
+    parser.add_argument('--name', help='名称包含（不区分大小写）')
+    parser.add_argument('--publisher', help='发布者包含（不区分大小写）')
+    parser.add_argument('--type', help='记录类型（传统软件/应用商店应用/系统功能等）')
+    parser.add_argument('--host', help='只查询指定主机')
+    parser.add_argument('--version-below', help='版本号低于')
+    parser.add_argument('--version-at-least', help='版本号不低于')
+    parser.add_argument('--all-scans', action='store_true', help='查询所有历史扫描（默认每台主机只看最近一次）')
+    parser.add_argument('--count-by', choices=['name', 'publisher', 'version', 'host', 'type'], help='按字段分组统计')
+    parser.add_argument('--limit', type=int, default=100, help='最多显示的记录数')
+    parser.add_argument('--json', action='store_true', help='以JSON格式输出')
+
+
+def run_query(args):
+    """执行query子命令"""
+    filters = {
+        'name': args.name,
+        'publisher': args.publisher,
+        'type': args.type,
+        'host': args.host,
+        'version_below': args.version_below,
+        'version_at_least': args.version_at_least,
+        'latest': not args.all_scans,
+    }
+
+    with InventoryStore(args.db) as store:
+        if args.count_by:
+            rows = store.aggregate(filters, args.count_by)
+            if args.json:
+                print(json.dumps([{'value': value, 'records': records, 'hosts': hosts}
+                                  for value, records, hosts in rows], ensure_ascii=False, indent=2))
+                return
+            print(f"按 {args.count_by} 统计 ({len(rows)}组):")
+            for value, records, hosts in rows[:args.limit]:
+                print(f"  {value}: {records}条, {hosts}台主机")
+            return
+
+        records = store.query(filters, limit=args.limit)
+        if args.json:
+            print(json.dumps(records, ensure_ascii=False, indent=2))
+            return
+        print(f"查询结果 ({len(records)}条):")
+        for i, record in enumerate(records, 1):
+            print(f"{i}. [{record.get('host')}] [{record.get('type')}] {record.get('name')}")
+            if record.get('version'):
+                print(f"   版本: {record['version']}")
+            if record.get('publisher'):
+                print(f"   发布者: {record['publisher']}")
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多模式子串匹配
+项目名称项目组Seraphiel 作者 TraeAI - 日期 2025-11-19 版本 1.0
+描述: 用Aho-Corasick自动机同时查找多个名称：所有名称先建成一个自动机，
+      每个显示名只扫描一遍，就能得到它包含的全部名称，耗时与名称个数无关。
+      含通配符（* ? [）的名称无法放进自动机，单独用fnmatch逐条判断。
+"""
+
+import fnmatch
+
+WILDCARD_CHARS = '*?['
+
+
+class AhoCorasick:
+    """Aho-Corasick自动机，查找文本中出现的全部模式串
+
+    状态转移保存在每个状态一个字典中；失配时沿失败链回退。
+    每个状态的输出已经合并了失败链上所有状态的输出，匹配时不需要再沿链查找。
+    """
+
+    def __init__(self, patterns):
+        self.patterns = list(patterns)
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [()]
+
+        for pattern_id, pattern in enumerate(self.patterns):
+            if not pattern:
+                continue
+            state = 0
+            for char in pattern:
+                next_state = self.goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto[state][char] = next_state
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append(())
+                state = next_state
+            self.output[state] += (pattern_id,)
+
+        # 广度优先计算失败链，父状态的失败链总是先于子状态算好
+        queue = list(self.goto[0].values())
+        for state in queue:
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(char, 0)
+                self.fail[next_state] = target if target != next_state else 0
+                if self.output[self.fail[next_state]]:
+                    self.output[next_state] += self.output[self.fail[next_state]]
+
+    def __len__(self):
+        return len(self.goto)
+
+    def find(self, text):
+        """返回text中出现的模式编号集合"""
+        goto = self.goto
+        fail = self.fail
+        output = self.output
+        found = set()
+        state = 0
+        for char in text:
+            next_state = goto[state].get(char)
+            while next_state is None and state:
+                state = fail[state]
+                next_state = goto[state].get(char)
+            state = next_state or 0
+            if output[state]:
+                found.update(output[state])
+        return found
+
+
+class NameMatcher:
+    """批量判断显示名包含哪些查询名称（*name*，不区分大小写）"""
+
+    def __init__(self, names):
+        self.names = list(names)
+        plain = []
+        self.wildcards = []
+        for name_id, name in enumerate(self.names):
+            lowered = name.lower()
+            if any(char in lowered for char in WILDCARD_CHARS):
+                self.wildcards.append((name_id, f"*{lowered}*"))
+            else:
+                plain.append((name_id, lowered))
+        self.plain_ids = [name_id for name_id, _ in plain]
+        self.automaton = AhoCorasick(lowered for _, lowered in plain)
+
+    def match(self, display_name):
+        """返回display_name包含的查询名称编号（按编号排序）"""
+        lowered = display_name.lower()
+        matched = [self.plain_ids[pattern_id] for pattern_id in self.automaton.find(lowered)]
+        for name_id, pattern in self.wildcards:
+            if fnmatch.fnmatchcase(lowered, pattern):
+                matched.append(name_id)
+        matched.sort()
+        return matched
@@ -0,0 +1,519 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PowerShell常驻会话
+项目名称项目组Seraphiel 作者 TraeAI - 日期 2025-11-19 版本 1.0
+描述: 维护一个长期运行的PowerShell工作进程，采集函数通过stdin/stdout上的JSON帧协议复用该进程，
+      避免每次查询都冷启动一次powershell。进程崩溃或超时后会自动重启。
+
+帧协议（每帧一行紧凑JSON，UTF-8编码）:
+    工作进程就绪:  {"ready": true}
+    请求:          {"id": 1, "script": "Get-Service | ConvertTo-Json"}
+    成功响应:      {"id": 1, "ok": true, "output": "..."}
+    失败响应:      {"id": 1, "ok": false, "error": "..."}
+
+流式请求带 "stream": true，管道中的每个对象转成字符串后立即作为一帧返回，最后以结束帧收尾:
+    输出行:        {"id": 1, "line": "..."}
+    结束:          {"id": 1, "ok": true, "done": true}
+
+设置环境变量 POWERSHELL_WORKER 可以把工作进程替换成任意可执行程序（例如Linux上的替身脚本），
+只要它遵守上面的帧协议即可。
+"""
+
+import base64
+import json
+import os
+import queue
+import shlex
+import subprocess
+import threading
+import time
+
+import trace_events
+
+# 工作进程主循环：逐行读取请求帧，执行脚本，把输出文本写回响应帧
+# 与powershell -Command一样使用'Continue'：单个条目出错（某个键无法读取、某个包的清单读取失败）只跳过该条目，
+# 错误写到标准错误；只有终止性错误才让整个请求返回失败响应
+WORKER_SCRIPT = r"""
+$ErrorActionPreference = 'Continue'
+$utf8 = New-Object System.Text.UTF8Encoding $false
+try { [Console]::InputEncoding = $utf8 } catch {}
+try { [Console]::OutputEncoding = $utf8 } catch {}
+$stdin = [Console]::In
+$stdout = [Console]::Out
+$stdout.WriteLine('{"ready":true}')
+$stdout.Flush()
+while ($true) {
+    $line = $stdin.ReadLine()
+    if ($line -eq $null) { break }
+    if (-not $line.Trim()) { continue }
+    $req = $line | ConvertFrom-Json
+    try {
+        if ($req.stream) {
+            & ([scriptblock]::Create($req.script)) | ForEach-Object {
+                $stdout.WriteLine((@{ id = $req.id; line = [string]$_ } | ConvertTo-Json -Compress))
+            }
+            $resp = @{ id = $req.id; ok = $true; done = $true }
+        } else {
+            $output = (& ([scriptblock]::Create($req.script)) | Out-String -Width 4096)
+            $resp = @{ id = $req.id; ok = $true; output = $output }
+        }
+    } catch {
+        $resp = @{ id = $req.id; ok = $false; error = $_.Exception.Message }
+    }
+    $stdout.WriteLine(($resp | ConvertTo-Json -Compress))
+    $stdout.Flush()
+}
+"""
+
+# PowerShell单引号字符串中需要成对书写的引号（PowerShell把弯引号也当作单引号）
+PS_QUOTES = "'\u2018\u2019\u201a\u201b"
+
+
+class PowerShellSessionError(Exception):
+    """常驻会话无法完成请求"""
+
+
+class PowerShellTimeout(PowerShellSessionError):
+    """请求在限定时间内没有返回"""
+
+
+def default_worker_command():
+    """返回工作进程的启动命令，优先使用环境变量 POWERSHELL_WORKER"""
+    override = os.environ.get('POWERSHELL_WORKER')
+    if override:
+        return shlex.split(override, posix=(os.name != 'nt'))
+
+    encoded = base64.b64encode(WORKER_SCRIPT.encode('utf-16-le')).decode('ascii')
+    return [
+        "powershell", "-NoLogo", "-NoProfile", "-NonInteractive",
+        "-ExecutionPolicy", "Bypass", "-EncodedCommand", encoded
+    ]
+
+
+class PowerShellSession:
+    """长期运行的PowerShell工作进程，整个扫描过程中复用"""
+
+    def __init__(self, command=None, startup_timeout=30, max_restarts=3):
+        self.command = command or default_worker_command()
+        self.startup_timeout = startup_timeout
+        self.max_restarts = max_restarts
+
+        self._process = None
+        self._frames = None
+        self._lock = threading.Lock()
+        self._next_id = 0
+        self._broken = False
+
+        self.stats = {
+            'requests': 0,
+            'starts': 0,
+            'restarts': 0,
+            'startup_seconds': 0.0,
+        }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def usable(self):
+        """重启次数用尽后会话不再可用，调用方应退回单次执行"""
+        return not self._broken
+
+    def _alive(self):
+        return self._process is not None and self._process.poll() is None
+
+    def _start(self):
+        """启动工作进程并等待就绪帧"""
+        started = time.perf_counter()
+        with trace_events.span("spawn powershell worker", "spawn", restart=self.stats['starts'] > 0) as span:
+            try:
+                process = subprocess.Popen(
+                    self.command,
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,
+                    text=True,
+                    encoding='utf-8',
+                    errors='replace',
+                    bufsize=1
+                )
+            except OSError as e:
+                self._broken = True
+                raise PowerShellSessionError(f"无法启动PowerShell工作进程: {e}")
+            trace_events.process_started(process.pid, "powershell worker")
+            span.set(pid=process.pid)
+
+            frames = queue.Queue()
+            reader = threading.Thread(target=self._read_frames, args=(process, frames), daemon=True)
+            reader.start()
+
+            self._process = process
+            self._frames = frames
+
+            try:
+                self._wait_frame(lambda frame: frame.get('ready'), self.startup_timeout)
+            except PowerShellSessionError as e:
+                # 连就绪帧都等不到的工作进程不值得反复重启
+                self._kill()
+                self._broken = True
+                raise PowerShellSessionError(f"PowerShell工作进程启动失败: {e}")
+
+        self.stats['starts'] += 1
+        self.stats['startup_seconds'] += time.perf_counter() - started
+
+    @staticmethod
+    def _read_frames(process, frames):
+        """后台线程：把工作进程的每一行输出放入队列，EOF时放入None"""
+        try:
+            for line in process.stdout:
+                trace_events.bytes_read("powershell worker", line)
+                frames.put(line)
+        except (OSError, ValueError):
+            pass
+        finally:
+            frames.put(None)
+
+    def _wait_frame(self, accept, timeout):
+        """等待一个满足条件的帧；非JSON行（例如Write-Host的输出）直接忽略"""
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise PowerShellTimeout(f"PowerShell工作进程在 {timeout} 秒内没有响应")
+            try:
+                line = self._frames.get(timeout=remaining)
+            except queue.Empty:
+                continue
+
+            if line is None:
+                raise PowerShellSessionError("PowerShell工作进程意外退出")
+
+            line = line.strip()
+            if not line.startswith('{'):
+                continue
+            try:
+                frame = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(frame, dict) and accept(frame):
+                return frame
+
+    def _kill(self):
+        """强制结束当前工作进程"""
+        process = self._process
+        self._process = None
+        self._frames = None
+        if process is None:
+            return
+        try:
+            process.kill()
+        except OSError:
+            pass
+        try:
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            pass
+        trace_events.process_exited(process.pid, "powershell worker", process.returncode)
+        for stream in (process.stdin, process.stdout):
+            try:
+                stream.close()
+            except (OSError, AttributeError):
+                pass
+
+    def _ensure_started(self):
+        if self._alive():
+            return
+        if self.stats['starts'] > 0:
+            if self.stats['restarts'] >= self.max_restarts:
+                self._broken = True
+                raise PowerShellSessionError("PowerShell工作进程重启次数过多，已停用常驻会话")
+            self.stats['restarts'] += 1
+            self._kill()
+        self._start()
+
+    def request(self, script, timeout=30):
+        """在工作进程中执行脚本，返回其输出文本"""
+        with self._lock:
+            if self._broken:
+                raise PowerShellSessionError("常驻会话已停用")
+
+            # 进程崩溃时重启并重试一次；查询脚本都是只读的，重试是安全的
+            for attempt in range(2):
+                self._ensure_started()
+                self._next_id += 1
+                request_id = self._next_id
+                payload = json.dumps({'id': request_id, 'script': script}, ensure_ascii=False)
+
+                with trace_events.span("powershell request", "powershell",
+                                       script=trace_events.script_label(script), attempt=attempt):
+                    try:
+                        self._process.stdin.write(payload + "\n")
+                        self._process.stdin.flush()
+                        frame = self._wait_frame(lambda f: f.get('id') == request_id, timeout)
+                    except PowerShellTimeout:
+                        # 卡住的进程无法复用，杀掉后下一次请求会重新启动
+                        self._kill()
+                        raise
+                    except (PowerShellSessionError, OSError, ValueError) as e:
+                        self._kill()
+                        if attempt == 0:
+                            continue
+                        raise PowerShellSessionError(str(e))
+
+                self.stats['requests'] += 1
+                if not frame.get('ok'):
+                    raise PowerShellSessionError(frame.get('error') or "PowerShell脚本执行失败")
+                return frame.get('output') or ''
+
+    def stream(self, script, timeout=30):
+        """流式执行脚本，逐行产出管道中的输出
+
+        整个请求共用一个截止时间。调用方提前停止迭代时，在截止时间内丢弃剩余输出以便继续复用进程；
+        超时或进程异常时结束工作进程，下一次请求会自动重启。
+        """
+        with self._lock:
+            if self._broken:
+                raise PowerShellSessionError("常驻会话已停用")
+
+            self._ensure_started()
+            self._next_id += 1
+            request_id = self._next_id
+            payload = json.dumps({'id': request_id, 'script': script, 'stream': True}, ensure_ascii=False)
+            deadline = time.monotonic() + timeout
+            finished = False
+            lines = 0
+
+            def wait_own_frame():
+                remaining = max(0.001, deadline - time.monotonic())
+                return self._wait_frame(lambda f: f.get('id') == request_id, remaining)
+
+            # 时间段包括调用方处理各行的时间，解析等阶段会嵌套显示在其中
+            span = trace_events.span("powershell stream", "powershell", script=trace_events.script_label(script))
+            try:
+                with span:
+                    try:
+                        self._process.stdin.write(payload + "\n")
+                        self._process.stdin.flush()
+                    except (OSError, ValueError) as e:
+                        raise PowerShellSessionError(f"无法向PowerShell工作进程发送请求: {e}")
+
+                    while True:
+                        frame = wait_own_frame()
+                        if 'line' in frame:
+                            lines += 1
+                            yield frame['line']
+                            continue
+
+                        finished = True
+                        span.set(lines=lines)
+                        self.stats['requests'] += 1
+                        if not frame.get('ok'):
+                            raise PowerShellSessionError(frame.get('error') or "PowerShell脚本执行失败")
+                        return
+            except GeneratorExit:
+                if not finished:
+                    try:
+                        while 'line' in wait_own_frame():
+                            pass
+                        self.stats['requests'] += 1
+                    except PowerShellSessionError:
+                        self._kill()
+                raise
+            except BaseException:
+                if not finished:
+                    self._kill()
+                raise
+
+    def saved_seconds(self):
+        """估算复用进程节省的冷启动时间"""
+        starts = self.stats['starts']
+        if starts == 0:
+            return 0.0
+        average_startup = self.stats['startup_seconds'] / starts
+        return max(0, self.stats['requests'] - starts) * average_startup
+
+    def close(self):
+        """关闭工作进程：先关闭stdin让其正常退出，超时再强制结束"""
+        with self._lock:
+            process = self._process
+            if process is None:
+                return
+            try:
+                process.stdin.close()
+                process.wait(timeout=3)
+            except (OSError, ValueError, subprocess.TimeoutExpired):
+                pass
+            self._kill()
+
+
+class PowerShellSessionPool:
+    """若干常驻会话组成的池，供并发采集使用；对外接口与PowerShellSession一致"""
+
+    def __init__(self, size, command=None, **kwargs):
+        self.size = max(1, size)
+        self._command = command
+        self._kwargs = kwargs
+        self._idle = queue.Queue()
+        self._sessions = []
+        self._lock = threading.Lock()
+        self._broken = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def usable(self):
+        return not self._broken
+
+    def _acquire(self):
+        """取一个空闲会话；没有空闲且未达上限时新建，否则等待归还"""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if len(self._sessions) < self.size:
+                session = PowerShellSession(self._command, **self._kwargs)
+                self._sessions.append(session)
+                return session
+        return self._idle.get()
+
+    def request(self, script, timeout=30):
+        session = self._acquire()
+        try:
+            return session.request(script, timeout=timeout)
+        finally:
+            if not session.usable():
+                # 一个工作进程起不来，其余的大概率也一样，整体退回单次执行
+                self._broken = True
+            self._idle.put(session)
+
+    def stream(self, script, timeout=30):
+        session = self._acquire()
+        try:
+            yield from session.stream(script, timeout=timeout)
+        finally:
+            if not session.usable():
+                self._broken = True
+            self._idle.put(session)
+
+    @property
+    def stats(self):
+        totals = {'requests': 0, 'starts': 0, 'restarts': 0, 'startup_seconds': 0.0}
+        for session in list(self._sessions):
+            for key in totals:
+                totals[key] += session.stats[key]
+        return totals
+
+    def saved_seconds(self):
+        return sum(session.saved_seconds() for session in list(self._sessions))
+
+    def close(self):
+        for session in list(self._sessions):
+            session.close()
+
+
+def ps_quote(text):
+    """把text放进PowerShell单引号字符串'...'之前的转义：引号成对书写"""
+    for quote in PS_QUOTES:
+        text = text.replace(quote, quote * 2)
+    return text
+
+
+def run_powershell(script, timeout=30, session=None):
+    """执行PowerShell脚本并返回标准输出文本
+
+    传入session时复用常驻工作进程；会话不可用时退回到单次启动powershell -Command。
+    超时直接抛出，避免同一条慢查询再执行一遍。
+    """
+    if session is not None and session.usable():
+        try:
+            return session.request(script, timeout=timeout)
+        except PowerShellTimeout:
+            raise
+        except PowerShellSessionError:
+            if session.usable():
+                raise
+
+    with trace_events.span("powershell -Command", "powershell", script=trace_events.script_label(script)) as span:
+        result = subprocess.run(["powershell", "-Command", script],
+                                capture_output=True, text=True, timeout=timeout)
+        span.set(returncode=result.returncode)
+    trace_events.bytes_read("powershell -Command", result.stdout)
+    if result.returncode != 0:
+        return ''
+    return result.stdout
+
+
+def stream_powershell(script, timeout=30, session=None):
+    """流式执行PowerShell脚本，逐行产出标准输出
+
+    行在产生时即可被处理，不必等进程结束，也不用把整个输出放进内存。
+    单次启动模式下超时会结束powershell进程并抛出subprocess.TimeoutExpired。
+    """
+    if session is not None and session.usable():
+        try:
+            yield from session.stream(script, timeout=timeout)
+            return
+        except PowerShellTimeout:
+            raise
+        except PowerShellSessionError:
+            if session.usable():
+                raise
+
+    with trace_events.span("spawn powershell", "spawn"):
+        process = subprocess.Popen(["powershell", "-Command", script],
+                                   stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    trace_events.process_started(process.pid, "powershell -Command")
+    timer = threading.Timer(timeout, process.kill)
+    timer.start()
+    span = trace_events.span("powershell stream", "powershell", script=trace_events.script_label(script))
+    try:
+        with span:
+            for line in process.stdout:
+                trace_events.bytes_read("powershell -Command", line)
+                yield line.rstrip("\r\n")
+            process.wait()
+    finally:
+        timed_out = not timer.is_alive() and process.returncode != 0
+        timer.cancel()
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+        trace_events.process_exited(process.pid, "powershell -Command", process.returncode)
+    if timed_out:
+        raise subprocess.TimeoutExpired(script, timeout)
+
+
+def stream_json_records(script, timeout=30, session=None, errors=None):
+    """流式执行脚本并逐条解析每行一个的紧凑JSON记录
+
+    脚本应以 ForEach-Object { $_ | ConvertTo-Json -Compress } 结尾。
+    单条记录解析失败只会跳过该条，失败的行会追加到errors列表中（如果提供）。
+    """
+    # 开启跟踪时每条记录的解析都记为一个时间段；未开启时不进入with语句，保持原来的速度
+    traced = trace_events.enabled()
+    for line in stream_powershell(script, timeout=timeout, session=session):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            if traced:
+                with trace_events.span("parse JSON", "parse", chars=len(line)):
+                    record = json.loads(line)
+            else:
+                record = json.loads(line)
+        except json.JSONDecodeError:
+            if errors is not None:
+                errors.append(line)
+            continue
+        if isinstance(record, dict):
+            yield record
+        elif errors is not None:
+            errors.append(line)
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+注册表访问后端
+项目名称项目组Seraphiel 作者 TraeAI - 日期 2025-11-19 版本 1.0
+描述: 通过winreg直接读取Uninstall等注册表项，省去启动PowerShell和JSON往返的开销。
+      所有读取都经过一个很小的接口（RegistryBackend），FakeRegistry是它的内存实现，
+      用于在Linux上运行枚举逻辑和性能测试。
+"""
+
+try:
+    import winreg
+except ImportError:  # 非Windows平台
+    winreg = None
+
+# 三个卸载信息位置，顺序与原来PowerShell查询的顺序一致
+UNINSTALL_KEYS = [
+    ("HKLM", "Software\\Wow6432Node\\Microsoft\\Windows\\CurrentVersion\\Uninstall"),
+    ("HKLM", "Software\\Microsoft\\Windows\\CurrentVersion\\Uninstall"),
+    ("HKCU", "Software\\Microsoft\\Windows\\CurrentVersion\\Uninstall"),
+]
+
+# 每个服务（以及驱动）在这里有一个子键，保存启动类型、映像路径和登录账户
+SERVICES_KEYS = [
+    ("HKLM", "SYSTEM\\CurrentControlSet\\Services"),
+]
+
+# 当前用户的每个Appx包（以PackageFullName命名）在这里有一个子键，只用来判断包是否有变化
+APPX_PACKAGES_KEYS = [
+    ("HKCU", "Software\\Classes\\Local Settings\\Software\\Microsoft\\Windows\\CurrentVersion\\AppModel\\Repository\\Packages"),
+]
+
+
+class RegistryBackend:
+    """注册表只读接口，键句柄对调用方不透明"""
+
+    def open_key(self, hive, path):
+        """打开键，不存在时抛出FileNotFoundError"""
+        raise NotImplementedError
+
+    def close_key(self, key):
+        pass
+
+    def enum_subkeys(self, key):
+        """返回直接子键名列表"""
+        raise NotImplementedError
+
+    def query_value(self, key, name):
+        """读取值，不存在时返回None"""
+        raise NotImplementedError
+
+    def query_info(self, key):
+        """返回 (子键数, 值数, 最后写入时间)，时间单位与QueryInfoKey一致（100纳秒）"""
+        raise NotImplementedError
+
+
+class WinregBackend(RegistryBackend):
+    """基于winreg的真实注册表后端"""
+
+    def __init__(self):
+        if winreg is None:
+            raise OSError("当前平台没有winreg模块")
+        self._hives = {
+            "HKLM": winreg.HKEY_LOCAL_MACHINE,
+            "HKCU": winreg.HKEY_CURRENT_USER,
+        }
+        # 32位Python也要看到64位视图，Wow6432Node路径是显式写出来的
+        self._access = winreg.KEY_READ | winreg.KEY_WOW64_64KEY
+
+    def open_key(self, hive, path):
+        return winreg.OpenKey(self._hives[hive], path, 0, self._access)
+
+    def close_key(self, key):
+        key.Close()
+
+    def enum_subkeys(self, key):
+        count = winreg.QueryInfoKey(key)[0]
+        names = []
+        for index in range(count):
+            try:
+                names.append(winreg.EnumKey(key, index))
+            except OSError:
+                break  # 枚举过程中键被删除
+        return names
+
+    def query_value(self, key, name):
+        try:
+            return winreg.QueryValueEx(key, name)[0]
+        except FileNotFoundError:
+            return None
+
+    def query_info(self, key):
+        return winreg.QueryInfoKey(key)
+
+
+class FakeRegistry(RegistryBackend):
+    """内存中的注册表，键路径不区分大小写，并记录各类读取次数"""
+
+    def __init__(self):
+        self._keys = {}
+        self._clock = 0
+        self.counters = {'open': 0, 'enum': 0, 'value': 0, 'info': 0}
+
+    @staticmethod
+    def _normalize(hive, path):
+        return (hive.upper(), path.strip("\\").lower())
+
+    def _touch(self):
+        self._clock += 1
+        return self._clock
+
+    def _ensure(self, hive, path):
+        """按需创建键及其所有父键"""
+        parts = path.strip("\\").split("\\")
+        node = None
+        parent = None
+        for depth in range(1, len(parts) + 1):
+            sub_path = "\\".join(parts[:depth])
+            ident = self._normalize(hive, sub_path)
+            node = self._keys.get(ident)
+            if node is None:
+                node = {'name': parts[depth - 1], 'values': {}, 'subkeys': {}, 'last_write': self._touch()}
+                self._keys[ident] = node
+                if parent is not None:
+                    parent['subkeys'][parts[depth - 1].lower()] = parts[depth - 1]
+                    parent['last_write'] = self._touch()
+            parent = node
+        return node
+
+    def set_key(self, hive, path, values=None, last_write=None):
+        """创建或覆盖一个键的值，并刷新其最后写入时间"""
+        node = self._ensure(hive, path)
+        if values is not None:
+            node['values'] = dict(values)
+        node['last_write'] = last_write if last_write is not None else self._touch()
+        return node
+
+    def set_value(self, hive, path, name, value):
+        node = self._ensure(hive, path)
+        node['values'][name] = value
+        node['last_write'] = self._touch()
+
+    def delete_key(self, hive, path):
+        """删除键及其所有子键"""
+        ident = self._normalize(hive, path)
+        if ident not in self._keys:
+            return
+        prefix = ident[1] + "\\"
+        for other in [k for k in self._keys if k[0] == ident[0] and k[1].startswith(prefix)]:
+            del self._keys[other]
+        del self._keys[ident]
+        parent_path, _, name = path.strip("\\").rpartition("\\")
+        parent = self._keys.get(self._normalize(hive, parent_path))
+        if parent is not None:
+            parent['subkeys'].pop(name.lower(), None)
+            parent['last_write'] = self._touch()
+
+    def open_key(self, hive, path):
+        self.counters['open'] += 1
+        ident = self._normalize(hive, path)
+        if ident not in self._keys:
+            raise FileNotFoundError(f"{hive}\\{path}")
+        return ident
+
+    def enum_subkeys(self, key):
+        self.counters['enum'] += 1
+        return list(self._keys[key]['subkeys'].values())
+
+    def query_value(self, key, name):
+        self.counters['value'] += 1
+        return self._keys[key]['values'].get(name)
+
+    def query_info(self, key):
+        self.counters['info'] += 1
+        node = self._keys[key]
+        return (len(node['subkeys']), len(node['values']), node['last_write'])
+
+
+def default_backend():
+    """Windows上返回winreg后端，其他平台返回None（调用方退回PowerShell）"""
+    if winreg is None:
+        return None
+    return WinregBackend()
+
+
+def read_key_values(backend, hive, path, fields):
+    """读取一个键中的若干值，键不存在时返回None"""
+    try:
+        key = backend.open_key(hive, path)
+    except OSError:
+        return None
+    try:
+        return {field: backend.query_value(key, field) for field in fields}
+    finally:
+        backend.close_key(key)
+
+
+def list_subkeys(backend, hive, path):
+    """列出子键名，键不存在时返回空列表"""
+    try:
+        key = backend.open_key(hive, path)
+    except OSError:
+        return []
+    try:
+        return backend.enum_subkeys(key)
+    finally:
+        backend.close_key(key)
+
+
+def values_match(values, where):
+    """where为 {值名: 子串}，每个值都包含对应子串（不区分大小写）时返回True"""
+    return all(needle.lower() in str(values.get(field) or '').lower() for field, needle in where.items())
+
+
+def read_matching_values(backend, hive, path, fields, where):
+    """先只读取where中的值，不满足条件时不再读取其余值；键不存在或不满足条件时返回None"""
+    try:
+        key = backend.open_key(hive, path)
+    except OSError:
+        return None
+    try:
+        values = {}
+        for field in where:
+            values[field] = backend.query_value(key, field)
+        if not values_match(values, where):
+            return None
+        for field in fields:
+            if field not in values:
+                values[field] = backend.query_value(key, field)
+        return {field: values[field] for field in fields}
+    finally:
+        backend.close_key(key)
+
+
+def iter_uninstall_entries(backend, fields, roots=UNINSTALL_KEYS, where=None):
+    """遍历所有卸载项，逐个产出 (hive, 根路径, 子键名, {字段: 值})
+
+    给出where（{值名: 子串}）时只产出满足条件的键，不满足条件的键只读取where中的几个值。
+    """
+    for hive, root in roots:
+        for name in list_subkeys(backend, hive, root):
+            if where:
+                values = read_matching_values(backend, hive, f"{root}\\{name}", fields, where)
+            else:
+                values = read_key_values(backend, hive, f"{root}\\{name}", fields)
+            if values is not None:
+                yield hive, root, name, values
+
+
+def uninstall_change_token(backend, roots=UNINSTALL_KEYS):
+    """各卸载位置根键的 [子键数, 最后写入时间]，安装或卸载软件时会变化
+
+    只读取根键的信息，开销很小，可以频繁检查；就地升级只改子键中的值时根键不变，
+    这种变化需要由定时刷新或缓存有效期兜底。返回列表，可以直接保存到JSON缓存中比较。
+    """
+    token = []
+    for hive, root in roots:
+        try:
+            key = backend.open_key(hive, root)
+        except OSError:
+            token.append(None)
+            continue
+        try:
+            subkeys, _, last_write = backend.query_info(key)
+            token.append([subkeys, last_write])
+        finally:
+            backend.close_key(key)
+    return token
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+扫描结果的文本输出
+项目名称项目组Seraphiel 作者 TraeAI - 日期 2025-11-19 版本 1.0
+描述: 屏幕输出和文本导出共用的渲染器。每条记录先渲染成字符串片段，再拼成64KB左右的大块一次写出，
+      Windows控制台上不再是每行一次写入。屏幕输出支持只显示前N条、只显示统计，
+      输出到终端且超过一屏时通过分页程序（$PAGER，默认Windows上为more，其他平台为less）显示。
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+
+# 每次写出的块大小（字符数）
+CHUNK_SIZE = 64 * 1024
+
+# 记录下方缩进显示的字段
+DETAIL_FIELDS = [
+    ('version', '版本'),
+    ('publisher', '发布者'),
+    ('install_date', '安装日期'),
+]
+
+
+def render_record(index, item, show_type=True):
+    """渲染一条记录：编号和名称一行，有值的详细字段各一行，最后一个空行"""
+    if show_type:
+        parts = [f"{index}. [{item['type']}] {item['name']}\n"]
+    else:
+        parts = [f"{index}. {item['name']}\n"]
+    for field, label in DETAIL_FIELDS:
+        value = item.get(field)
+        if value:
+            parts.append(f"   {label}: {value}\n")
+    parts.append("\n")
+    return "".join(parts)
+
+
+def render_results(records, limit=None):
+    """逐段产出屏幕上的结果列表，limit限制显示的条数"""
+    total = len(records)
+    shown = total if limit is None else min(limit, total)
+    yield f"\n所有结果 ({total}个):\n" if shown == total else f"\n结果 (显示前{shown}个, 共{total}个):\n"
+    yield "=" * 80 + "\n"
+    for index in range(shown):
+        yield render_record(index + 1, records[index])
+    if shown < total:
+        yield f"... 还有 {total - shown} 个未显示，可用 --limit 调整或导出文件查看\n"
+
+
+def render_text_report(records, generated_at):
+    """逐段产出文本导出的内容，记录按类型分组"""
+    yield "Windows系统软件信息报告\n"
+    yield f"生成时间: {generated_at}\n"
+    yield "=" * 80 + "\n\n"
+
+    types = {}
+    for item in records:
+        types.setdefault(item['type'], []).append(item)
+
+    for type_name, items in types.items():
+        yield f"{type_name} ({len(items)}个):\n"
+        yield "-" * 60 + "\n"
+        for index, item in enumerate(items, 1):
+            yield render_record(index, item, show_type=False)
+        yield "\n"
+
+
+def render_summary(total, type_counts, matched=None):
+    """逐段产出扫描统计；matched不为None时附带过滤后的条数"""
+    yield f"\n扫描完成！共找到 {total} 个软件/组件\n"
+    for type_name, count in type_counts.items():
+        yield f"  {type_name}: {count}个\n"
+    if matched is not None:
+        yield f"过滤后结果: {matched}个\n"
+
+
+def iter_chunks(pieces, size=CHUNK_SIZE):
+    """把小片段拼成不小于size的大块"""
+    buffer = []
+    buffered = 0
+    for piece in pieces:
+        buffer.append(piece)
+        buffered += len(piece)
+        if buffered >= size:
+            yield "".join(buffer)
+            buffer = []
+            buffered = 0
+    if buffer:
+        yield "".join(buffer)
+
+
+def write_chunks(stream, pieces, size=CHUNK_SIZE):
+    """按块写出，返回写入的块数"""
+    count = 0
+    for chunk in iter_chunks(pieces, size):
+        stream.write(chunk)
+        count += 1
+    stream.flush()
+    return count
+
+
+def default_pager():
+    return os.environ.get('PAGER') or ('more' if os.name == 'nt' else 'less -FRX')
+
+
+def should_page(stream, lines):
+    """输出到终端且内容超过一屏时分页"""
+    isatty = getattr(stream, 'isatty', None)
+    if isatty is None or not isatty():
+        return False
+    return lines > shutil.get_terminal_size().lines
+
+
+def write_paged(pieces, pager=None, stream=None):
+    """通过分页程序显示；分页程序无法启动时直接写到stream"""
+    stream = stream or sys.stdout
+    pager = pager or default_pager()
+    # 通过shell启动时找不到命令不会抛出异常，先确认分页程序存在
+    if not pager.split() or shutil.which(pager.split()[0]) is None:
+        return write_chunks(stream, pieces)
+    try:
+        process = subprocess.Popen(pager, shell=True, stdin=subprocess.PIPE,
+                                   encoding=getattr(stream, 'encoding', None) or 'utf-8', errors='replace')
+    except OSError:
+        return write_chunks(stream, pieces)
+
+    count = 0
+    try:
+        for chunk in iter_chunks(pieces):
+            process.stdin.write(chunk)
+            count += 1
+    except BrokenPipeError:
+        pass  # 用户提前退出分页程序
+    finally:
+        try:
+            process.stdin.close()
+        except BrokenPipeError:
+            pass
+        process.wait()
+    return count
+
+
+def print_results(records, limit=None, page=True, stream=None):
+    """在屏幕上显示结果列表，page为True时超过一屏自动分页"""
+    stream = stream or sys.stdout
+    shown = len(records) if limit is None else min(limit, len(records))
+    pieces = render_results(records, limit)
+    # 每条记录一般占3~5行
+    if page and should_page(stream, shown * 3):
+        stream.flush()
+        return write_paged(pieces, stream=stream)
+    return write_chunks(stream, pieces)
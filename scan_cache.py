@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+扫描结果缓存
+项目名称项目组Seraphiel 作者 TraeAI - 日期 2025-11-19 版本 1.0
+描述: 把上一次扫描的结果保存在本地磁盘上，下次只重新读取发生变化的部分。
+      缓存文件带有类型、格式版本、主机名和校验和，损坏或过期时自动丢弃重建；
+      写入先落到临时文件再改名，中途中断不会留下半个文件。
+"""
+
+import hashlib
+import json
+import os
+import platform
+import tempfile
+import time
+
+# 超过这个时间的缓存视为过期，整体重建一次
+MAX_CACHE_AGE = 30 * 24 * 3600
+
+
+def default_cache_dir():
+    """缓存目录：Windows上放在%LOCALAPPDATA%下，其他平台放在~/.cache下"""
+    base = os.environ.get('LOCALAPPDATA')
+    if base:
+        return os.path.join(base, 'SystemConfigScript', 'cache')
+    return os.path.join(os.path.expanduser('~'), '.cache', 'system-config-script')
+
+
+def default_cache_path(name):
+    return os.path.join(default_cache_dir(), name)
+
+
+def current_host():
+    return os.environ.get('COMPUTERNAME') or platform.node()
+
+
+def _checksum(entries):
+    payload = json.dumps(entries, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def load_cache(path, kind, version, max_age=MAX_CACHE_AGE):
+    """读取缓存条目；文件不存在、损坏、格式不符或已过期时返回None"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            document = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        print(f"缓存文件 {path} 已损坏，将重新生成: {e}")
+        return None
+
+    if not isinstance(document, dict) or not isinstance(document.get('entries'), dict):
+        print(f"缓存文件 {path} 格式无效，将重新生成")
+        return None
+    if document.get('kind') != kind or document.get('version') != version:
+        return None
+    if document.get('host') != current_host():
+        return None
+    if time.time() - document.get('created', 0) > max_age:
+        return None
+    if document.get('checksum') != _checksum(document['entries']):
+        print(f"缓存文件 {path} 校验失败，将重新生成")
+        return None
+
+    return document['entries']
+
+
+def save_cache(path, kind, version, entries, created=None):
+    """原子地写入缓存：先写临时文件，再替换目标文件"""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+
+    document = {
+        'kind': kind,
+        'version': version,
+        'host': current_host(),
+        'created': created if created is not None else time.time(),
+        'checksum': _checksum(entries),
+        'entries': entries,
+    }
+
+    fd, temp_path = tempfile.mkstemp(prefix='.tmp-', suffix='.json', dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(document, f, ensure_ascii=False)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def incremental_registry_scan(backend, roots, fields, cached=None):
+    """按最后写入时间增量读取roots下的所有子键
+
+    cached是上一次返回的条目字典（可以为None）。最后写入时间没变的子键直接复用缓存的值，
+    不会再读取任何值；新增或修改的子键重新读取，已删除的子键自然不再出现在结果中。
+    返回 (条目字典, 统计信息)，条目键为 "hive\\根路径\\子键名"。
+    """
+    cached = cached or {}
+    entries = {}
+    stats = {'reused': 0, 'read': 0, 'removed': 0}
+
+    for hive, root in roots:
+        try:
+            root_key = backend.open_key(hive, root)
+        except OSError:
+            continue
+        try:
+            subkeys = backend.enum_subkeys(root_key)
+        finally:
+            backend.close_key(root_key)
+
+        for name in subkeys:
+            entry_id = f"{hive}\\{root}\\{name}"
+            try:
+                key = backend.open_key(hive, f"{root}\\{name}")
+            except OSError:
+                continue  # 枚举之后被删除
+            try:
+                last_write = backend.query_info(key)[2]
+                previous = cached.get(entry_id)
+                if previous is not None and previous.get('last_write') == last_write:
+                    entries[entry_id] = previous
+                    stats['reused'] += 1
+                else:
+                    values = {field: backend.query_value(key, field) for field in fields}
+                    entries[entry_id] = {'last_write': last_write, 'values': values}
+                    stats['read'] += 1
+            finally:
+                backend.close_key(key)
+
+    stats['removed'] = sum(1 for entry_id in cached if entry_id not in entries)
+    return entries, stats
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+紧凑的软件记录
+项目名称项目组Seraphiel 作者 TraeAI - 日期 2025-11-19 版本 1.0
+描述: 用__slots__保存软件记录，代替每条记录一个字典。字段名不再随每条记录重复保存，
+      类型、发布者、版本等取值种类很少的字段用sys.intern去重，多条记录共用同一个字符串。
+      SoftwareRecord支持字典的读取方式（get、[]、in、items等），采集、去重、过滤和导出
+      都可以直接使用；只有在写出JSON时才通过to_dict/json_default转换回字典。
+"""
+
+import sys
+
+# 常用字段各占一个槽，其余字段（例如去重后的sources）放在_extra字典中
+FIELDS = (
+    'type', 'name', 'version', 'publisher', 'install_date', 'uninstall_string', 'install_location',
+    'package_name', 'package_id', 'available', 'source', 'state', 'service_name', 'status',
+    'start_type', 'image_path', 'account', 'display_name',
+)
+
+# 取值种类少、在记录之间（以及多台主机之间）大量重复的字段
+# 名称和安装日期在单机清单中几乎每条都不同，驻留只会让驻留表越来越大，不在其中
+INTERNED_FIELDS = frozenset([
+    'type', 'version', 'publisher', 'available', 'source', 'state', 'status', 'start_type', 'account',
+])
+
+_SLOT_FIELDS = frozenset(FIELDS)
+
+# 字段顺序相同的记录共用同一个字段名元组
+_SHAPES = {}
+
+_MISSING = object()
+
+
+def _shape(keys):
+    keys = tuple(keys)
+    return _SHAPES.setdefault(keys, keys)
+
+
+class SoftwareRecord:
+    """一条软件记录，按字段名读取的方式与字典相同
+
+    _keys按原始顺序记录出现过的字段名，to_dict得到的字典与转换前的字典键顺序一致，
+    导出的JSON与直接导出字典逐字节相同。
+    """
+
+    __slots__ = ('_keys', '_extra') + FIELDS
+
+    def __init__(self, **fields):
+        self._extra = None
+        self._assign(fields.items())
+
+    @classmethod
+    def from_dict(cls, mapping):
+        record = cls.__new__(cls)
+        record._extra = None
+        record._assign(mapping.items())
+        return record
+
+    def _assign(self, items):
+        keys = []
+        for key, value in items:
+            keys.append(key)
+            if type(value) is str and key in INTERNED_FIELDS:
+                value = sys.intern(value)
+            if key in _SLOT_FIELDS:
+                setattr(self, key, value)
+            else:
+                if self._extra is None:
+                    self._extra = {}
+                self._extra[key] = value
+        self._keys = _shape(keys)
+
+    def get(self, key, default=None):
+        if key in _SLOT_FIELDS:
+            return getattr(self, key, default)
+        if self._extra is None:
+            return default
+        return self._extra.get(key, default)
+
+    def __getitem__(self, key):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        if key not in self._keys:
+            self._keys = _shape(self._keys + (key,))
+        if type(value) is str and key in INTERNED_FIELDS:
+            value = sys.intern(value)
+        if key in _SLOT_FIELDS:
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __contains__(self, key):
+        return key in self._keys
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def keys(self):
+        return self._keys
+
+    def values(self):
+        return [self[key] for key in self._keys]
+
+    def items(self):
+        return [(key, self[key]) for key in self._keys]
+
+    def to_dict(self):
+        """转换成字典，键顺序与创建时相同"""
+        return {key: self[key] for key in self._keys}
+
+    def __eq__(self, other):
+        if isinstance(other, SoftwareRecord):
+            return self.to_dict() == other.to_dict()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"SoftwareRecord({self.to_dict()!r})"
+
+    def __getstate__(self):
+        return self.to_dict()
+
+    def __setstate__(self, state):
+        self._extra = None
+        self._assign(state.items())
+
+
+def compact_record(record):
+    """把字典转换成SoftwareRecord，已经是SoftwareRecord时原样返回"""
+    if isinstance(record, SoftwareRecord):
+        return record
+    return SoftwareRecord.from_dict(record)
+
+
+def compact_records(records):
+    """逐条转换，返回列表"""
+    return [compact_record(record) for record in records]
+
+
+def json_default(value):
+    """json.dump的default参数：遇到SoftwareRecord时转换成字典，其余类型照常报错"""
+    if isinstance(value, SoftwareRecord):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
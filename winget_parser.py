@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+winget输出解析
+项目名称项目组Seraphiel 作者 TraeAI - 日期 2025-11-19 版本 1.0
+描述: 解析winget list的表格输出和winget export的JSON输出。
+      表格按列对齐输出，名称和版本中可能带空格，不能按空白拆分。这里只读一次表头和分隔线，
+      算出每列的起始位置（按显示宽度，中日韩等宽字符占两列），再按位置切出每一行的各列。
+"""
+
+import json
+import re
+import unicodedata
+from operator import itemgetter
+
+# winget list的列顺序固定，表头文字随系统语言变化，因此按位置而不是按表头文字识别
+LIST_COLUMNS_WITH_AVAILABLE = ['name', 'id', 'version', 'available', 'source']
+LIST_COLUMNS = ['name', 'id', 'version', 'source']
+
+_HEADER_WORD = re.compile(r'\S+')
+
+
+# 宽字符后面补一个占位符，展开后的字符串中一个字符正好占一列，可以直接按列号切片
+WIDE_PAD = '\x00'
+
+
+class _WideExpander(dict):
+    """str.translate用的映射表，按需判断字符宽度并缓存"""
+
+    def __missing__(self, code):
+        char = chr(code)
+        value = char + WIDE_PAD if unicodedata.east_asian_width(char) in ('W', 'F') else code
+        self[code] = value
+        return value
+
+
+_EXPAND = _WideExpander()
+
+
+def expand_wide(text):
+    """把宽字符展开成两个字符，返回的字符串长度等于显示宽度"""
+    if text.isascii():
+        return text
+    return text.translate(_EXPAND)
+
+
+def display_width(text):
+    return len(expand_wide(text))
+
+
+def _clean_line(line):
+    """去掉进度动画：winget用回车覆盖同一行，只保留最后一次回车之后的内容"""
+    if '\r' in line:
+        line = line.rsplit('\r', 1)[1]
+    return line.rstrip()
+
+
+def _is_separator(line):
+    stripped = line.strip()
+    return len(stripped) > 3 and not stripped.strip('-')
+
+
+def header_columns(header):
+    """返回表头中每一列起始位置的显示列号"""
+    return [match.start() for match in _HEADER_WORD.finditer(expand_wide(header))]
+
+
+def column_slices(columns):
+    """由列起始位置生成切片，最后一列一直取到行尾"""
+    ends = columns[1:] + [None]
+    return [slice(start, end) for start, end in zip(columns, ends)]
+
+
+def split_row(line, slices):
+    """按列切出一行的各列"""
+    if line.isascii():
+        return [line[column].strip() for column in slices]
+    line = line.translate(_EXPAND)
+    return [line[column].strip().replace(WIDE_PAD, '') for column in slices]
+
+
+# 判断过宽度的字符，都包含全部ASCII字符："…"、"®"之类的非宽字符记在_NARROW中，宽字符记在_WIDE_OR_ASCII中
+_NARROW = set(map(chr, range(128)))
+_WIDE_OR_ASCII = set(_NARROW)
+
+
+def _learn(text):
+    """判断text中新出现的字符的宽度并记下，有新字符时返回True"""
+    unknown = set(text).difference(_NARROW, _WIDE_OR_ASCII)
+    for char in unknown:
+        if unicodedata.east_asian_width(char) in ('W', 'F'):
+            _WIDE_OR_ASCII.add(char)
+        else:
+            _NARROW.add(char)
+    return bool(unknown)
+
+
+def _align(line, end):
+    """宽字符都在第一列时，在第一列末尾补上与宽字符个数相同的空格，使各列按显示列号对齐
+
+    end是第二列的显示列号。第一列中有非宽的非ASCII字符或后面的列中有宽字符时返回None。
+    """
+    head = line[:end]
+    wide = len(head) - len(head.encode('ascii', 'ignore'))
+    cut = end - wide
+    if cut <= 0 or not head[cut:].isascii() or not _WIDE_OR_ASCII.issuperset(head[:cut]):
+        return None
+    rest = line[end:]
+    if not rest.isascii() and not _NARROW.issuperset(rest):
+        return None
+    return head[:cut] + ' ' * wide + line[cut:]
+
+
+class RowSplitter:
+    """按一张表的列位置切分数据行，列位置和切片只在建立时计算一次
+
+    整张表一起切分：每一列用一个预先建好的itemgetter对所有行切片、去空白，循环都在C层完成。
+    宽字符通常只出现在名称列，这样的行补齐空格后和其他行一起切分；其他含宽字符的行用split_row单独切分。
+    """
+
+    def __init__(self, columns):
+        self.columns = columns
+        self.slices = column_slices(columns)
+        self._getters = [itemgetter(column) for column in self.slices]
+
+    def split(self, lines):
+        """切分多行，返回每行各列文本组成的列表"""
+        lines = list(lines)
+        unaligned = {}
+        if len(self.columns) > 1:
+            end = self.columns[1]
+            for index, line in enumerate(lines):
+                if line.isascii() or _NARROW.issuperset(line):
+                    continue
+                aligned = _align(line, end)
+                if aligned is None and _learn(line):
+                    if _NARROW.issuperset(line):
+                        continue
+                    aligned = _align(line, end)
+                if aligned is None:
+                    unaligned[index] = line
+                else:
+                    lines[index] = aligned
+
+        columns = [map(str.strip, map(getter, lines)) for getter in self._getters]
+        rows = list(map(list, zip(*columns)))
+        for index, line in unaligned.items():
+            rows[index] = split_row(line, self.slices)
+        return rows
+
+
+def iter_list_rows(text):
+    """逐行产出winget list表格中的数据行，每行是各列文本组成的列表
+
+    表头是分隔线上面的一行；表格在分隔线之后的第一个空行结束（后面是"N upgrades available"之类的提示）。
+    """
+    lines = text.split('\n')
+    for index, raw in enumerate(lines):
+        if _is_separator(raw):
+            break
+    else:
+        return
+
+    header = ''
+    for previous in range(index - 1, -1, -1):
+        header = _clean_line(lines[previous])
+        if header.strip():
+            break
+    columns = header_columns(header)
+    if not columns:
+        return
+    body = []
+    for raw in lines[index + 1:]:
+        line = _clean_line(raw)
+        if not line:
+            break
+        body.append(line)
+    yield from RowSplitter(columns).split(body)
+
+
+def parse_list_output(text):
+    """解析winget list的输出，返回软件记录列表"""
+    records = []
+    rows = list(iter_list_rows(text))
+    if not rows:
+        return records
+    width = len(rows[0])
+    field_names = LIST_COLUMNS_WITH_AVAILABLE if width >= 5 else LIST_COLUMNS
+    # 每行末尾补一个空字符串，表格中没有的列都取它
+    positions = [field_names.index(field) if field in field_names[:width] else width
+                 for field in ('name', 'id', 'version', 'available', 'source')]
+    pick = itemgetter(*positions)
+    for row in rows:
+        row.append('')
+        name, package_id, version, available, source = pick(row)
+        if not name:
+            continue
+        records.append({
+            'type': 'winget应用',
+            'name': name,
+            'version': version,
+            'publisher': '未知',  # winget list不输出发布者
+            'package_id': package_id,
+            'available': available,
+            'source': source,
+        })
+    return records
+
+
+def parse_export_data(data):
+    """解析winget export生成的JSON，返回软件记录列表
+
+    export只列出能在源中找到的包，且只有包标识没有显示名称，名称使用包标识；
+    因此只用来补全winget list中被截断的包标识，不作为记录来源。
+    """
+    records = []
+    for source in data.get('Sources', []):
+        source_name = (source.get('SourceDetails') or {}).get('Name', '')
+        for package in source.get('Packages', []):
+            package_id = package.get('PackageIdentifier')
+            if not package_id:
+                continue
+            records.append({
+                'type': 'winget应用',
+                'name': package_id,
+                'version': package.get('Version', ''),
+                'publisher': '未知',
+                'package_id': package_id,
+                'available': '',
+                'source': source_name,
+            })
+    return records
+
+
+def read_export_file(path):
+    """读取winget export输出的文件（winget写出的文件可能带BOM）"""
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        return parse_export_data(json.load(f))